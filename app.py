@@ -1,31 +1,28 @@
-
+from __future__ import annotations   # anotacije (pd.DataFrame, GitHubClient …) se ne evaluiraju pri učitavanju
 from pathlib import Path
-from datetime import date, datetime, timedelta
-import base64, io, requests, re, unicodedata
-import pandas as pd
+from datetime import date, datetime, timedelta, timezone
+import io
 import streamlit as st
-import matplotlib.pyplot as plt
 
-# utils
-from utils_tracker import (
-    normalize_columns,
-    with_parsed_date,
-    dedupe_last_then_sort_desc,
-    is_remote_value,
-    apply_canonical_fields,
-)
+# pandas, pyarrow i utils_* uvoze se tek nakon e-mail gatea (vidi "Heavy imports"); matplotlib, requests
+# (utils_github) i reportlab tek u sekciji koja ih koristi → prvi prikaz aplikacije ne čeka na njih.
 
 BUILD_VERSION = "v12.3"
-BUILD_TIMESTAMP = datetime.utcnow().isoformat(timespec="seconds") + "Z"
 
 # ----- Paths / files -----
 EMP_FILE = "data/Popis_djelatnika_HR_Sales.csv"
 LOC_NORM_FILE = "data/Locations_normalized.csv"   # jedini izvor lokacija
 HOL_FILE = "data/CroatianHolidays.csv"
 GH_TRACKER_PATH_DEFAULT = "data/Tracker.csv"
-LOCAL_FALLBACK_LOG = Path("data/Tracker.local.csv")
+LOCAL_DATASET = Path("data/tracker.local")            # lokalni cache / lokalni način rada (Year=/Month= particije)
+LEGACY_LOCAL = [Path("data/Tracker.local.parquet"), Path("data/Tracker.local.csv")]  # stari lokalni cache (samo import)
+REPO_DATASET = Path("data/tracker")                    # gradi CI (scripts/generate_parquet.py)
+DELTA_COMPACT_AT = 20                                  # broj delta datoteka nakon kojeg se spajaju u particije
+SAVE_WINDOW_S = 0.5                                    # prozor u kojem se istovremena spremanja spajaju u jedan zapis
 DEFAULT_GH_SEP = ";"
 HR_DAYS = ["Ponedjeljak","Utorak","Srijeda","Četvrtak","Petak"]
+MISSING_CACHE_MAX = 256                                # "Nedostajući unosi": broj (djelatnici, razdoblje) rezultata u dijeljenom cacheu
+REMOTE_DAYS_PER_WEEK = 1                               # interni dogovor Prodaje i marketinga (provjera u formi i timskoj analitici)
 
 st.set_page_config(page_title="Praćenje lokacije rada", page_icon="🗺️", layout="wide")
 
@@ -44,318 +41,334 @@ st.markdown('''
 </style>
 ''', unsafe_allow_html=True)
 
-# ---------- Encoding detection ----------
-def detect_encoding(path: str):
-    try:
-        from charset_normalizer import from_bytes
-        raw = Path(path).read_bytes()
-        best = from_bytes(raw).best()
-        if best and best.encoding:
-            return best.encoding
-    except Exception:
-        pass
-    return None
-
-def read_csv_smart(path:str, force_sep=None, seps=(",", ";", "\t", "|"), encs=("utf-8","utf-8-sig","cp1250","latin1")):
-    if not Path(path).exists():
-        return pd.DataFrame()
-    enc_detected = detect_encoding(path)
-    tried=set()
-    enc_order = [enc_detected] + [e for e in encs if e and (not enc_detected or e.lower()!=enc_detected.lower())]
-    sep_list = [force_sep] if force_sep else list(seps)
-    last_err=None
-    for enc in enc_order:
-        if not enc: continue
-        for sep in sep_list:
-            key=(enc, sep)
-            if key in tried: continue
-            tried.add(key)
-            try:
-                return pd.read_csv(path, sep=sep, encoding=enc, engine="python")
-            except Exception as e:
-                last_err=e
-                continue
-    try:
-        return pd.read_csv(path, sep=None, engine="python", encoding=enc_detected or "utf-8")
-    except Exception as e2:
-        last_err = last_err or e2
-    if last_err: raise last_err
-    raise RuntimeError(f"Ne mogu učitati CSV: {path}")
-
 # ---------- GitHub helpers ----------
 def gh_enabled(): return "GITHUB" in st.secrets and all(k in st.secrets["GITHUB"] for k in ["token","repo"])
-def _gh_headers(extra=None):
-    h={"Authorization": f"Bearer {st.secrets['GITHUB']['token']}", "Accept":"application/vnd.github+json", "X-GitHub-Api-Version":"2022-11-28"}
-    if extra: h.update(extra)
-    return h
 def _sanitize_repo(repo:str)->str: return repo.strip().strip("/")
 def _gh_config():
     s=st.secrets["GITHUB"]
     return {"repo":_sanitize_repo(s["repo"]), "branch":s.get("branch","main"), "path":s.get("path", GH_TRACKER_PATH_DEFAULT),
             "committer_name":s.get("committer_name",None), "committer_email":s.get("committer_email",None),
-            "csv_sep":s.get("csv_sep", DEFAULT_GH_SEP)}
-def gh_get_file(repo,path,branch, etag=None):
-    headers=_gh_headers({"If-None-Match": etag} if etag else None)
-    url=f"https://api.github.com/repos/{repo}/contents/{path}?ref={branch}"
-    r=requests.get(url, headers=headers, timeout=30)
-    return r
-def gh_put_file(repo,path,branch,content_bytes,message,sha=None,committer_name=None,committer_email=None):
-    data={"message":message,"content":base64.b64encode(content_bytes).decode("utf-8"),"branch":branch}
-    if sha: data["sha"]=sha
-    if committer_name and committer_email: data["committer"]={"name":committer_name,"email":committer_email}
-    url=f"https://api.github.com/repos/{repo}/contents/{path}"
-    r=requests.put(url, headers=_gh_headers(), json=data, timeout=60)
-    return r
+            "csv_sep":s.get("csv_sep", DEFAULT_GH_SEP), "api_url":s.get("api_url"),   # None → utils_github.API_URL
+            # "contents": jedna CSV datoteka (path); "dataset": Year=/Month= Parquet particije (dataset_path) preko Git Data API-ja
+            "storage":s.get("storage","contents"), "dataset_path":s.get("dataset_path", str(REPO_DATASET.as_posix()))}
+
+@st.cache_resource(show_spinner=False)
+def _gh_client(token:str, repo:str, branch:str, api_url:str|None)->GitHubClient:
+    # jedan keep-alive Session + ETag cache po procesu (dijele ga sve sesije); requests se uvozi tek ovdje
+    from utils_github import API_URL, GitHubClient
+    return GitHubClient(token, repo, branch, base_url=api_url or API_URL)
+def gh_client()->GitHubClient:
+    cfg=_gh_config()
+    return _gh_client(st.secrets["GITHUB"]["token"], cfg["repo"], cfg["branch"], cfg["api_url"])
+@st.cache_resource(show_spinner=False)
+def _gh_dataset(token:str, repo:str, branch:str, api_url:str|None, root:str)->GitHubDataset:
+    from utils_github import GitHubDataset
+    return GitHubDataset(_gh_client(token, repo, branch, api_url), root)
+def gh_dataset()->GitHubDataset:
+    cfg=_gh_config()
+    return _gh_dataset(st.secrets["GITHUB"]["token"], cfg["repo"], cfg["branch"], cfg["api_url"], cfg["dataset_path"])
+@st.cache_resource(show_spinner=False)
+def _gh_delta_log(token:str, repo:str, branch:str, api_url:str|None, root:str)->GitHubDeltaLog:
+    from utils_github import GitHubDeltaLog
+    return GitHubDeltaLog(_gh_client(token, repo, branch, api_url), root)
+def gh_delta_log()->GitHubDeltaLog:
+    cfg=_gh_config()
+    return _gh_delta_log(st.secrets["GITHUB"]["token"], cfg["repo"], cfg["branch"], cfg["api_url"], cfg["dataset_path"])
+def gh_dataset_mode(): return gh_enabled() and _gh_config()["storage"]=="dataset"
+def gh_put_file(repo,path,branch,content_bytes,message,sha=None,committer_name=None,committer_email=None,on_conflict=None):
+    committer={"name":committer_name,"email":committer_email} if committer_name and committer_email else None
+    return gh_client().put_file(path, content_bytes, message, sha=sha, committer=committer, on_conflict=on_conflict)
 
 # ---------- Loaders ----------
-@st.cache_data(show_spinner=False)
-def load_employees(path:str)->pd.DataFrame:
-    df=read_csv_smart(path, force_sep=';')
-    if df.empty:
-        return pd.DataFrame(columns=["Name","Department","eMail","Manager","Director","eMail_lc"])
-    # Normalize headers
-    import unicodedata
-    def norm(s:str)->str:
-        s=unicodedata.normalize("NFKD", str(s))
-        s="".join(ch for ch in s if not unicodedata.combining(ch))
-        s=s.lower()
-        s=re.sub(r"[^a-z0-9]+","", s)
-        return s
-    norm_map={c: norm(c) for c in df.columns}
-    inv={}
-    for orig, n in norm_map.items(): inv.setdefault(n, orig)
-    def pick(*cands):
-        for cand in cands:
-            n=norm(cand)
-            if n in inv: return inv[n]
-        return None
-    col_name = pick("Name","Ime i prezime","ImeIPrezime","Zaposlenik","Employee")
-    col_dept = pick("Department","Odjel","Odjeljenje","OrgUnit","Organizacijska jedinica")
-    col_mail = pick("eMail","Email","E-mail","e-mail","mail","Kontakt e-mail","Kontakt email")
-    col_mgr  = pick("Manager","Menadzer","Menadžer","Prvi nadređeni","Nadređeni","Line Manager")
-    col_dir  = pick("Director","Direktor","Drugi nadređeni")
-
-    missing=[]
-    if not col_name: missing.append("Name / Ime i prezime")
-    if not col_dept: missing.append("Department / Odjel")
-    if not col_mail: missing.append("Email / eMail / E-mail")
-    if missing:
-        st.error("U CSV-u nedostaju obavezne kolone: " + ", ".join(missing) + f" | Nađene kolone: {list(df.columns)}")
-        return pd.DataFrame(columns=["Name","Department","eMail","Manager","Director","eMail_lc"])
-
-    base={col_name:"Name", col_dept:"Department", col_mail:"eMail"}
-    out=df[list(base.keys())].rename(columns=base)
-    out["Manager"]=df[col_mgr].astype(str) if col_mgr else ""
-    out["Director"]=df[col_dir].astype(str) if col_dir else ""
-    out["eMail_lc"]=out["eMail"].astype(str).str.strip().str.lower()
-    return out[["Name","Department","eMail","Manager","Director","eMail_lc"]]
-
-@st.cache_data(show_spinner=False)
-def load_locations_norm(path:str)->pd.DataFrame:
-    if not Path(path).exists(): 
-        return pd.DataFrame(columns=['location_id','name','type','aliases'])
-    df=read_csv_smart(path, force_sep=";")
-    if df.empty:
-        return pd.DataFrame(columns=['location_id','name','type','aliases'])
-    # header fix if needed
-    if all(str(c).lower().startswith("column") for c in df.columns) and len(df)>0:
-        new_header=[str(x).strip() for x in df.iloc[0].tolist()]
-        df=df.iloc[1:].reset_index(drop=True)
-        df.columns=new_header
-    df=df.rename(columns={c:str(c).strip().lower() for c in df.columns})
-    for c in ['location_id','name','type','aliases']:
-        if c not in df.columns: df[c]=''
-    df['aliases']=df['aliases'].fillna('').astype(str)
-    df['type']=df['type'].fillna('').astype(str).str.upper()
-    df['name']=df['name'].astype(str).str.strip()
-    df['location_id']=df['location_id'].astype(str).str.strip()
-    df=df[(df['name']!='') & (df['location_id']!='')]
-    return df[['location_id','name','type','aliases']].drop_duplicates('location_id', keep='last')
-
-@st.cache_data(show_spinner=False)
-def load_holidays_csv(path:str):
-    df=read_csv_smart(path, force_sep=';')
-    if df.empty: return {}
-    cols_lower={str(c).lower():c for c in df.columns}
-    date_col=next((cols_lower[k] for k in cols_lower if 'datum'in k or 'date'in k), df.columns[0])
-    name_col=next((cols_lower[k] for k in cols_lower if any(x in k for x in ['praznik','holiday','naziv','name'])), df.columns[1] if len(df.columns)>1 else df.columns[0])
-    df['_date']=pd.to_datetime(df[date_col].astype(str).str.strip().str.rstrip('.'), dayfirst=True, errors='coerce').dt.date
-    df['_name']=df[name_col].astype(str).str.strip()
-    return {r['_date']:r['_name'] for _,r in df.dropna(subset=['_date']).iterrows()}
-
-employees = load_employees(EMP_FILE)
-LOC_NORM   = load_locations_norm(LOC_NORM_FILE)
-HOLIDAYS   = load_holidays_csv(HOL_FILE)
+def employee_directory(path:str)->EmployeeDirectory:
+    # indeksi (e-mail/ime/odjel/manager/direktor) grade se jednom po verziji datoteke (mtime)
+    try:
+        return load_employee_directory(path)
+    except ValueError as e:
+        st.error(str(e))
+        return EmployeeDirectory(pd.DataFrame(columns=EMPLOYEE_COLUMNS))
 
 # ---------- Location catalog ----------
-def _norm_key(s: str) -> str:
-    s = unicodedata.normalize("NFKD", str(s or ""))
-    s = "".join(ch for ch in s if not unicodedata.combining(ch))
-    s = s.strip().lower()
-    s = re.sub(r"\s+", " ", s)
-    return s
-
-def build_location_catalog(norm_df: pd.DataFrame):
-    if norm_df is None or norm_df.empty:
-        return [], {}, {}, {}
-    names = []
-    alias_map = {}
-    type_map = {}
-    id_map   = {}
-    for _, r in norm_df.iterrows():
-        canon = str(r.get("name","")).strip()
-        if not canon: continue
-        typ = str(r.get("type","")).strip().upper()
-        lid = str(r.get("location_id","")).strip()
-        if canon not in names: names.append(canon)
-        type_map[_norm_key(canon)] = typ
-        id_map[_norm_key(canon)]   = lid
-        alias_map[_norm_key(canon)] = canon
-        ali = str(r.get("aliases","")).strip()
-        if ali:
-            for a in ali.split("|"):
-                a = a.strip()
-                if a: alias_map[_norm_key(a)] = canon
-    names = sorted(list(dict.fromkeys(names)))
-    return names, alias_map, type_map, id_map
-
-LOC_OPTIONS, LOC_ALIAS_MAP, LOC_TYPE_MAP, LOC_ID_MAP = build_location_catalog(LOC_NORM)
-
 def map_to_canonical(user_value: str) -> str:
-    if not user_value: return ""
-    s = str(user_value).strip()
-    if re.search(r"(?i)^neradni\s*dan$", s):
-        return "__BLOCKED__"
-    key = _norm_key(s)
-    return LOC_ALIAS_MAP.get(key, s)
+    return LOC_RESOLVER.canonical(user_value)
 
 def is_remote_by_catalog(loc_value: str) -> bool:
+    # isto pravilo kao vektorizirani LOC_RESOLVER.remote_mask (tip REMOTE iz kataloga, inače ključne riječi)
     if not loc_value: return False
-    canon = map_to_canonical(loc_value)
-    if canon == "__BLOCKED__": return False
-    typ = LOC_TYPE_MAP.get(_norm_key(canon), "")
-    if typ in {"REMOTE"}: return True
-    return is_remote_value(str(canon))
+    return bool(LOC_RESOLVER.remote_mask(pd.Series([loc_value], dtype=object)).iloc[0])
 
 # ---------- CSV parse helper for remote Tracker fetch ----------
 def parse_csv_bytes(b:bytes, preferred_sep=";"):
-    for sep in [preferred_sep]+[s for s in [",",";","\t","|"] if s!=preferred_sep]:
-        try:
-            df=pd.read_csv(io.BytesIO(b), sep=sep, engine="python")
-            if df.shape[1]>=3: return df, sep
-        except Exception: pass
-    df=pd.read_csv(io.BytesIO(b), sep=None, engine="python"); return df, None
+    _enc, sep = sniff_csv(b, preferred_sep)
+    return read_csv_sniffed(b, sep=sep), sep
 
 # ---------- Tracker loader ----------
 def gh_config_or_none():
     return _gh_config() if gh_enabled() else None
 
+@st.cache_resource(show_spinner=False)
+def _tracker_cache()->dict:
+    # Dijeljeno između sesija: lokalni dataset (signature -> DataFrame). Frame se ne mijenja in-place.
+    return {}
+
+def _local_tracker_path():
+    """Lokalni particionirani dataset; fallback na CI dataset, a stari lokalni cache se jednom importira."""
+    if not list_partitions(LOCAL_DATASET):
+        for legacy in LEGACY_LOCAL:
+            if legacy.exists():
+                try: write_tracker_dataset(read_tracker(legacy), LOCAL_DATASET)
+                except Exception: pass
+                break
+    for p in (LOCAL_DATASET, REPO_DATASET):
+        if list_partitions(p) or list_deltas(p): return p
+    return None
+
+def _read_local_tracker()->pd.DataFrame:
+    path=_local_tracker_path()
+    if path is None: return pd.DataFrame()
+    cache=_tracker_cache(); key=dataset_signature(path)
+    hit=cache.get('local')
+    if hit and hit[0]==key: return hit[1]
+    df=read_tracker_dataset(path, compact=True)
+    cache['local']=(key, df)
+    return df
+
+def _local_weekly(path)->pd.DataFrame:
+    """Tjedni agregat (djelatnik × ISO tjedan × lokacija) uz lokalni dataset; gradi se samo ako ga nema ili je zastario."""
+    cache=_tracker_cache(); key=(str(path), dataset_signature(path))
+    hit=cache.get('weekly_local')
+    if hit and hit[0]==key: return hit[1]
+    fp=dataset_fingerprint(path)
+    agg=read_weekly_locations(path, fp)
+    if agg is None:
+        agg=weekly_locations(read_tracker_dataset(path, compact=True), LOC_RESOLVER)
+        try: write_weekly_locations(agg, path, fp)
+        except Exception: pass
+    cache['weekly_local']=(key, agg)
+    return agg
+
+def _frame_weekly(df:pd.DataFrame)->pd.DataFrame:
+    # GitHub: frame je već u memoriji (jedan po verziji podataka) → agregat se računa jednom po verziji, za sve sesije
+    cache=_tracker_cache(); hit=cache.get('weekly_gh')
+    if hit and hit[0] is df: return hit[1]
+    agg=weekly_locations(df, LOC_RESOLVER)
+    cache['weekly_gh']=(df, agg)
+    return agg
+
+def _parse_remote_tracker(content:bytes, csv_sep:str)->pd.DataFrame:
+    # poziva se samo na 200 (novi ETag); 304 vraća već parsirani frame iz GitHubClient cachea
+    if content[:4]==b"PAR1":
+        df=pd.read_parquet(io.BytesIO(content))
+    else:
+        df,_sep=parse_csv_bytes(content, preferred_sep=csv_sep)
+    df=dedupe_last_then_sort_desc(apply_canonical_fields(df, source='gh'))
+    try: write_tracker_dataset(df, LOCAL_DATASET)
+    except Exception: pass
+    return to_compact(df)  # kategorije + datetime64: manje memorije po sesiji
+
 def load_tracker_and_meta():
     cfg=gh_config_or_none()
-    etag_prev=st.session_state.get("tracker_etag")
-    if gh_enabled():
-        r=gh_get_file(cfg['repo'], cfg['path'], cfg['branch'], etag=etag_prev)
-        if r.status_code==304:
-            df=pd.read_csv(LOCAL_FALLBACK_LOG) if LOCAL_FALLBACK_LOG.exists() else pd.DataFrame()
-            sha=None; etag=r.headers.get('ETag', etag_prev)
-        elif r.status_code==200:
-            j=r.json(); content=base64.b64decode(j['content']); sha=j.get('sha'); etag=r.headers.get('ETag')
-            try:
-                df=pd.read_parquet(io.BytesIO(content))
-            except Exception:
-                df,_sep=parse_csv_bytes(content, preferred_sep=cfg['csv_sep'])
-            df=dedupe_last_then_sort_desc(apply_canonical_fields(df, source='gh'))
-            try: LOCAL_FALLBACK_LOG.parent.mkdir(parents=True, exist_ok=True); df.to_csv(LOCAL_FALLBACK_LOG, index=False)
-            except Exception: pass
-        elif r.status_code==404:
-            df=pd.DataFrame(); sha=None; etag=None
+    if gh_dataset_mode():
+        # promjena = jedan uvjetni GET refa; particije se skidaju (raw blob) samo kad im se promijeni sha
+        cache=_tracker_cache(); head, parts = gh_dataset().listing()
+        hit=cache.get('gh_dataset')
+        if hit and hit[0]==head: df=hit[1]
         else:
-            st.error(f"GitHub GET error: {r.status_code}"); st.code(r.text)
-            df=pd.read_csv(LOCAL_FALLBACK_LOG) if LOCAL_FALLBACK_LOG.exists() else pd.DataFrame()
-            sha=None; etag=None
+            df=gh_dataset().read(compact=True, listing=(head, parts)); cache['gh_dataset']=(head, df)
+        sha=head; etag=None
+        st.session_state['tracker_sha']=sha
+        st.session_state['last_get_status']=200 if head else 404
+    elif gh_enabled():
+        df, sha, etag, status = gh_client().fetch_frame(cfg['path'], lambda b: _parse_remote_tracker(b, cfg['csv_sep']))
+        if status==404:
+            df=pd.DataFrame()
+        elif df is None:
+            st.error(f"GitHub GET error: {status}")
+            df=_read_local_tracker()
+        else:
+            # delte koje CI još nije spojio u Tracker.csv (uvjetni listing; skidaju se samo nove)
+            log=gh_delta_log(); files=log.files()
+            st.session_state['tracker_deltas']=tuple(files.values())
+            if files:
+                cache=_tracker_cache(); key=(sha, tuple(files.values()))
+                hit=cache.get('gh_deltas')
+                if hit and hit[0]==key: df=hit[1]
+                else:
+                    df=merge_deltas(df, log.read(files), compact=True); cache['gh_deltas']=(key, df)
         st.session_state['tracker_sha']=sha
         st.session_state['tracker_etag']=etag
-        st.session_state['last_get_status']=r.status_code
+        st.session_state['last_get_status']=status
     else:
-        df=pd.read_csv(LOCAL_FALLBACK_LOG) if LOCAL_FALLBACK_LOG.exists() else pd.DataFrame()
+        df=_read_local_tracker()
         sha=None; etag=None
     return df, sha, etag, cfg
 
-# ---------- “Last completed week” helper ----------
-def monday_of_week(d:date)->date: return (pd.Timestamp(d)-pd.Timedelta(days=d.weekday())).date()
-def last_completed_week_end(today: date) -> date:
-    start_this = monday_of_week(today)
-    end_prev   = (pd.Timestamp(start_this) - pd.Timedelta(days=1)).date()
-    return end_prev
-def iso_week(dt:date)->int: return pd.Timestamp(dt).isocalendar().week
-def week_bounds(monday:date):
-    end=(pd.Timestamp(monday)+pd.Timedelta(days=6)).date(); return monday, end
+# ---------- Tracker snapshot (jedan fetch + normalizacija po rerunu) ----------
+class TrackerSnapshot:
+    """Nepromjenjiv pogled na Tracker za jedan rerun.
+    GitHub: cijeli frame je već u memoriji pa se upiti filtriraju u memoriji.
+    Lokalno: upiti otvaraju samo particije (Year/Month) iz traženog raspona, s potrebnim kolonama (projection + pushdown)."""
+    def __init__(self, sha=None, etag=None, cfg=None, df=None, path=None, deltas=()):
+        self.sha, self.etag, self.cfg, self.path, self.deltas = sha, etag, cfg, path, deltas
+        self._df=df; self._parsed=None; self._queries={}; self._weekly=None; self._version=None
+
+    @property
+    def df(self)->pd.DataFrame:
+        if self._df is None:
+            self._df=_read_local_tracker() if self.path else pd.DataFrame()
+        return self._df
+
+    @property
+    def parsed(self)->pd.DataFrame:
+        if self._parsed is None:
+            self._parsed=with_parsed_date(self.df) if not self.df.empty else self.df
+        return self._parsed
+
+    @property
+    def empty(self)->bool:
+        if self._df is None and self.path:
+            return dataset_num_rows(self.path)==0
+        return self.df.empty
+
+    @property
+    def weekly(self)->pd.DataFrame:
+        """Materijalizirani tjedni agregat lokacija (utils_analytics.WEEKLY_COLUMNS): O(tjedana) redaka umjesto cijele povijesti."""
+        if self._weekly is None:
+            self._weekly=_local_weekly(self.path) if self._df is None and self.path else _frame_weekly(self.df)
+        return self._weekly
+
+    @property
+    def version(self)->tuple:
+        """Oznaka verzije podataka za cache izvedenih rezultata (grafovi): GitHub sha (+ nespojene delte), lokalno potpis datoteka."""
+        if self._version is None:
+            self._version=("local", dataset_signature(self.path)) if self.path else ("gh", self.sha, self.deltas)
+        return self._version
+
+    def query(self, columns=None, date_from=None, date_to=None, employee=None)->pd.DataFrame:
+        key=(tuple(columns) if columns else None, date_from, date_to, employee)
+        if key not in self._queries:
+            if self._df is None and self.path:
+                res=read_tracker_dataset(self.path, columns, date_from, date_to, employee, compact=True)
+            else:
+                res=filter_tracker(self.parsed, columns, date_from, date_to, employee)
+            self._queries[key]=res
+        return self._queries[key]
+
+_RUN_SNAPSHOTS={}  # Streamlit izvršava skriptu ispočetka pri svakom rerunu → cache traje jedan rerun
+
+def tracker_snapshot()->TrackerSnapshot:
+    """Jedan (uvjetni) GitHub GET i jedna normalizacija po rerunu; sve sekcije dijele isti, nepromjenjivi frame.
+    Novi fetch samo kad se promijeni `tracker_version` (spremanje, 'Provjeri nove zapise'); ETag odlučuje o reparsiranju."""
+    version=st.session_state.get("tracker_version", 0)
+    snap=_RUN_SNAPSHOTS.get(version)
+    if snap is None:
+        if gh_enabled():
+            df, sha, etag, cfg = load_tracker_and_meta()
+            snap=TrackerSnapshot(sha, etag, cfg, df=df, deltas=st.session_state.get('tracker_deltas', ()))
+        else:
+            snap=TrackerSnapshot(path=_local_tracker_path())
+        _RUN_SNAPSHOTS[version]=snap
+    return snap
+
+# ---------- “Last completed week” helper (lookupi u CAL, bez pd.Timestamp aritmetike) ----------
+def monday_of_week(d:date)->date: return CAL.monday_of(d)
+def last_completed_week_end(today: date) -> date: return CAL.last_completed_week_end(today)
+def iso_week(dt:date)->int: return CAL.iso_week(dt)[1]
+def week_bounds(monday:date): return monday, monday+timedelta(days=6)
 
 # ---------- Save helper (adds location_id & location_name) ----------
 def canonicalize_rows(df_rows: pd.DataFrame) -> pd.DataFrame:
-    rows = df_rows.copy()
-    rows['location_name'] = ''
-    rows['location_id']   = ''
-    for idx, r in rows.iterrows():
-        raw = str(r.get('Lokacija','')).strip()
-        canon = map_to_canonical(raw)
-        if canon == "__BLOCKED__":
-            rows.at[idx,'Lokacija'] = ''
-            rows.at[idx,'location_name'] = ''
-            rows.at[idx,'location_id']   = ''
-        else:
-            rows.at[idx,'Lokacija'] = canon
-            rows.at[idx,'location_name'] = canon
-            rows.at[idx,'location_id']   = LOC_ID_MAP.get(_norm_key(canon), "")
-    return rows
+    return LOC_RESOLVER.canonicalize_rows(df_rows)
+
+def _gh_save_status(r, label):
+    status, text = (r.status_code, r.text) if r is not None else (200, "bez promjena")
+    st.session_state['last_put_status']=status
+    st.session_state['last_put_text']=text
+    if status not in (200,201):
+        st.error(f"GitHub {label} error {status}")
+        st.code(text)
+
+def _write_tracker_batch(can:pd.DataFrame):
+    """Jedan zapis za cijeli batch spremanja (poziva SaveCoalescer, bez st.* poziva): lokalna delta + jedna GitHub delta."""
+    # local write: jedna nova delta datoteka (konstantan trošak); povremeno se delte spajaju u particije
+    try:
+        # prvo spremanje: tracker.local nema particija i čitanje pada na CI dataset → prvo se kopira, inače bi delta sakrila povijest
+        seed_dataset(LOCAL_DATASET, REPO_DATASET)
+        # dataset_fingerprint hashes only files it has not seen (here: the new delta), not the whole history
+        agg=read_weekly_locations(LOCAL_DATASET, dataset_fingerprint(LOCAL_DATASET))
+        append_delta(can, LOCAL_DATASET)
+        if len(list_deltas(LOCAL_DATASET))>=DELTA_COMPACT_AT: compact_deltas(LOCAL_DATASET)
+        if agg is not None:
+            # tjedni agregat: preračunaju se samo tjedni (djelatnik × tjedan) koje batch dotiče
+            d_from, d_to = week_window(can)
+            rows=read_tracker_dataset(LOCAL_DATASET, ["Ime i prezime","date_iso","Lokacija"], d_from, d_to, compact=True)
+            rows=rows[rows["Ime i prezime"].astype(str).isin(set(can["Ime i prezime"].astype(str)))]
+            write_weekly_locations(refresh_weekly_locations(agg, rows, LOC_RESOLVER), LOCAL_DATASET, dataset_fingerprint(LOCAL_DATASET))
+    except Exception: pass
+    if not gh_enabled(): return None
+    # push to GH: delta datoteka na novoj putanji → istovremena spremanja se ne sudaraju oko istog sha
+    cfg=_gh_config()
+    committer={"name":cfg['committer_name'],"email":cfg['committer_email']} if cfg.get('committer_name') and cfg.get('committer_email') else None
+    msg=f"Append tracker delta ({len(can)} canonical rows) from Streamlit"
+    if cfg['storage']=="dataset":
+        # na konflikt (netko je commitao u međuvremenu) append_delta rebasira batch na svježi head
+        ds=gh_dataset(); r=ds.append_delta(can, msg, committer)
+        _head, files = ds.listing()
+        if len(ds.deltas(files))>=DELTA_COMPACT_AT:
+            ds.compact("Compact tracker deltas from Streamlit", committer)
+        return r
+    # Tracker.csv spaja CI (scripts/normalize_tracker.py)
+    return gh_delta_log().append(can, msg, committer)
+
+@st.cache_resource(show_spinner=False)
+def save_coalescer()->SaveCoalescer:
+    # jedan po procesu: petkom istovremena spremanja → jedan merge i jedan commit/PUT
+    return SaveCoalescer(_write_tracker_batch, window=SAVE_WINDOW_S)
+
+@st.cache_resource(show_spinner=False)
+def chart_cache()->ChartCache:
+    # jedan po procesu: gotovi PNG-ovi grafova (figure se ne drže u memoriji)
+    return ChartCache(maxsize=256)
+
+def personal_chart_png(employee:str, year:int, cutoff:date, snap:TrackerSnapshot, counts:pd.Series)->bytes:
+    key=("location_pie", employee, int(year), cutoff, snap.version)
+    return chart_cache().get_or_render(key, lambda: location_pie_png(counts))
 
 def save_tracker_rows(new_rows:pd.DataFrame):
     # canonicalize
     can = canonicalize_rows(new_rows)
     prog = st.progress(0, text="Spremam zapise …")
-    existing,_sha,_etag,_cfg = load_tracker_and_meta(); prog.progress(20, text="Spajam …")
-    merged=pd.concat([existing, can], ignore_index=True)
-    merged=apply_canonical_fields(merged, source='app'); prog.progress(45, text="Normaliziram (DESC + last-wins) …")
-    merged=dedupe_last_then_sort_desc(merged)
-
-    # local write
+    can = apply_canonical_fields(can, source='app')
+    # provjera sheme samo za ovaj batch (ms); neispravan batch se ne šalje
+    issues = validate_tracker_schema(can, LOC_RESOLVER.catalog["location_id"], HOLIDAYS)
+    if issues:
+        prog.empty()
+        st.error("Zapisi nisu spremljeni, neispravni podaci:\n- " + "\n- ".join(issues))
+        return
+
+    prog.progress(30, text="Šaljem zapise …")
     try:
-        prog.progress(60, text="Lokalni zapis …")
-        LOCAL_FALLBACK_LOG.parent.mkdir(parents=True, exist_ok=True); merged.to_csv(LOCAL_FALLBACK_LOG, index=False)
-    except Exception: pass
-
-    # push to GH
-    if gh_enabled():
-        cfg=_gh_config()
-        pref=['Datum','Dan','Ime i prezime','Odjel','Lokacija',
-              'Week','Month','Year','date_iso','record_id',
-              'location_id','location_name',
-              'created_at','updated_at','source','version']
-        cols=[c for c in pref if c in merged.columns]+[c for c in merged.columns if c not in pref]
-        out_csv = merged[cols].to_csv(index=False, sep=cfg['csv_sep']).encode('utf-8')
-        r=gh_get_file(cfg['repo'], cfg['path'], cfg['branch'])
-        sha=None
-        if r.status_code==200:
-            try: sha=r.json()['sha']
-            except Exception: sha=None
-        put=gh_put_file(cfg['repo'], cfg['path'], cfg['branch'], out_csv,
-                        "Update Tracker.csv (DESC, last-wins, canonical + location_id/name) from Streamlit",
-                        sha, cfg.get('committer_name'), cfg.get('committer_email'))
-        st.session_state['last_put_status']=put.status_code
-        st.session_state['last_put_text']=put.text
-        if put.status_code not in (200,201):
-            st.error(f"GitHub PUT error {put.status_code}")
-            st.code(put.text)
+        r=save_coalescer().submit(can)
+        if gh_enabled(): _gh_save_status(r, "commit" if _gh_config()['storage']=="dataset" else "PUT")
+    except Exception as e:
+        st.session_state['last_put_status']=getattr(getattr(e, "response", None), "status_code", "-")
+        st.error(f"GitHub error: {e}")
     prog.progress(100, text="Spremanje završeno.")
     st.session_state["tracker_version"] = st.session_state.get("tracker_version", 0) + 1
     st.rerun()
 
-# ---------- Title + header ----------
-df_init, sha_init, etag_init, cfg = load_tracker_and_meta()
-sha_short = (sha_init or "local")[:7] if sha_init else "local"
-branch = (cfg['branch'] if cfg else "local")
-path_remote = (cfg['path'] if cfg else "data/Tracker.csv")
+@st.cache_resource(show_spinner=False)
+def build_timestamp()->str:
+    # jednom po procesu (pokretanje servera), ne na svakom rerunu
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+def _badge_html(sha=None)->str:
+    cfg=gh_config_or_none()   # samo secrets, bez mreže
+    branch=(cfg['branch'] if cfg else "local")
+    path_remote=((cfg['dataset_path'] if cfg['storage']=="dataset" else cfg['path']) if cfg else "data/Tracker.csv")
+    return f"<span class='badge'><span class='badge-dot'></span>{branch} · {path_remote} · @{(sha or 'local')[:7]}</span>"
 
+# ---------- Title + header ----------
 c_title, c_right = st.columns([6,3])
 with c_title:
     st.title("Dobrodošli u aplikaciju za praćenje lokacije rada!")
@@ -364,17 +377,75 @@ with c_right:
         st.session_state["tracker_version"] = st.session_state.get("tracker_version", 0) + 1
         st.toast("Provjeravam GitHub …", icon="🔔")
         st.rerun()
-    st.markdown(f"<span class='badge'><span class='badge-dot'></span>{branch} · {path_remote} · @{sha_short}</span>", unsafe_allow_html=True)
+    badge=st.empty()   # sha se upisuje nakon e-mail gatea, kad se Tracker stvarno dohvati
+    badge.markdown(_badge_html(), unsafe_allow_html=True)
 
 # ---------- Email gate ----------
 email=st.text_input("Unesite svoju eMail adresu").strip().lower()
 if not email: st.stop()
 
-# Base data
-df_emp=load_employees(EMP_FILE)
-row=df_emp[df_emp['eMail_lc']==email]
-if row.empty: st.error("E-mail nije pronađen u popisu djelatnika."); st.stop()
-person=row.iloc[0]; full_name=str(person['Name']); dept=str(person['Department'])
+# ---------- Heavy imports (tek nakon e-mail gatea; funkcije iznad ih koriste samo odavde nadalje) ----------
+import pandas as pd
+
+# utils
+from utils_tracker import (
+    with_parsed_date,
+    dedupe_last_then_sort_desc,
+    apply_canonical_fields,
+    upsert_last_wins,
+    to_compact,
+    memory_report,
+    validate_tracker_schema,
+)
+from utils_csv import read_csv_sniffed, sniff_csv
+from utils_calendar import load_work_calendar
+from utils_locations import BLOCKED, load_location_resolver
+from utils_employees import EMPLOYEE_COLUMNS, EmployeeDirectory, load_employee_directory
+from utils_save import SaveCoalescer
+from utils_charts import ChartCache, location_pie_png
+from utils_analytics import (
+    weekly_locations,
+    refresh_weekly_locations,
+    location_counts,
+    week_window,
+    read_weekly_locations,
+    write_weekly_locations,
+    ORG_UNITS,
+    team_frame,
+    team_location_share,
+    weekly_attendance,
+    remote_quota_breaches,
+    remote_quota_report,
+)
+from utils_store import (
+    read_tracker,
+    read_tracker_dataset,
+    write_tracker_dataset,
+    seed_dataset,
+    list_partitions,
+    dataset_signature,
+    dataset_num_rows,
+    dataset_fingerprint,
+    filter_tracker,
+    append_delta,
+    list_deltas,
+    merge_deltas,
+    compact_deltas,
+)
+
+# ---------- Reference data + Tracker (cache po verziji datoteke / sha) ----------
+CAL = load_work_calendar(HOL_FILE)                     # dani, ISO tjedni, praznici, radni dani: gradi se jednom po verziji datoteke
+HOLIDAYS = CAL.holidays
+LOC_RESOLVER = load_location_resolver(LOC_NORM_FILE)   # kompajlira se jednom po verziji datoteke
+LOC_OPTIONS = LOC_RESOLVER.options
+EMP_DIR=employee_directory(EMP_FILE)
+snap = tracker_snapshot()
+cfg = snap.cfg
+badge.markdown(_badge_html(snap.sha), unsafe_allow_html=True)
+
+person=EMP_DIR.by_email(email)
+if person is None: st.error("E-mail nije pronađen u popisu djelatnika."); st.stop()
+full_name=str(person['Name']); dept=str(person['Department'])
 st.success(f"Pozdrav, **{full_name}** ({dept})!")
 
 # ---------- Admin portal + Debug panel ----------
@@ -405,11 +476,10 @@ with st.expander("🛠️ Admin portal", expanded=False):
         if gh_enabled():
             try:
                 test_path="data/connection_check.txt"; payload=f"OK {datetime.utcnow().isoformat()}Z".encode("utf-8")
-                rget=gh_get_file(cfg['repo'], test_path, cfg['branch'])
-                sha = rget.json().get('sha') if rget.status_code==200 else None
+                sha=gh_client().get_sha(test_path)  # listing direktorija, bez sadržaja datoteke
                 rput=gh_put_file(cfg['repo'], test_path, cfg['branch'], payload, "Connection check from Streamlit",
                                  sha, cfg.get('committer_name'), cfg.get('committer_email'))
-                st.write(f"GET:{rget.status_code} PUT:{rput.status_code} — repo={cfg['repo']} branch={cfg['branch']} path={cfg['path']}")
+                st.write(f"SHA:{(sha or '-')[:7]} PUT:{rput.status_code} — repo={cfg['repo']} branch={cfg['branch']} path={cfg['path']}")
             except Exception as e:
                 st.warning(f"Healthcheck problem: {e}")
         else:
@@ -426,29 +496,33 @@ with st.expander("🛠️ Admin portal", expanded=False):
                 st.success(f"Učitano: {len(df_dbg)} redaka.")
         with dbg_cols[1]:
             if st.button("👁️ Prikaži HEAD/TAIL"):
-                df_dbg = st.session_state.get('debug_tracker', df_init)
+                df_dbg = st.session_state.get('debug_tracker', tracker_snapshot().df)
                 if df_dbg is None: df_dbg = pd.DataFrame()
                 st.write("**HEAD (10)**"); st.dataframe(df_dbg.head(10), width='stretch', hide_index=True)
                 st.write("**TAIL (10)**"); st.dataframe(df_dbg.tail(10), width='stretch', hide_index=True)
         with dbg_cols[2]:
             st.write(f"Last GET: {st.session_state.get('last_get_status','-')} · Last PUT: {st.session_state.get('last_put_status','-')}")
+            sc=save_coalescer().stats
+            st.caption(f"Spremanja u ovom procesu: {sc['saves']} → {sc['flushes']} zapisa ({sc['rows']} redaka)")
+            cc=chart_cache()
+            st.caption(f"Grafovi u cacheu: {len(cc)} · pogodaka {cc.stats['hits']} · crtanja {cc.stats['renders']}")
+        if st.button("🧮 Memorija Trackera (string vs. kompaktno)"):
+            df_mem = tracker_snapshot().df
+            if df_mem.empty: st.info("Tracker je prazan.")
+            else: st.dataframe(memory_report(df_mem), width='stretch')
 
         if 'debug_to_save' in st.session_state and isinstance(st.session_state['debug_to_save'], pd.DataFrame):
             st.markdown("#### Payload za spremanje (preview)")
             st.dataframe(st.session_state['debug_to_save'], width='stretch', hide_index=True)
             if st.button("🧭 Testni merge (bez snimanja)"):
-                existing = st.session_state.get('debug_tracker', df_init).copy()
+                existing = st.session_state.get('debug_tracker', tracker_snapshot().df).copy()
                 test = st.session_state['debug_to_save'].copy()
-                merged = dedupe_last_then_sort_desc(apply_canonical_fields(pd.concat([existing, test], ignore_index=True), source="debug"))
+                merged = upsert_last_wins(existing, apply_canonical_fields(test, source="debug"))
                 st.write("**Preview nakon merge-a (TOP 25, DESC)**")
                 st.dataframe(merged.sort_values("date_iso", ascending=False).head(25), width='stretch', hide_index=True)
 
 # ---------- Weekly entry (unos) ----------
-def weeks_forward_until_year_end(ref:date)->int:
-    year_end=date(ref.year,12,31)
-    start_monday=monday_of_week(ref); end_monday=monday_of_week(year_end)
-    delta_days=(pd.Timestamp(end_monday)-pd.Timestamp(start_monday)).days
-    return max(0, int(delta_days//7))
+def weeks_forward_until_year_end(ref:date)->int: return CAL.weeks_until_year_end(ref)
 
 today=date.today()
 MAX_WEEKS_FWD=weeks_forward_until_year_end(today)
@@ -468,25 +542,21 @@ with cols_nav[4]:
 with cols_nav[5]:
     reset_week = st.button("🧹 Resetiraj tjedan")
 
-week_monday=(pd.Timestamp(today)-pd.Timedelta(days=today.weekday())+pd.Timedelta(weeks=st.session_state.week_offset)).date()
-week_start, week_end = week_bounds(week_monday); week_num=iso_week(week_monday)
-week_year = pd.Timestamp(week_monday).isocalendar().year
+week_monday=monday_of_week(today)+timedelta(weeks=st.session_state.week_offset)
+week_start, week_end = week_bounds(week_monday); week_year, week_num = CAL.iso_week(week_monday)
 st.subheader(f"Tjedan {week_num} ({week_year}) ({week_start.strftime('%d.%m.%Y.')} — {week_end.strftime('%d.%m.%Y.')})")
 
-# Prefill iz Trackera
-df_init, _, _, _ = load_tracker_and_meta()  # refresh
-tracker_all = df_init
+# Prefill iz Trackera (samo ovaj i prošli tjedan, samo za prijavljenog djelatnika)
+snap = tracker_snapshot()
+prev_monday=week_start-timedelta(weeks=1)
+mine_2w=snap.query(columns=["Lokacija"], date_from=prev_monday, date_to=week_end, employee=full_name)
 prefill={}
-if not tracker_all.empty:
-    t=with_parsed_date(normalize_columns(tracker_all.copy()))
-    mask=(t['Ime i prezime']==full_name) & (t['Datum_dt']>=pd.Timestamp(week_start)) & (t['Datum_dt']<=pd.Timestamp(week_end))
-    for _,r in t[mask].iterrows(): prefill[r['Datum_dt'].date()]=str(r['Lokacija'])
-
-if copy_last and not tracker_all.empty:
-    t=with_parsed_date(normalize_columns(tracker_all.copy()))
-    prev_monday=(pd.Timestamp(week_start)-pd.Timedelta(weeks=1)).date()
-    pmask=(t['Ime i prezime']==full_name) & (t['Datum_dt']>=pd.Timestamp(prev_monday)) & (t['Datum_dt']<=pd.Timestamp(prev_monday)+pd.Timedelta(days=6))
-    for _,r in t[pmask].iterrows(): prefill[r['Datum_dt'].date()]=str(r['Lokacija'])
+if not mine_2w.empty:
+    this_wk=mine_2w[mine_2w['Datum_dt']>=pd.Timestamp(week_start)]
+    for d,loc in zip(this_wk['Datum_dt'], this_wk['Lokacija']): prefill[d.date()]=str(loc)
+    if copy_last:
+        prev_wk=mine_2w[mine_2w['Datum_dt']<pd.Timestamp(week_start)]
+        for d,loc in zip(prev_wk['Datum_dt'], prev_wk['Lokacija']): prefill[d.date()]=str(loc)
 if reset_week: prefill={}
 
 admin_override = st.session_state.get('admin_ok', False)
@@ -496,18 +566,17 @@ if locked: st.info("Ovaj tjedan je zaključan za izmjene (admin može override).
 with st.form("unos_tjedan"):
     st.write("**Datum, Dan, Lokacija** — Neradni dani su automatski označeni i nisu promjenjivi.")
     week_rows=[]; remote_count=0; any_empty=False; other_notes={}
-    for i in range(5):
-        d=(pd.Timestamp(week_start)+pd.Timedelta(days=i)).date()
-        day_name=HR_DAYS[i]; hol=HOLIDAYS.get(d)
+    for day in CAL.week_days(week_start)[:len(HR_DAYS)]:
+        d=day.Index; day_name=day.Dan; hol=day.holiday
         c1,c2,c3=st.columns([2,2,3])
         if hol:
-            with c1: st.markdown(f"<div class='hday-cell hday-left'><span class='label-strong'>Datum:</span> {pd.Timestamp(d).strftime('%d.%m.%Y.')}</div>", unsafe_allow_html=True)
+            with c1: st.markdown(f"<div class='hday-cell hday-left'><span class='label-strong'>Datum:</span> {day.Datum}</div>", unsafe_allow_html=True)
             with c2: st.markdown(f"<div class='hday-cell'><span class='label-strong'>Dan:</span> {day_name}</div>", unsafe_allow_html=True)
             with c3: st.markdown(f"<div class='hday-cell hday-right'><span class='label-strong'>Lokacija:</span> {hol}</div>", unsafe_allow_html=True)
             val=hol
         else:
             default=prefill.get(d,"")
-            with c1: st.markdown(f"**Datum:** {pd.Timestamp(d).strftime('%d.%m.%Y.')}")
+            with c1: st.markdown(f"**Datum:** {day.Datum}")
             with c2: st.markdown(f"**Dan:** {day_name}")
             with c3:
                 if locked:
@@ -519,7 +588,7 @@ with st.form("unos_tjedan"):
                         raw=st.text_input("Ručni unos lokacije", value=default if default not in LOC_OPTIONS else "", key=f"free_{d.isoformat()}").strip()
                         if raw:
                             canonical = map_to_canonical(raw)
-                            if canonical == "__BLOCKED__":
+                            if canonical == BLOCKED:
                                 st.warning("Vrijednost 'Neradni dan' nije dopuštena za unos.")
                                 val=""
                             else:
@@ -535,8 +604,8 @@ with st.form("unos_tjedan"):
         if not hol and is_remote_by_catalog(val): remote_count+=1
         if not hol and not locked and not val: any_empty=True
         week_rows.append({
-            "Datum":pd.Timestamp(d).strftime("%d.%m.%Y."),"Dan":day_name,"Ime i prezime":full_name,"Odjel":dept,"Lokacija":val,
-            "Week":pd.Timestamp(d).isocalendar().week,"Month":d.month,"Year":d.year
+            "Datum":day.Datum,"Dan":day_name,"Ime i prezime":full_name,"Odjel":dept,"Lokacija":val,
+            "Week":int(day.iso_week),"Month":int(day.Month),"Year":int(day.Year)
         })
 
     # Debug: prikaži payload prije spremanja
@@ -553,7 +622,7 @@ with st.form("unos_tjedan"):
 
     st.markdown("##### Tjedni sažetak")
     st.dataframe(pd.DataFrame(week_rows)[["Datum","Dan","Lokacija"]], width='stretch', hide_index=True)
-    if remote_count>1:
+    if remote_count>REMOTE_DAYS_PER_WEEK:
         st.warning('Prema internom dogovoru u odjelu Prodaje i marketinga, tjedno je moguće koristiti "Rad od kuće" jedan radni dan.')
 
     submit = st.form_submit_button("💾 Spremi tjedne unose")
@@ -576,34 +645,127 @@ cutoff = last_completed_week_end(date.today())
 st.caption(f"Analitika uključuje zapise **do zaključno s tjednom {iso_week(cutoff)}** "
            f"(do {cutoff.strftime('%d.%m.%Y.')}), ne uključuje tekući tjedan {iso_week(date.today())}.")
 
+def missing_days(employees:tuple, year:int)->pd.DataFrame:
+    """Radni dani (CAL: pon–pet bez praznika) bez ijednog unosa, od 1.1. do cutoffa; jednom po (verziji Trackera, djelatnicima, godini)."""
+    start=date(year,1,1); end=min(cutoff, date(year,12,31))
+    if end<start: return CAL.missing_entries(None, start, start, ())
+    snap=tracker_snapshot()
+    # dijeljeno između sesija: jedan unos po (verzija, djelatnici, razdoblje), stare verzije se izbacuju, najviše MISSING_CACHE_MAX
+    memo=_tracker_cache().setdefault('missing', {}); key=(snap.version, employees, start, end)
+    hit=memo.get(key)
+    if hit is not None: return hit
+    one=employees[0] if len(employees)==1 else None   # jedan djelatnik: upit s pushdownom po imenu
+    rows=snap.query(columns=["Ime i prezime"], date_from=start, date_to=end, employee=one)
+    gaps=CAL.missing_entries(rows, start, end, employees)
+    for k in [k for k in list(memo) if k[0]!=snap.version]: memo.pop(k, None)
+    while len(memo)>=MISSING_CACHE_MAX: memo.pop(next(iter(memo), None), None)
+    memo[key]=gaps
+    return gaps
+
 with st.spinner("Računam osobnu analitiku …"):
-    tracker_df, _, _, _ = load_tracker_and_meta()
-    if not tracker_df.empty:
-        t=with_parsed_date(normalize_columns(tracker_df))
-        mine=t[(t["Ime i prezime"]==full_name) & (t["Godina"]==date.today().year) & (t["Datum_dt"]<=pd.Timestamp(cutoff))]
-        if not mine.empty:
-            counts=mine["Lokacija"].astype(str).map(map_to_canonical).value_counts()
-            total=int(counts.sum())
-            if total>0:
-                fig,ax=plt.subplots(figsize=(5.2,5.2)); wedges,_=ax.pie(counts.values, startangle=90); ax.axis("equal")
-                labels=[f"{n} — {v} ({v/total*100:.1f}%)" for n,v in zip(counts.index, counts.values)]
-                ax.legend(wedges, labels, loc="center left", bbox_to_anchor=(1,0.5)); st.pyplot(fig)
-            else:
-                st.info("Nema spremljenih unosa za prikaz.")
+    snap = tracker_snapshot()
+    if not snap.empty:
+        # materijalizirani tjedni agregat: O(tjedana) redaka, lokacije su već kanonske
+        counts=location_counts(snap.weekly, full_name, date.today().year, through=CAL.iso_week(cutoff))
+        if int(counts.sum())>0:
+            # PNG se crta jednom po (djelatnik, godina, cutoff, verzija podataka) i dijele ga rerun, sesije i PDF export
+            png=personal_chart_png(full_name, date.today().year, cutoff, snap, counts)
+            st.image(png, width=520)
+            if st.button("📄 Pripremi PDF", key="pdf_personal"):
+                from scripts.make_pdf import location_share_pdf   # reportlab tek na zahtjev
+                st.download_button("⬇️ Preuzmi PDF", location_share_pdf(full_name, date.today().year, cutoff, counts, chart_png=png),
+                                   file_name=f"lokacije_{date.today().year}_{full_name}.pdf", mime="application/pdf")
         else: st.info("Nema spremljenih unosa za tekuću godinu u dovršenim tjednima.")
+        gaps=missing_days((full_name,), date.today().year)
+        if not gaps.empty:
+            with st.expander(f"⚠️ Nedostaju unosi za {len(gaps)} radnih dana u dovršenim tjednima"):
+                st.dataframe(gaps[["Datum","Dan","iso_week"]].rename(columns={"iso_week":"Tjedan"}), width='stretch', hide_index=True)
     else: st.info("Još nema podataka u Tracker.csv.")
 
+# ---------- Team analytics (manageri / direktori / admin) ----------
+def team_view()->pd.DataFrame:
+    """Tjedni agregat × popis djelatnika + remote/ured zastavice; računa se jednom po verziji Trackera (dijele sve sesije)."""
+    agg=tracker_snapshot().weekly
+    cache=_tracker_cache(); hit=cache.get('team')
+    if hit and hit[0] is agg and hit[1] is EMP_DIR: return hit[2]
+    team=team_frame(agg, EMP_DIR, LOC_RESOLVER)
+    cache['team']=(agg, EMP_DIR, team)
+    return team
+
+def remote_report(year:int)->pd.DataFrame:
+    """Godišnji pregled rada od kuće iznad pravila, iz sirovih zapisa (vektorizirani remote_mask); jednom po verziji Trackera."""
+    df=tracker_snapshot().df
+    cache=_tracker_cache(); hit=cache.get('remote_report'); key=(year, REMOTE_DAYS_PER_WEEK)
+    if hit and hit[0] is df and hit[1]==key: return hit[2]
+    rep=remote_quota_report(df, LOC_RESOLVER, year, REMOTE_DAYS_PER_WEEK)
+    cache['remote_report']=(df, key, rep)
+    return rep
+
+my_team=set(pd.concat([EMP_DIR.members(manager=full_name), EMP_DIR.members(director=full_name)])["Name"].astype(str).str.strip())
+if admin_override or my_team:
+    st.markdown("---"); st.subheader("👥 Timska analitika")
+    with st.spinner("Računam timsku analitiku …"):
+        team=team_view()
+        if not admin_override: team=team[team["Ime i prezime"].isin(my_team)]
+        if team.empty: st.info("Još nema zapisa za tim.")
+        else:
+            c1,c2,c3=st.columns([1,1,3])
+            with c1: t_year=st.selectbox("Godina", sorted(team["iso_year"].unique().tolist(), reverse=True), key="team_year")
+            with c2: t_kind=st.selectbox("Grupiraj po", list(ORG_UNITS), key="team_kind")
+            by=ORG_UNITS[t_kind]
+            with c3: t_units=st.multiselect("Jedinice (prazno = sve)", sorted(u for u in team[by].unique() if u), key="team_units")
+            view=team[team[by].isin(t_units)] if t_units else team
+            view=view.assign(**{by: view[by].replace("", "—")})
+            tab_share, tab_office, tab_quota, tab_missing = st.tabs(["Udio lokacija", "Dolasci u ured po tjednima",
+                                                                     f"Rad od kuće > {REMOTE_DAYS_PER_WEEK} dan tjedno", "Nedostajući unosi"])
+            with tab_share:
+                share=team_location_share(view, by, t_year).rename(columns={"days":"Dana"})
+                st.dataframe(share.rename_axis(t_kind), width='stretch')
+                st.caption("Udio (%) zabilježenih dana po lokaciji u kalendarskoj godini.")
+            with tab_office:
+                att=weekly_attendance(view, by, t_year)
+                if att.empty: st.info("Nema zapisa za odabranu godinu.")
+                else:
+                    st.line_chart(att.pivot_table(index="iso_week", columns=by, values="office_share"))
+                    st.dataframe(att.rename(columns={by:t_kind,"iso_week":"Tjedan","office_days":"Dana u uredu","days":"Dana",
+                                                     "office_share":"Ured %","wow":"Promjena (pp)"}).drop(columns=["iso_year"]),
+                                 width='stretch', hide_index=True)
+            with tab_quota:
+                br=remote_quota_breaches(view, t_year, quota=REMOTE_DAYS_PER_WEEK)
+                if br.empty: st.success("Nema tjedana iznad dogovorenog broja dana rada od kuće.")
+                else:
+                    st.warning(f"{len(br)} tjedana iznad pravila ({br['Ime i prezime'].nunique()} djelatnika).")
+                    st.dataframe(br.rename(columns={"iso_year":"Godina","iso_week":"Tjedan","Department":"Odjel","remote_days":"Dana od kuće"}),
+                                 width='stretch', hide_index=True)
+                rep=remote_report(int(t_year))
+                rep=rep[rep.index.isin(set(view["Ime i prezime"])) & (rep["weeks_over"]>0)]
+                if not rep.empty:
+                    st.markdown(f"###### Godišnji pregled ({t_year})")
+                    st.dataframe(rep.rename(columns={"weeks":"Tjedana","remote_days":"Dana od kuće","weeks_over":"Tjedana iznad",
+                                                     "days_over":"Dana iznad","max_remote_week":"Najviše u tjednu"}),
+                                 width='stretch')
+            with tab_missing:
+                # očekivani djelatnici iz popisa (i oni bez ijednog zapisa), filtrirani kao i ostatak prikaza
+                staff=EMP_DIR.df if admin_override else EMP_DIR.df[EMP_DIR.df["Name"].astype(str).str.strip().isin(my_team)]
+                if t_units: staff=staff[staff[by].fillna("").astype(str).replace("", "—").isin(t_units)]
+                gaps=missing_days(tuple(sorted(set(staff["Name"].astype(str).str.strip()) - {""})), int(t_year))
+                if gaps.empty: st.success("Svi radni dani do zadnjeg završenog tjedna imaju unos.")
+                else:
+                    per=gaps.groupby("Ime i prezime", sort=False).agg(Dana=("date","size"), Tjedana=("iso_week","nunique"))
+                    st.warning(f"{len(gaps)} radnih dana bez unosa ({len(per)} djelatnika).")
+                    st.dataframe(per.sort_values("Dana", ascending=False, kind="mergesort"), width='stretch')
+
 # ---------- Past records ----------
 st.markdown("---"); st.subheader("📜 Vaši prijašnji zapisi")
 with st.spinner("Učitavam prijašnje zapise …"):
-    tracker_all, _, _, _ = load_tracker_and_meta()
-    if not tracker_all.empty:
-        mine=tracker_all[tracker_all["Ime i prezime"]==full_name].copy()
-        try: mine["_d"]=pd.to_datetime(mine.get("date_iso", mine["Datum"]), errors="coerce"); mine=mine.sort_values("_d", ascending=False).drop(columns="_d")
-        except Exception: pass
-        show=[c for c in ["Datum","Ime i prezime","Odjel","Lokacija","Week","Month","Year","location_id","location_name"] if c in mine.columns]
+    snap = tracker_snapshot()
+    if not snap.empty:
+        cols_past=["Datum","Ime i prezime","Odjel","Lokacija","Week","Month","Year","location_id","location_name"]
+        mine=snap.query(columns=cols_past, employee=full_name)
+        if not mine.empty: mine=mine.sort_values("Datum_dt", ascending=False, kind="mergesort")
+        show=[c for c in cols_past if c in mine.columns]
         if show: st.dataframe(mine[show], width='stretch', hide_index=True)
         else: st.info("Nema podataka za prikaz.")
     else: st.info("Tracker.csv je prazan ili nedostupan.")
 
-st.caption(f"Verzija: {BUILD_VERSION} · Build: {BUILD_TIMESTAMP} · Centralni dnevnik: data/Tracker.csv (DESC + last-wins, canonical, + location_id/name).")
+st.caption(f"Verzija: {BUILD_VERSION} · Build: {build_timestamp()} · Centralni dnevnik: data/Tracker.csv (DESC + last-wins, canonical, + location_id/name).")
@@ -0,0 +1,69 @@
+"""Week/holiday helpers per form rerun (pd.Timestamp arithmetic vs WorkCalendar lookups) and missing-entry detection
+for a team over one year (a per-employee Python loop vs one WorkCalendar.missing_entries grid).
+
+Usage: PYTHONPATH=. python scripts/bench_calendar.py [--employees 400] [--year 2025]
+"""
+import argparse, time
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from utils_calendar import WorkCalendar
+
+HOL_FILE = "data/CroatianHolidays.csv"
+
+def timed(fn, reps=5):
+    best = None
+    for _ in range(reps):
+        t = time.perf_counter(); out = fn(); dt = time.perf_counter() - t
+        best = dt if best is None else min(best, dt)
+    return best, out
+
+def form_old(today, holidays):
+    # the form's previous per-rerun work: week bounds, ISO week/year, 5 day labels with holiday lookups
+    monday = (pd.Timestamp(today) - pd.Timedelta(days=today.weekday())).date()
+    end = (pd.Timestamp(monday) + pd.Timedelta(days=6)).date()
+    week, year = pd.Timestamp(monday).isocalendar().week, pd.Timestamp(monday).isocalendar().year
+    days = [(pd.Timestamp(monday) + pd.Timedelta(days=i)).date() for i in range(5)]
+    return [(pd.Timestamp(d).strftime("%d.%m.%Y."), holidays.get(d), pd.Timestamp(d).isocalendar().week) for d in days], end, week, year
+
+def form_new(today, cal):
+    monday = cal.monday_of(today)
+    year, week = cal.iso_week(monday)
+    return [(r.Datum, r.holiday, r.iso_week) for r in cal.week_days(monday)[:5]], monday + timedelta(days=6), week, year
+
+def missing_loop(df, cal, employees, start, end):
+    work = [d for d in pd.date_range(start, end).date if cal.is_working_day(d)]
+    seen = set(zip(df["Ime i prezime"], pd.to_datetime(df["date_iso"]).dt.date))
+    return [(e, d) for e in employees for d in work if (e, d) not in seen]
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--employees", type=int, default=400)
+    ap.add_argument("--year", type=int, default=2025)
+    args = ap.parse_args()
+    t_build, cal = timed(lambda: WorkCalendar.from_csv(HOL_FILE), reps=3)
+    start, end = date(args.year, 1, 1), date(args.year, 12, 31)
+    employees = [f"Djelatnik {i:04d}" for i in range(args.employees)]
+    # every employee records ~90% of the working days of the year
+    rng = np.random.default_rng(7)
+    work = cal.table.loc[start:end]
+    work = work.index[work["working_day"].to_numpy()]
+    pairs = [(e, d) for e in employees for d in work if rng.random() < 0.9]
+    df = pd.DataFrame(pairs, columns=["Ime i prezime", "date"]).assign(date_iso=lambda t: pd.to_datetime(t["date"]).dt.strftime("%Y-%m-%d"))
+    t_old, _ = timed(lambda: form_old(date(args.year, 12, 24), cal.holidays), reps=200)
+    t_new, _ = timed(lambda: form_new(date(args.year, 12, 24), cal), reps=200)
+    t_loop, a = timed(lambda: missing_loop(df, cal, employees, start, end), reps=3)
+    t_grid, b = timed(lambda: cal.missing_entries(df, start, end, employees), reps=3)
+    same = sorted(a) == sorted(zip(b["Ime i prezime"], b["date"]))
+    rows = [{"task": f"build calendar ({len(cal):,} days)", "old ms": None, "new ms": round(t_build * 1000, 2)},
+            {"task": "form rerun: week + 5 day labels", "old ms": round(t_old * 1000, 3), "new ms": round(t_new * 1000, 3)},
+            {"task": f"missing entries: {args.employees} x {args.year} ({len(b):,} gaps, identical: {same})",
+             "old ms": round(t_loop * 1000, 1), "new ms": round(t_grid * 1000, 1)}]
+    pd.set_option("display.width", 160)
+    print(pd.DataFrame(rows).to_string(index=False))
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
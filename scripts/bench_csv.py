@@ -0,0 +1,54 @@
+"""Benchmark: brute-force read_csv_smart (encodings x separators, python engine) vs read_csv_sniffed.
+
+Usage: PYTHONPATH=. python scripts/bench_csv.py [--rows 200000]
+"""
+import argparse, tempfile, time
+from pathlib import Path
+import pandas as pd
+from utils_csv import read_csv_sniffed, _DIALECT_CACHE
+
+def legacy_read_csv_smart(path, force_sep=None, seps=(",", ";", "\t", "|"), encs=("utf-8","utf-8-sig","cp1250","latin1")):
+    # the previous app.read_csv_smart: full-file charset detection, then python-engine parses until one succeeds
+    enc_detected = None
+    try:
+        from charset_normalizer import from_bytes
+        best = from_bytes(Path(path).read_bytes()).best()
+        enc_detected = best.encoding if best else None
+    except Exception:
+        pass
+    enc_order = [enc_detected] + [e for e in encs if e and (not enc_detected or e.lower() != enc_detected.lower())]
+    for enc in enc_order:
+        if not enc: continue
+        for sep in ([force_sep] if force_sep else list(seps)):
+            try:
+                return pd.read_csv(path, sep=sep, encoding=enc, engine="python")
+            except Exception:
+                continue
+    return pd.read_csv(path, sep=None, engine="python", encoding=enc_detected or "utf-8")
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=200_000)
+    args = ap.parse_args()
+    base = pd.read_csv("data/Tracker.csv", sep=";")
+    big = pd.concat([base] * (args.rows // len(base) + 1), ignore_index=True).head(args.rows)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "Tracker.csv"
+        big.to_csv(path, sep=";", index=False)
+        print(f"{path.stat().st_size / 1e6:.1f} MB, {len(big):,} rows")
+
+        t0 = time.perf_counter(); old = legacy_read_csv_smart(str(path)); t_old = time.perf_counter() - t0
+        t0 = time.perf_counter(); old_sep = legacy_read_csv_smart(str(path), force_sep=";"); t_old_sep = time.perf_counter() - t0
+        _DIALECT_CACHE.clear()
+        t0 = time.perf_counter(); new = read_csv_sniffed(path); t_new = time.perf_counter() - t0
+        t0 = time.perf_counter(); read_csv_sniffed(path); t_cached = time.perf_counter() - t0
+
+        # without force_sep the legacy loop accepts "," first and returns a single column for ";" files
+        print(f"legacy read_csv_smart:           {t_old:7.3f} s  (columns={old.shape[1]})")
+        print(f"legacy read_csv_smart(sep=';'):  {t_old_sep:7.3f} s  (columns={old_sep.shape[1]})")
+        print(f"read_csv_sniffed:                {t_new:7.3f} s  (columns={new.shape[1]}, {t_old_sep / t_new:4.1f}x vs sep=';')")
+        print(f"read_csv_sniffed (dialect hit):  {t_cached:7.3f} s  ({t_old_sep / t_cached:4.1f}x vs sep=';')")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
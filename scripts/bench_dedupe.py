@@ -0,0 +1,44 @@
+"""Last-wins dedupe engines: "sort" (two mergesorts over ISO strings) vs "hash" (groupby-max over integer keys).
+
+Usage: PYTHONPATH=. python scripts/bench_dedupe.py [--rows 200000] [--dup 0.2]
+"""
+import argparse, time
+
+import numpy as np
+import pandas as pd
+
+from utils_store import import_tracker_csv
+from utils_tracker import dedupe_last_then_sort_desc, to_compact
+
+def timed(fn, reps=5):
+    best = None
+    for _ in range(reps):
+        t = time.perf_counter(); out = fn(); dt = time.perf_counter() - t
+        best = dt if best is None else min(best, dt)
+    return best, out
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=200_000)
+    ap.add_argument("--dup", type=float, default=0.2, help="share of rows that re-save an existing (name, date)")
+    args = ap.parse_args()
+    seed = import_tracker_csv("data/Tracker.csv")
+    # distinct (name, date) keys: one synthetic employee per copy of the seed, then re-saves on top
+    copies = args.rows // len(seed) + 1
+    big = pd.concat([seed.assign(**{"Ime i prezime": seed["Ime i prezime"].astype(str) + f" {i}"}) for i in range(copies)],
+                    ignore_index=True).head(args.rows)
+    rng = np.random.default_rng(7)
+    resaves = big.iloc[rng.integers(0, len(big), int(len(big) * args.dup))].assign(updated_at="2099-01-01T00:00:00Z")
+    df = pd.concat([big, resaves], ignore_index=True)
+    rows = []
+    for form, frame in (("string", df), ("compact", to_compact(df))):
+        t_sort, a = timed(lambda: dedupe_last_then_sort_desc(frame, engine="sort"))
+        t_hash, b = timed(lambda: dedupe_last_then_sort_desc(frame, engine="hash"))
+        rows.append({"form": form, "rows in": len(frame), "rows out": len(b), "sort ms": round(t_sort * 1000, 1),
+                     "hash ms": round(t_hash * 1000, 1), "speedup": round(t_sort / t_hash, 2), "identical": a.equals(b)})
+    pd.set_option("display.width", 140)
+    print(pd.DataFrame(rows).to_string(index=False))
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
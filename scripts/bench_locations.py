@@ -0,0 +1,56 @@
+"""Benchmark: per-row map_to_canonical + iterrows canonicalize_rows vs LocationResolver.resolve.
+
+Usage: PYTHONPATH=. python scripts/bench_locations.py [--rows 20000]
+"""
+import argparse, re, time
+import pandas as pd
+from utils_locations import BLOCKED, norm_key, load_location_resolver
+
+def legacy_canonicalize_rows(df_rows, resolver):
+    # the previous app.canonicalize_rows: one regex + NFKD normalization + dict lookup per row via iterrows
+    rows = df_rows.copy()
+    rows["location_name"] = ""
+    rows["location_id"] = ""
+    for idx, r in rows.iterrows():
+        raw = str(r.get("Lokacija", "")).strip()
+        if not raw:
+            canon = ""
+        elif re.search(r"(?i)^neradni\s*dan$", raw):
+            canon = BLOCKED
+        else:
+            canon = resolver.alias_map.get(norm_key(raw), raw)
+        if canon == BLOCKED:
+            rows.at[idx, "Lokacija"] = ""
+        else:
+            rows.at[idx, "Lokacija"] = canon
+            rows.at[idx, "location_name"] = canon
+            rows.at[idx, "location_id"] = resolver.id_map.get(norm_key(canon), "")
+    return rows
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=20_000)
+    args = ap.parse_args()
+    resolver = load_location_resolver("data/Locations_normalized.csv")
+    base = pd.read_csv("data/Tracker.csv", sep=";", usecols=["Ime i prezime", "Lokacija"])
+    big = pd.concat([base] * (args.rows // len(base) + 1), ignore_index=True).head(args.rows)
+    big["Lokacija"] = big["Lokacija"].fillna("").astype(str)
+    print(f"{len(big):,} rows, {big['Lokacija'].nunique()} distinct locations")
+
+    # iterrows + .at is O(rows) Python work per cell; keep --rows modest
+    t0 = time.perf_counter(); big["Lokacija"].map(resolver.canonical).value_counts(); t_map = time.perf_counter() - t0
+    t0 = time.perf_counter(); old = legacy_canonicalize_rows(big, resolver); t_rows = time.perf_counter() - t0
+    resolver._memo.clear()
+    t0 = time.perf_counter(); new = resolver.canonicalize_rows(big); t_new = time.perf_counter() - t0
+    t0 = time.perf_counter(); resolver.resolve(big["Lokacija"]); t_hot = time.perf_counter() - t0
+    cols = ["Lokacija", "location_id", "location_name"]
+    same = (old[cols].astype(str).to_numpy() == new[cols].astype(str).to_numpy()).all()
+
+    print(f"legacy per-row map_to_canonical:   {t_map:7.3f} s")
+    print(f"legacy iterrows canonicalize_rows: {t_rows:7.3f} s")
+    print(f"LocationResolver.canonicalize_rows:{t_new:7.3f} s  ({t_rows / t_new:6.1f}x, identical={same})")
+    print(f"LocationResolver.resolve (memo):   {t_hot:7.3f} s  ({t_map / t_hot:6.1f}x vs per-row map)")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
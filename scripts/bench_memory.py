@@ -0,0 +1,24 @@
+"""Memory report: string-form tracker frame vs the compact schema (utils_tracker.to_compact).
+
+Usage: PYTHONPATH=. python scripts/bench_memory.py [--rows 200000]
+"""
+import argparse
+import pandas as pd
+from utils_store import import_tracker_csv
+from utils_tracker import memory_report
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=200_000)
+    args = ap.parse_args()
+    base = import_tracker_csv("data/Tracker.csv")
+    big = pd.concat([base] * (args.rows // len(base) + 1), ignore_index=True).head(args.rows)
+    rep = memory_report(big)
+    pd.set_option("display.width", 120)
+    print(f"{len(big):,} rows")
+    print(rep.assign(MB=(rep["bytes"] / 1e6).round(2), compact_MB=(rep["compact_bytes"] / 1e6).round(2))
+             [["dtype", "MB", "compact_dtype", "compact_MB", "ratio"]])
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,79 @@
+"""Time / memory profile of the load and save paths, and how many full normalize_columns passes each stage runs.
+
+Stages: CSV import -> parsed dates -> compact (load); canonical fields for 50 users' weeks -> coalesced merge ->
+delta write -> last-wins upsert into the history (save); full dedupe of the history (compaction / CI).
+Peak memory is tracemalloc's (NumPy and Python objects; Arrow-backed strings live in Arrow's pool and are not counted).
+
+Usage: PYTHONPATH=. python scripts/bench_normalize.py [--rows 200000] [--users 50]
+"""
+import argparse, tempfile, time, tracemalloc
+from datetime import date, timedelta
+
+import pandas as pd
+
+import utils_tracker
+from utils_store import append_delta, export_tracker_csv, import_tracker_csv
+from utils_tracker import (apply_canonical_fields, dedupe_last_then_sort_desc, to_compact, upsert_last_wins,
+                           with_parsed_date)
+
+HR_DAYS = ["Ponedjeljak", "Utorak", "Srijeda", "Četvrtak", "Petak"]
+PASSES = [0]
+
+def _counting(fn):
+    def wrapper(df):
+        # a full pass = the input is not already stamped (is_normalized does not exist before the marker)
+        if not getattr(utils_tracker, "is_normalized", lambda _: False)(df):
+            PASSES[0] += 1
+        return fn(df)
+    return wrapper
+
+utils_tracker.normalize_columns = _counting(utils_tracker.normalize_columns)
+
+def week_rows(user: int) -> pd.DataFrame:
+    monday = date(2025, 9, 1)
+    days = [monday + timedelta(days=i) for i in range(5)]
+    return pd.DataFrame({"Datum": [d.strftime("%d.%m.%Y.") for d in days], "Dan": HR_DAYS,
+                         "Ime i prezime": f"Bench User {user:02d}", "Lokacija": "Ured"})
+
+def stage(label, fn, out):
+    """Timed without tracing; peak memory from a second, traced run (tracemalloc slows small allocations a lot)."""
+    PASSES[0] = 0
+    t = time.perf_counter()
+    res = fn()
+    dt = time.perf_counter() - t
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    out.append({"stage": label, "ms": round(dt * 1000, 1), "peak MB": round(peak / 1e6, 1), "normalize passes": PASSES[0] // 2})
+    return res
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=200_000)
+    ap.add_argument("--users", type=int, default=50)
+    args = ap.parse_args()
+    seed = import_tracker_csv("data/Tracker.csv")
+    big = pd.concat([seed] * (args.rows // len(seed) + 1), ignore_index=True).head(args.rows)
+    out = []
+    with tempfile.TemporaryDirectory() as tmp:
+        csv = f"{tmp}/Tracker.csv"
+        export_tracker_csv(big, csv)
+        base = stage("load: import_tracker_csv", lambda: import_tracker_csv(csv, sep=";"), out)
+        parsed = stage("load: with_parsed_date", lambda: with_parsed_date(base), out)
+        stage("load: to_compact", lambda: to_compact(parsed), out)
+        saves = [week_rows(i) for i in range(args.users)]
+        can = stage(f"save: apply_canonical_fields x{args.users}",
+                    lambda: [apply_canonical_fields(r, source="app") for r in saves], out)
+        merged = stage("save: coalesced merge", lambda: dedupe_last_then_sort_desc(
+            getattr(utils_tracker, "concat_normalized", lambda f: pd.concat(f, ignore_index=True))(can)), out)
+        stage("save: append_delta", lambda: append_delta(merged, tmp), out)
+        stage("read: upsert_last_wins into history", lambda: upsert_last_wins(base, merged), out)
+        stage("compaction: dedupe history", lambda: dedupe_last_then_sort_desc(base), out)
+    pd.set_option("display.width", 140)
+    print(f"{len(big):,} history rows, {args.users} saves")
+    print(pd.DataFrame(out).to_string(index=False))
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
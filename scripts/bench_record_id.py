@@ -0,0 +1,46 @@
+"""Benchmark: per-row record_id (apply axis=1) vs batched new_record_ids on a synthetic tracker.
+
+Usage: PYTHONPATH=. python scripts/bench_record_id.py [--rows 500000]
+"""
+import argparse, time
+import numpy as np
+import pandas as pd
+from utils_tracker import new_record_id, new_record_ids, _record_id_for_key
+
+def synthetic_tracker(rows: int, employees: int = 300, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    names = np.array([f"Djelatnik {i:04d}" for i in range(employees)], dtype=object)
+    days = pd.date_range("2019-01-01", periods=rows // employees + 1, freq="D").strftime("%Y-%m-%d").to_numpy()
+    return pd.DataFrame({
+        "Ime i prezime": names[rng.integers(0, employees, rows)],
+        "date_iso": days[rng.integers(0, len(days), rows)],
+    })
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=500_000)
+    args = ap.parse_args()
+    df = synthetic_tracker(args.rows)
+    print(f"rows={len(df):,} distinct keys={len(df.drop_duplicates()):,}")
+
+    t0 = time.perf_counter()
+    old = df.apply(lambda r: new_record_id(str(r.get("Ime i prezime","")), str(r.get("date_iso",""))), axis=1)
+    t_old = time.perf_counter() - t0
+
+    _record_id_for_key.cache_clear()
+    t0 = time.perf_counter()
+    new = new_record_ids(df["Ime i prezime"], df["date_iso"])
+    t_cold = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    new_record_ids(df["Ime i prezime"], df["date_iso"])
+    t_warm = time.perf_counter() - t0
+
+    assert (old.to_numpy() == new).all()
+    print(f"apply(axis=1):        {t_old:8.3f} s")
+    print(f"new_record_ids cold:  {t_cold:8.3f} s  ({t_old / t_cold:5.1f}x)")
+    print(f"new_record_ids warm:  {t_warm:8.3f} s  ({t_old / t_warm:5.1f}x)")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
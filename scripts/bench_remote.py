@@ -0,0 +1,47 @@
+"""Remote-day classification over a full tracker: per-cell is_remote_by_catalog vs LocationResolver.remote_mask.
+
+Usage: PYTHONPATH=. python scripts/bench_remote.py [--rows 200000]
+"""
+import argparse, time
+
+import numpy as np
+import pandas as pd
+
+from utils_analytics import remote_quota_report
+from utils_locations import BLOCKED, load_location_resolver
+from utils_tracker import is_remote_value, to_compact
+
+VALUES = ["Špansko", "Vukovina", "Rad od kuće", "home office", "WFH", "Poslovni put", "Godišnji odmor", "Neradni dan",
+          "doma", "ured IC", "", None]
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=200_000)
+    args = ap.parse_args()
+    r = load_location_resolver("data/Locations_normalized.csv")
+    rng = np.random.default_rng(7)
+    locs = pd.Series(np.array(VALUES, dtype=object)[rng.integers(0, len(VALUES), args.rows)])
+
+    def per_cell(v):   # app.is_remote_by_catalog before vectorization
+        if not v: return False
+        canon = r.canonical(v)
+        return canon != BLOCKED and (r.type_of(canon) == "REMOTE" or is_remote_value(canon))
+
+    t = time.perf_counter(); legacy = [per_cell(v) for v in locs]; t_legacy = time.perf_counter() - t
+    r._memo.clear()
+    t = time.perf_counter(); mask = r.remote_mask(locs); t_vec = time.perf_counter() - t
+    print(f"{args.rows:,} rows, {locs.nunique(dropna=False)} distinct values")
+    print(f"per-cell is_remote_by_catalog: {t_legacy:7.3f} s")
+    print(f"remote_mask:                   {t_vec:7.3f} s  ({t_legacy / t_vec:.0f}x, identical={mask.tolist() == legacy})")
+
+    days = pd.bdate_range("2025-01-01", "2025-12-31")
+    employees = max(1, args.rows // len(days))
+    df = to_compact(pd.DataFrame({"Ime i prezime": np.repeat([f"Djelatnik {i:04d}" for i in range(employees)], len(days)),
+                                  "date_iso": np.tile(days.strftime("%Y-%m-%d"), employees),
+                                  "Lokacija": locs.to_numpy()[:employees * len(days)]}))
+    t = time.perf_counter(); rep = remote_quota_report(df, r, 2025, quota=1); t_rep = time.perf_counter() - t
+    print(f"remote_quota_report (2025, {employees} employees): {t_rep:.3f} s, {int((rep['weeks_over'] > 0).sum())} over quota")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
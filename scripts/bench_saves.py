@@ -0,0 +1,106 @@
+"""Friday burst: N users saving their week within a few seconds, against the in-process GitHub stub (tests/conftest.py).
+
+Compares the old full-file path (GET Tracker.csv -> merge -> PUT with sha, re-merge on 409), one delta commit
+per save (GitHubDataset.append_delta) and the same commits batched by utils_save.SaveCoalescer.
+
+Usage: PYTHONPATH=. python scripts/bench_saves.py [--users 50] [--spread 2.0] [--latency 0.05] [--window 0.5]
+"""
+import argparse, random, threading, time
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from tests.conftest import FakeGitHub
+from utils_github import GitHubClient, GitHubDataset
+from utils_save import SaveCoalescer
+from utils_store import export_tracker_csv, import_tracker_csv
+from utils_tracker import apply_canonical_fields, dedupe_last_then_sort_desc, upsert_last_wins
+
+TRACKER = "data/Tracker.csv"
+HR_DAYS = ["Ponedjeljak", "Utorak", "Srijeda", "Četvrtak", "Petak"]
+
+def week_rows(user: int) -> pd.DataFrame:
+    monday = date(2025, 9, 1)
+    days = [monday + timedelta(days=i) for i in range(5)]
+    return apply_canonical_fields(pd.DataFrame({
+        "Datum": [d.strftime("%d.%m.%Y.") for d in days], "Dan": HR_DAYS,
+        "Ime i prezime": f"Bench User {user:02d}", "Lokacija": random.choice(["Ured", "Teren", "Rad od kuće"]),
+    }), source="app")
+
+def full_file_save(client: GitHubClient, rows: pd.DataFrame):
+    parse = lambda b: import_tracker_csv(b, source="gh", sep=";")
+    def payload(frame):
+        return export_tracker_csv(upsert_last_wins(frame, rows)).encode("utf-8")
+    def on_conflict(_sha):
+        frame, _, _, _ = client.fetch_frame("data/Tracker.csv", parse)
+        return payload(frame)
+    frame, sha, _, _ = client.fetch_frame("data/Tracker.csv", parse)
+    return client.put_file("data/Tracker.csv", payload(frame), "save", sha=sha, on_conflict=on_conflict)
+
+def run(name, srv, save, users, spread):
+    """Starts each user at a random offset in [0, spread); returns one result row."""
+    random.seed(7)
+    offsets = sorted(random.uniform(0, spread) for _ in range(users))
+    frames = [week_rows(i) for i in range(users)]
+    lat, failed = [None] * users, [0]
+    srv.log.clear()
+    t0 = time.perf_counter()
+    def user(i):
+        time.sleep(max(0.0, t0 + offsets[i] - time.perf_counter()))
+        start = time.perf_counter()
+        try:
+            r = save(frames[i])
+            ok = r is not None and r.status_code in (200, 201)
+        except Exception:
+            ok = False
+        lat[i] = time.perf_counter() - start
+        if not ok: failed[0] += 1
+    threads = [threading.Thread(target=user, args=(i,)) for i in range(users)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    wall = time.perf_counter() - t0
+    writes = sum(1 for m, _, _ in srv.log if m in ("PUT", "PATCH"))
+    return {"path": name, "saves/s": round(users / wall, 1), "p50 s": round(float(np.percentile(lat, 50)), 3),
+            "p95 s": round(float(np.percentile(lat, 95)), 3), "failed": failed[0], "requests": len(srv.log), "ref/PUT writes": writes}
+
+def stub(latency: float) -> FakeGitHub:
+    srv = FakeGitHub()
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    srv.latency = latency
+    return srv
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--users", type=int, default=50)
+    ap.add_argument("--spread", type=float, default=2.0, help="seconds over which the saves arrive")
+    ap.add_argument("--latency", type=float, default=0.05, help="stub round trip per request, seconds")
+    ap.add_argument("--window", type=float, default=0.5, help="SaveCoalescer window, seconds")
+    args = ap.parse_args()
+    base = import_tracker_csv(TRACKER, sep=";")
+    out = []
+
+    srv = stub(args.latency)
+    srv.push({"data/Tracker.csv": export_tracker_csv(base).encode("utf-8")})
+    client = GitHubClient("t", "o/r", base_url=srv.url)
+    out.append(run("full-file PUT", srv, lambda rows: full_file_save(client, rows), args.users, args.spread))
+    srv.shutdown()
+
+    for name, coalesce in (("delta commit per save", False), ("coalesced delta commit", True)):
+        srv = stub(0.0)
+        ds = GitHubDataset(GitHubClient("t", "o/r", base_url=srv.url))
+        ds.write_rows(dedupe_last_then_sort_desc(base), "seed")
+        srv.latency = args.latency
+        save = lambda rows: ds.append_delta(rows, "save")
+        if coalesce:
+            save = SaveCoalescer(save, window=args.window).submit
+        out.append(run(name, srv, save, args.users, args.spread))
+        srv.shutdown()
+
+    pd.set_option("display.width", 140)
+    print(f"{args.users} users within {args.spread}s, stub latency {args.latency * 1000:.0f} ms/request")
+    print(pd.DataFrame(out).to_string(index=False))
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,48 @@
+"""validate_tracker_schema on a large canonical history (string and compact form) and on one app save batch.
+
+The record_id check hashes every distinct (name, date) pair, so it dominates on histories of distinct keys;
+run with --no-ids to see the cost of the remaining checks.
+
+Usage: PYTHONPATH=. python scripts/bench_schema.py [--rows 1000000] [--no-ids]
+"""
+import argparse, time
+
+import pandas as pd
+
+from utils_calendar import read_holidays
+from utils_locations import load_location_resolver
+from utils_store import import_tracker_csv
+from utils_tracker import to_compact, validate_tracker_schema, with_parsed_date
+
+def timed(fn, reps=3):
+    best = None
+    for _ in range(reps):
+        t = time.perf_counter(); out = fn(); dt = time.perf_counter() - t
+        best = dt if best is None else min(best, dt)
+    return best, out
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=1_000_000)
+    ap.add_argument("--no-ids", action="store_true", help="drop record_id (skips the uuid5 check)")
+    args = ap.parse_args()
+    ids = load_location_resolver("data/Locations_normalized.csv").catalog["location_id"]
+    holidays = read_holidays("data/CroatianHolidays.csv")
+    seed = import_tracker_csv("data/Tracker.csv")
+    # distinct (name, date) keys: one synthetic employee per copy of the seed
+    copies = args.rows // len(seed) + 1
+    big = pd.concat([seed.assign(**{"Ime i prezime": seed["Ime i prezime"].astype(str) + f" {i}"}) for i in range(copies)],
+                    ignore_index=True).head(args.rows)
+    if args.no_ids:
+        big = big.drop(columns=["record_id"])
+    rows = []
+    for label, frame in (("history (string)", big), ("history (compact)", to_compact(with_parsed_date(big))),
+                         ("save batch (5 rows)", big.head(5))):
+        dt, issues = timed(lambda: validate_tracker_schema(frame, ids, holidays))
+        rows.append({"frame": label, "rows": len(frame), "ms": round(dt * 1000, 1), "issues": len(issues)})
+    pd.set_option("display.width", 140)
+    print(pd.DataFrame(rows).to_string(index=False))
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,43 @@
+"""Cold start of app.py: first render (up to the e-mail gate) and the render after the e-mail, in fresh processes.
+
+Each run is a new interpreter (nothing cached), driven by streamlit.testing.AppTest in local mode (no GITHUB secrets).
+Also lists which heavy modules were already imported when the gate was shown.
+
+Usage: PYTHONPATH=. python scripts/bench_startup.py [--runs 3] [--email vcorak@intercars.eu]
+"""
+import argparse, json, statistics, subprocess, sys
+
+HEAVY = ["matplotlib", "requests", "reportlab", "charset_normalizer", "pyarrow.parquet"]
+
+PROBE = r"""
+import json, sys, time
+t0 = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+t_import = time.perf_counter() - t0
+at = AppTest.from_file("app.py", default_timeout=120)
+t = time.perf_counter(); at.run(); t_gate = time.perf_counter() - t
+loaded = [m for m in HEAVY if m in sys.modules]
+t = time.perf_counter(); at.text_input[0].input(EMAIL).run(); t_user = time.perf_counter() - t
+print(json.dumps({"streamlit import": t_import, "gate render": t_gate, "render after e-mail": t_user,
+                  "loaded at gate": loaded, "errors": [str(e.value) for e in at.exception]}))
+"""
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runs", type=int, default=3)
+    ap.add_argument("--email", default="vcorak@intercars.eu")
+    args = ap.parse_args()
+    code = f"HEAVY = {HEAVY!r}\nEMAIL = {args.email!r}\n" + PROBE
+    runs = []
+    for _ in range(args.runs):
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+        runs.append(json.loads(out.strip().splitlines()[-1]))
+    for key in ("streamlit import", "gate render", "render after e-mail"):
+        print(f"{key:<22} median {statistics.median(r[key] for r in runs) * 1000:7.0f} ms")
+    print(f"heavy modules loaded at the gate: {', '.join(runs[-1]['loaded at gate']) or '-'}")
+    if runs[-1]["errors"]:
+        print("app exceptions:", runs[-1]["errors"])
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
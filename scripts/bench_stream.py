@@ -0,0 +1,55 @@
+"""CSV -> deduped Tracker.parquet: in-memory (import_tracker_csv + write_tracker_parquet) vs streamed
+(iter_normalized_months + TrackerParquetWriter). Each run is a fresh process, so peak RSS covers Arrow memory too.
+
+Usage: PYTHONPATH=. python scripts/bench_stream.py [--rows 500000] [--chunk-rows 100000]
+"""
+import argparse, json, resource, subprocess, sys, tempfile, time
+
+import pandas as pd
+
+from utils_store import (CHUNK_ROWS, TrackerParquetWriter, export_tracker_csv, import_tracker_csv,
+                         iter_normalized_months, write_tracker_parquet)
+
+def run(mode: str, csv: str, out: str, chunk_rows: int) -> dict:
+    t = time.perf_counter()
+    if mode == "memory":
+        write_tracker_parquet(import_tracker_csv(csv, source="ci"), out)
+    else:
+        with TrackerParquetWriter(out) as w:
+            for _, _, rows in iter_normalized_months(csv, source="ci", chunk_rows=chunk_rows):
+                w.write(rows)
+    return {"mode": mode, "s": round(time.perf_counter() - t, 2),
+            "peak RSS MB": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024)}   # Linux: KiB
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=500_000)
+    ap.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    ap.add_argument("--run", nargs=3, metavar=("MODE", "CSV", "OUT"), help=argparse.SUPPRESS)
+    args = ap.parse_args()
+    if args.run:
+        print(json.dumps(run(*args.run, args.chunk_rows)))
+        return 0
+    seed = import_tracker_csv("data/Tracker.csv")
+    # distinct employees per copy of the seed, plus 10% re-saves so the dedupe has work to do
+    copies = args.rows // len(seed) + 1
+    big = pd.concat([seed.assign(**{"Ime i prezime": seed["Ime i prezime"].astype(str) + f" {i}"}) for i in range(copies)],
+                    ignore_index=True).head(args.rows)
+    big = pd.concat([big, big.sample(frac=0.1, random_state=7).assign(updated_at="2099-01-01T00:00:00Z")], ignore_index=True)
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        export_tracker_csv(big, f"{tmp}/Tracker.csv")
+        del big, seed
+        for mode in ("memory", "stream"):
+            out = subprocess.run([sys.executable, __file__, "--chunk-rows", str(args.chunk_rows),
+                                  "--run", mode, f"{tmp}/Tracker.csv", f"{tmp}/{mode}.parquet"],
+                                 capture_output=True, text=True, check=True).stdout
+            rows.append(json.loads(out.strip().splitlines()[-1]))
+        a, b = pd.read_parquet(f"{tmp}/memory.parquet"), pd.read_parquet(f"{tmp}/stream.parquet")
+        same = a.drop(columns=["created_at", "updated_at"]).equals(b.drop(columns=["created_at", "updated_at"]))
+    print(f"{args.rows:,} rows + 10% re-saves, chunks of {args.chunk_rows:,}; identical output: {same}")
+    print(pd.DataFrame(rows).to_string(index=False))
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
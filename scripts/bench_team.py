@@ -0,0 +1,64 @@
+"""Team dashboard pipeline on a synthetic year: N employees x 52 weeks x 5 days.
+
+Times the weekly aggregate build (once per tracker version), the join with the employee directory and the
+three team reports (location share, weekly office attendance, remote-quota breaches).
+
+Usage: PYTHONPATH=. python scripts/bench_team.py [--employees 400] [--year 2025]
+"""
+import argparse, time
+
+import numpy as np
+import pandas as pd
+
+from utils_analytics import remote_quota_breaches, team_frame, team_location_share, weekly_attendance, weekly_locations
+from utils_employees import EmployeeDirectory, normalize_employees
+from utils_locations import load_location_resolver
+from utils_tracker import to_compact
+
+LOCATIONS = ["Špansko", "Vukovina", "Rad od kuće", "Poslovni put", "Poslovnica", "Godišnji odmor", "ured IC", "home office"]
+
+def synthetic(employees: int, year: int):
+    rng = np.random.default_rng(7)
+    names = [f"Djelatnik {i:04d}" for i in range(employees)]
+    directory = EmployeeDirectory(normalize_employees(pd.DataFrame({
+        "Name": names, "Department": [f"Odjel {i % 12}" for i in range(employees)],
+        "eMail": [f"d{i}@example.com" for i in range(employees)],
+        "Manager": [f"Manager {i % 40}" for i in range(employees)], "Director": [f"Direktor {i % 4}" for i in range(employees)],
+    })))
+    days = pd.bdate_range(f"{year}-01-01", f"{year}-12-31")
+    n = len(days) * employees
+    df = pd.DataFrame({
+        "Ime i prezime": np.repeat(names, len(days)),
+        "date_iso": np.tile(days.strftime("%Y-%m-%d"), employees),
+        "Lokacija": np.array(LOCATIONS)[rng.choice(len(LOCATIONS), n, p=[.3, .2, .2, .1, .08, .06, .03, .03])],
+    })
+    return to_compact(df), directory
+
+def timed(label, fn, reps=3):
+    best = None
+    for _ in range(reps):
+        t = time.perf_counter(); out = fn(); dt = time.perf_counter() - t
+        best = dt if best is None else min(best, dt)
+    print(f"{label:<34} {best * 1000:8.1f} ms")
+    return out
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--employees", type=int, default=400)
+    ap.add_argument("--year", type=int, default=2025)
+    args = ap.parse_args()
+    resolver = load_location_resolver("data/Locations_normalized.csv")
+    df, directory = synthetic(args.employees, args.year)
+    print(f"{len(df):,} tracker rows, {args.employees} employees, {len(directory.units('Department'))} departments")
+    agg = timed("weekly aggregate (per tracker sha)", lambda: weekly_locations(df, resolver))
+    team = timed("join directory + remote/office flags", lambda: team_frame(agg, directory, resolver))
+    t = time.perf_counter()
+    for by in ("Department", "Manager", "Director"):
+        team_location_share(team, by, args.year); weekly_attendance(team, by, args.year)
+    br = remote_quota_breaches(team, args.year)
+    print(f"{'reports (3 org levels + quota)':<34} {(time.perf_counter() - t) * 1000:8.1f} ms")
+    print(f"{len(agg):,} weekly rows; {len(br):,} (employee, week) over the remote quota")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
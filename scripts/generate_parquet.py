@@ -1,10 +1,35 @@
+"""Builds data/Tracker.parquet, the Year/Month dataset under data/tracker/ and its weekly location aggregate.
 
-import pandas as pd, pyarrow as pa, pyarrow.parquet as pq
-from utils_tracker import dedupe_last_then_sort_desc, apply_canonical_fields
+Tracker.csv is streamed (utils_store.iter_normalized_months): one month is in memory at a time, and every month
+goes to the single file, to its partition and to the aggregate before the next one is read.
 
-df = pd.read_csv('data/Tracker.csv', sep=None, engine='python')
-df = apply_canonical_fields(df, source='ci')
-df = dedupe_last_then_sort_desc(df)
-table = pa.Table.from_pandas(df)
-pq.write_table(table, 'data/Tracker.parquet')
-print('Wrote data/Tracker.parquet')
+Usage: python scripts/generate_parquet.py [--chunk-rows 100000]
+"""
+import argparse
+
+from utils_analytics import combine_weekly_locations, weekly_locations, write_weekly_locations
+from utils_locations import load_location_resolver
+from utils_store import (CHUNK_ROWS, TrackerParquetWriter, dataset_fingerprint, from_arrow_table, iter_normalized_months,
+                         partition_path, prune_dataset, write_tracker_parquet)
+
+WEEKLY_INPUT = ["Ime i prezime", "Lokacija", "date_iso"]
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help="CSV rows parsed per chunk")
+    args = ap.parse_args()
+    resolver = load_location_resolver('data/Locations_normalized.csv')
+    parts, weekly = [], []
+    with TrackerParquetWriter('data/Tracker.parquet') as single:
+        for y, m, table in iter_normalized_months('data/Tracker.csv', source='ci', chunk_rows=args.chunk_rows):
+            single.write(table)
+            parts.append(write_tracker_parquet(table, partition_path('data/tracker', y, m)))
+            weekly.append(weekly_locations(from_arrow_table(table.select(WEEKLY_INPUT), compact=True), resolver))
+    prune_dataset('data/tracker', parts)
+    agg = combine_weekly_locations(weekly)
+    write_weekly_locations(agg, 'data/tracker', dataset_fingerprint('data/tracker'))
+    print(f'Wrote data/Tracker.parquet ({single.rows} rows), {len(parts)} partitions and {len(agg)} weekly location rows under data/tracker/')
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,17 +1,17 @@
-
-from reportlab.lib.pagesizes import A4
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image
 import io
 
 def make_simple_pdf(title:str, table_rows:list[list[str]], chart_png:bytes|None=None)->bytes:
+    # reportlab se uvozi tek kad se PDF stvarno gradi (import ovog modula ostaje jeftin)
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib import colors
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image
     buf=io.BytesIO()
     doc=SimpleDocTemplate(buf, pagesize=A4, rightMargin=36,leftMargin=36, topMargin=36, bottomMargin=36)
     styles=getSampleStyleSheet()
     elems=[Paragraph(title, styles['Title']), Spacer(1,12)]
     if chart_png:
-        img=Image(io.BytesIO(chart_png), width=400, height=300)
+        img=Image(io.BytesIO(chart_png), width=400, height=300, kind="proportional")
         elems.append(img); elems.append(Spacer(1,12))
     if table_rows:
         t=Table(table_rows)
@@ -21,3 +21,12 @@ def make_simple_pdf(title:str, table_rows:list[list[str]], chart_png:bytes|None=
         elems.append(t)
     doc.build(elems)
     return buf.getvalue()
+
+def location_share_pdf(employee:str, year:int, cutoff, counts, chart_png:bytes|None=None)->bytes:
+    """Osobni "udio lokacija": tablica + isti PNG kao u aplikaciji (utils_charts); crta se samo ako chart_png nije dan."""
+    from utils_charts import location_pie_png
+    counts=counts[counts>0]
+    if chart_png is None and len(counts): chart_png=location_pie_png(counts)
+    total=int(counts.sum())
+    rows=[["Lokacija","Dana","Udio"]]+[[str(n), str(int(v)), f"{v/total*100:.1f}%"] for n,v in counts.items()]
+    return make_simple_pdf(f"{employee} — lokacije rada {year} (do {cutoff:%d.%m.%Y.})", rows if total else [], chart_png)
@@ -0,0 +1,170 @@
+"""Month-end PDF reports: one per employee plus one per department, rendered in parallel and streamed into a zip.
+
+Tables and chart data for every employee and department come from one vectorized pass over the month's tracker
+rows; worker processes only draw the chart (utils_charts) and build the PDF (make_pdf.make_simple_pdf). At most
+--inflight documents are pending at a time and each is written to the zip as soon as it arrives, so only the
+precomputed tables are held for every report; rendered PDFs never pile up in memory.
+
+Usage: PYTHONPATH=. python scripts/make_reports.py [--month 2025-09] [--tracker data/tracker] [--out reports_2025-09.zip]
+                                                   [--workers 4] [--inflight 8]
+"""
+import argparse, os, re, resource, time, zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from scripts.make_pdf import make_simple_pdf
+from utils_analytics import OFFICE_TYPES
+from utils_charts import location_pie_png
+from utils_employees import load_employee_directory
+from utils_locations import load_location_resolver
+from utils_store import list_partitions, read_tracker, read_tracker_dataset
+from utils_tracker import WEEKDAY_NAMES, parse_date_flexible
+
+EMP_FILE = "data/Popis_djelatnika_HR_Sales.csv"
+LOC_FILE = "data/Locations_normalized.csv"
+NO_DEPARTMENT = "(bez odjela)"
+
+def month_bounds(month: str) -> tuple:
+    """'YYYY-MM' -> (first day, last day)."""
+    first = date.fromisoformat(f"{month}-01")
+    return first, (first.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+
+def load_month(tracker, start: date, end: date) -> pd.DataFrame:
+    """Tracker rows of [start, end] from a partitioned dataset directory or a Tracker.csv/.parquet file."""
+    cols = ["Ime i prezime", "Lokacija", "date_iso"]
+    path = Path(tracker)
+    if path.is_dir():
+        return read_tracker_dataset(path, cols, start, end, compact=True)
+    return read_tracker(path, cols, start, end)
+
+def _days(df: pd.DataFrame) -> pd.Series:
+    d = df["date_iso"]
+    return d if pd.api.types.is_datetime64_any_dtype(d) else parse_date_flexible(d)
+
+def _file_name(s: str) -> str:
+    return re.sub(r"[^\w.-]+", "_", s).strip("_") or "_"
+
+def _file_names(labels) -> list:
+    """_file_name per label, kept distinct (case-insensitively): later collisions get _2, _3, ... in input order."""
+    used, out = set(), []
+    for label in labels:
+        base = name = _file_name(label)
+        n = 1
+        while name.casefold() in used:
+            n += 1
+            name = f"{base}_{n}"
+        used.add(name.casefold())
+        out.append(name)
+    return out
+
+def _count_items(row: pd.Series) -> tuple:
+    row = row[row > 0].sort_values(ascending=False, kind="mergesort")
+    return tuple(zip(row.index, row.to_numpy().tolist()))
+
+def report_jobs(df: pd.DataFrame, directory, resolver, month: str):
+    """
+    Yields (arcname, title, table_rows, location_counts) per employee with entries in `month`, then per department
+    (all directory members, zero days included). Everything is computed up front in a few vectorized steps.
+    """
+    if df is None or df.empty:
+        return
+    # missing names go before astype(str) (pandas<3 turns them into "nan"); "nan" text from older exports goes below
+    df = df.dropna(subset=["Ime i prezime"])
+    res = resolver.resolve(df["Lokacija"])
+    t = pd.DataFrame({"Ime i prezime": df["Ime i prezime"].astype(str).str.strip(), "dt": _days(df),
+                      "Lokacija": res["Lokacija"].astype(str),
+                      "office": res["location_type"].isin(OFFICE_TYPES).to_numpy(),
+                      "remote": resolver.remote_mask(df["Lokacija"]).to_numpy()}, index=df.index)
+    t = t[(t["Lokacija"] != "") & t["dt"].notna() & ~t["Ime i prezime"].str.lower().isin(["", "nan"])]
+    t = t.sort_values(["Ime i prezime", "dt"], kind="mergesort", ignore_index=True)
+    if t.empty:
+        return
+
+    # per employee: daily rows as one string matrix, split at name boundaries; location counts as one crosstab
+    cells = np.column_stack([t["dt"].dt.strftime("%d.%m.%Y.").to_numpy(dtype=object),
+                             np.array(WEEKDAY_NAMES, dtype=object)[t["dt"].dt.dayofweek.to_numpy()],
+                             t["Lokacija"].to_numpy(dtype=object)])
+    names, first = np.unique(t["Ime i prezime"].to_numpy(dtype=object), return_index=True)
+    bounds = np.append(first, len(t))
+    per_emp = pd.crosstab(t["Ime i prezime"], t["Lokacija"])
+    for i, (name, file) in enumerate(zip(names, _file_names(names))):
+        rows = [["Datum", "Dan", "Lokacija"]] + cells[bounds[i]:bounds[i + 1]].tolist()
+        yield (f"djelatnici/{file}.pdf", f"{name} — lokacije rada {month}", rows,
+               _count_items(per_emp.loc[name]))
+
+    # per department: every directory member (0 days when nothing was recorded) + employees missing from it
+    org = directory.attach_org(t)
+    org["Department"] = org["Department"].fillna("").astype(str).replace("", NO_DEPARTMENT)
+    sums = org.assign(days=1, other=~(org["office"] | org["remote"])).groupby("Ime i prezime")[
+        ["days", "office", "remote", "other"]].sum().astype("int64")
+    roster = directory.df[["Name", "Department"]].rename(columns={"Name": "Ime i prezime"})
+    roster = pd.concat([roster.assign(Department=roster["Department"].astype(str).replace("", NO_DEPARTMENT)),
+                        org[["Ime i prezime", "Department"]].drop_duplicates()], ignore_index=True)
+    roster = roster.drop_duplicates("Ime i prezime").set_index("Ime i prezime")
+    members = roster.join(sums).fillna(0).astype({c: "int64" for c in sums.columns}).sort_index(kind="mergesort")
+    per_dept = pd.crosstab(org["Department"], org["Lokacija"])
+    groups = list(members.groupby("Department", sort=True))
+    for (dept, m), file in zip(groups, _file_names(dept for dept, _ in groups)):
+        rows = [["Djelatnik", "Dana", "Ured", "Remote", "Ostalo"]] + [
+            [n, str(r.days), str(r.office), str(r.remote), str(r.other)] for n, r in m.iterrows()]
+        rows.append(["Ukupno"] + [str(int(m[c].sum())) for c in ("days", "office", "remote", "other")])
+        counts = _count_items(per_dept.loc[dept]) if dept in per_dept.index else ()
+        yield f"odjeli/{file}.pdf", f"{dept} — lokacije rada {month}", rows, counts
+
+def render_report(job) -> tuple:
+    """Worker: (arcname, title, rows, counts) -> (arcname, PDF bytes); the chart is drawn here, not in the parent."""
+    arcname, title, rows, counts = job
+    s = pd.Series(dict(counts), dtype="int64")
+    return arcname, make_simple_pdf(title, rows, location_pie_png(s) if len(s) else None)
+
+def write_reports(jobs, out, workers=None, inflight=None) -> dict:
+    """Renders `jobs` across a process pool, at most `inflight` pending; each PDF goes to the zip as soon as it is done."""
+    workers = workers or os.cpu_count() or 1
+    inflight = inflight or 2 * workers
+    docs, t0 = 0, time.perf_counter()
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as zf, ProcessPoolExecutor(workers) as pool:
+        pending = set()
+        def drain(block_until):
+            nonlocal pending, docs
+            while len(pending) > block_until:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for f in done:
+                    arcname, pdf = f.result()
+                    zf.writestr(arcname, pdf); docs += 1
+        for job in jobs:
+            drain(inflight - 1)
+            pending.add(pool.submit(render_report, job))
+        drain(0)
+    seconds = time.perf_counter() - t0
+    return {"docs": docs, "seconds": seconds, "docs/s": docs / seconds if seconds else 0.0, "bytes": Path(out).stat().st_size}
+
+def main():
+    last_month = (date.today().replace(day=1) - timedelta(days=1)).strftime("%Y-%m")
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--month", default=last_month, help="YYYY-MM, default: previous month")
+    ap.add_argument("--tracker", default="data/tracker" if list_partitions("data/tracker") else "data/Tracker.csv")
+    ap.add_argument("--employees", default=EMP_FILE)
+    ap.add_argument("--out", default=None)
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--inflight", type=int, default=None, help="max documents pending at once (default 2 x workers)")
+    args = ap.parse_args()
+    start, end = month_bounds(args.month)
+    out = args.out or f"reports_{args.month}.zip"
+
+    t = time.perf_counter()
+    df = load_month(args.tracker, start, end)
+    jobs = list(report_jobs(df, load_employee_directory(args.employees), load_location_resolver(LOC_FILE), args.month))
+    prep = time.perf_counter() - t
+    stats = write_reports(jobs, out, args.workers, args.inflight)
+    peak_mb = lambda who: resource.getrusage(who).ru_maxrss / 1024   # Linux: KiB
+    print(f"{len(df):,} tracker rows in {args.month}; tables + chart data for {len(jobs)} reports in {prep:.2f} s")
+    print(f"{stats['docs']} PDFs -> {out} ({stats['bytes'] / 1e6:.1f} MB) in {stats['seconds']:.2f} s: {stats['docs/s']:.1f} docs/s")
+    print(f"peak RSS: parent {peak_mb(resource.RUSAGE_SELF):.0f} MB, largest worker {peak_mb(resource.RUSAGE_CHILDREN):.0f} MB")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,21 +1,55 @@
 
+"""Normalizes data/Tracker.csv and folds pending delta files (data/tracker/_delta/*.parquet) into it.
+
+Tracker.csv is streamed (utils_store.iter_normalized_months): parsed in chunks, deduped and written one month at
+a time, so memory does not grow with the history.
+
+Usage: python scripts/normalize_tracker.py [--dataset] [--chunk-rows 100000]
+  --dataset  data/tracker/ is the source of truth (GITHUB.storage = "dataset", or TRACKER_STORAGE=dataset):
+             deltas are folded into the partitions and Tracker.csv is exported from them.
+"""
+import argparse, os
 from pathlib import Path
-import pandas as pd
-from utils_tracker import dedupe_last_then_sort_desc, apply_canonical_fields
+from utils_store import (CHUNK_ROWS, compact_deltas, from_arrow_table, iter_normalized_months, list_deltas, list_partitions,
+                         read_tracker_parquet)
 
 TRACKER_PATH = Path("data/Tracker.csv")
+DATASET_ROOT = Path("data/tracker")
+PREFERRED = ['Datum','Dan','Ime i prezime','Odjel','Lokacija','Week','Month','Year','date_iso','record_id','created_at','updated_at','source','version']
+
+def write_csv_months(frames, path) -> int:
+    """Month frames (tracker order) -> one CSV, appended frame by frame; columns fixed by the first frame."""
+    tmp, cols, n = path.with_name(path.name + ".tmp"), None, 0
+    with open(tmp, "w", encoding="utf-8", newline="") as fh:
+        for out in frames:
+            out = out.drop(columns=["Datum_dt"], errors="ignore")   # in-memory helper, never persisted
+            if cols is None:
+                cols = [c for c in PREFERRED if c in out.columns] + [c for c in out.columns if c not in PREFERRED]
+            out.reindex(columns=cols).to_csv(fh, index=False, header=n == 0)
+            n += len(out)
+    os.replace(tmp, path)
+    return n
 
 def main():
-    if not TRACKER_PATH.exists():
-        print("No data/Tracker.csv to normalize; skipping.")
-        return 0
-    df = pd.read_csv(TRACKER_PATH, sep=None, engine="python")
-    df = apply_canonical_fields(df, source='normalize')
-    out = dedupe_last_then_sort_desc(df)
-    pref=['Datum','Dan','Ime i prezime','Odjel','Lokacija','Week','Month','Year','date_iso','record_id','created_at','updated_at','source','version']
-    cols=[c for c in pref if c in out.columns]+[c for c in out.columns if c not in pref]
-    out = out[cols]
-    out.to_csv(TRACKER_PATH, index=False)
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--dataset", action="store_true", default=os.environ.get("TRACKER_STORAGE") == "dataset")
+    ap.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help="CSV rows parsed per chunk")
+    args = ap.parse_args()
+    deltas = list_deltas(DATASET_ROOT)
+    if args.dataset:
+        folded = compact_deltas(DATASET_ROOT)
+        # partitions are already canonical and last-wins: export them one at a time
+        write_csv_months((read_tracker_parquet(p) for _, _, p in list_partitions(DATASET_ROOT)), TRACKER_PATH)
+        print(f"Folded {folded} delta file(s) into {DATASET_ROOT}/.")
+    else:
+        if not TRACKER_PATH.exists() and not deltas:
+            print("No data/Tracker.csv to normalize; skipping.")
+            return 0
+        months = iter_normalized_months(TRACKER_PATH, deltas, source='normalize', chunk_rows=args.chunk_rows)
+        write_csv_months((from_arrow_table(t) for _, _, t in months), TRACKER_PATH)
+        if deltas: print(f"Folded {len(deltas)} delta file(s) into Tracker.csv.")
+    # deltas are only removed once the base that contains them is written
+    for p in deltas: p.unlink(missing_ok=True)
     print("Normalized Tracker.csv (DESC + last-wins) with canonical fields.")
     return 0
 
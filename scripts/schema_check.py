@@ -1,10 +1,14 @@
 
-import pandas as pd, sys
+import sys
+from utils_csv import read_csv_sniffed
+from utils_calendar import read_holidays
+from utils_locations import load_location_resolver
 from utils_tracker import validate_tracker_schema
 
 def main():
-    df=pd.read_csv('data/Tracker.csv', sep=None, engine='python')
-    issues=validate_tracker_schema(df)
+    df=read_csv_sniffed('data/Tracker.csv')
+    location_ids=load_location_resolver('data/Locations_normalized.csv').catalog['location_id']
+    issues=validate_tracker_schema(df, location_ids, read_holidays('data/CroatianHolidays.csv'))
     if issues:
         print("Schema issues detected:\n- " + "\n- ".join(issues))
         sys.exit(1)
@@ -0,0 +1,146 @@
+# tests/conftest.py
+import base64, hashlib, json, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+import pytest
+
+def blob_sha(b: bytes) -> str:
+    return hashlib.sha1(b"blob %d\0" % len(b) + b).hexdigest()
+
+class FakeGitHub(ThreadingHTTPServer):
+    """
+    In-process GitHub: contents API (JSON/raw GET with ETag, PUT with sha check) and Git Data API
+    (ref, commits, recursive trees, blobs, sha=None deletions, fast-forward-only ref updates) over one branch.
+    `files` is the branch head; `fail` injects statuses; `log` records (method, path, request bytes);
+    `latency` (seconds) is added to every request to mimic a real round trip.
+    """
+    daemon_threads = True
+    CONTENT_LIMIT = 1024 * 1024     # like GitHub: JSON "content" is empty above 1 MB
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.files, self.fail, self.log, self.ports = {}, [], [], set()
+        self.latency = 0.0
+        self.blobs, self.trees, self.commits = {}, {}, {}
+        self.head = self._commit(dict(self.files), None)
+
+    def _commit(self, files, parent):
+        tree = hashlib.sha1(json.dumps(sorted((p, blob_sha(b)) for p, b in files.items())).encode()).hexdigest()
+        self.trees[tree] = dict(files)
+        for b in files.values(): self.blobs[blob_sha(b)] = b
+        sha = hashlib.sha1(f"{tree}{parent}{len(self.commits)}".encode()).hexdigest()
+        self.commits[sha] = (tree, parent)
+        return sha
+
+    def push(self, files: dict):
+        """Direct commit on the branch (someone else pushing)."""
+        self.files.update(files)
+        self.head = self._commit(dict(self.files), self.head)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_port}"
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"    # keep-alive
+    def log_message(self, *a): pass
+
+    def _send(self, code, body=None, headers=None, raw=None):
+        data = raw if raw is not None else (json.dumps(body).encode() if body is not None else b"")
+        self.send_response(code)
+        for k, v in (headers or {}).items(): self.send_header(k, v)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers(); self.wfile.write(data)
+
+    def _start(self):
+        n = int(self.headers.get("Content-Length") or 0)
+        self.body = self.rfile.read(n) if n else b""
+        srv, path = self.server, urlparse(self.path).path
+        srv.log.append((self.command, path, len(self.body))); srv.ports.add(self.client_address[1])
+        if srv.latency: time.sleep(srv.latency)
+        if srv.fail:
+            self._send(srv.fail.pop(0), {"message": "injected"}); return None
+        return path
+
+    def _raw(self):
+        return "raw" in (self.headers.get("Accept") or "")
+
+    def do_GET(self):
+        path = self._start()
+        if path is None: return
+        srv = self.server
+        if "/git/" in path:
+            kind, _, rest = path.split("/git/", 1)[1].partition("/")
+            if kind == "ref":
+                etag = f'"{srv.head}"'
+                if self.headers.get("If-None-Match") == etag: return self._send(304, headers={"ETag": etag})
+                return self._send(200, {"object": {"sha": srv.head}}, {"ETag": etag})
+            if kind == "commits":
+                return self._send(200, {"sha": rest, "tree": {"sha": srv.commits[rest][0]}})
+            if kind == "trees":
+                files = srv.trees[rest]
+                return self._send(200, {"sha": rest, "tree": [{"path": p, "type": "blob", "sha": blob_sha(b)} for p, b in files.items()]})
+            if kind == "blobs":
+                return self._send(200, raw=srv.blobs[rest]) if self._raw() else \
+                    self._send(200, {"sha": rest, "content": base64.b64encode(srv.blobs[rest]).decode()})
+        path = path.split("/contents/", 1)[1].strip("/")
+        if path in srv.files:
+            b = srv.files[path]; sha = blob_sha(b); etag = f'"{sha}"'
+            if self.headers.get("If-None-Match") == etag:
+                return self._send(304, headers={"ETag": etag})
+            if self._raw():
+                return self._send(200, raw=b, headers={"ETag": etag})
+            content = base64.b64encode(b).decode() if len(b) <= srv.CONTENT_LIMIT else ""
+            return self._send(200, {"sha": sha, "content": content, "encoding": "base64" if content else "none"}, {"ETag": etag})
+        listing = [{"name": p.rsplit("/", 1)[-1], "path": p, "sha": blob_sha(b), "type": "file"} for p, b in srv.files.items()
+                   if p.rsplit("/", 1)[0] == path]
+        etag = f'"{blob_sha(repr(listing).encode())}"'
+        if listing and self.headers.get("If-None-Match") == etag:
+            return self._send(304, headers={"ETag": etag})
+        return self._send(200, listing, {"ETag": etag}) if listing else self._send(404, {"message": "Not Found"})
+
+    def do_PUT(self):
+        path = self._start()
+        if path is None: return
+        srv, body = self.server, json.loads(self.body)
+        path = path.split("/contents/", 1)[1].strip("/")
+        if path in srv.files and body.get("sha") != blob_sha(srv.files[path]):
+            return self._send(409, {"message": "sha does not match"})
+        srv.push({path: base64.b64decode(body["content"])})
+        self._send(200, {"content": {"sha": blob_sha(srv.files[path])}})
+
+    def do_POST(self):
+        path = self._start()
+        if path is None: return
+        srv, body, kind = self.server, json.loads(self.body), path.rsplit("/", 1)[-1]
+        if kind == "blobs":
+            b = base64.b64decode(body["content"]); srv.blobs[blob_sha(b)] = b
+            return self._send(201, {"sha": blob_sha(b)})
+        if kind == "trees":
+            files = dict(srv.trees[body["base_tree"]]) if body.get("base_tree") else {}
+            for e in body["tree"]:
+                if e["sha"] is None: files.pop(e["path"], None)
+                else: files[e["path"]] = srv.blobs[e["sha"]]
+            tree = hashlib.sha1(json.dumps(sorted((p, blob_sha(b)) for p, b in files.items())).encode()).hexdigest()
+            srv.trees[tree] = files
+            return self._send(201, {"sha": tree})
+        if kind == "commits":
+            sha = hashlib.sha1(f"{body['tree']}{body['parents']}{len(srv.commits)}".encode()).hexdigest()
+            srv.commits[sha] = (body["tree"], (body["parents"] or [None])[0])
+            return self._send(201, {"sha": sha})
+
+    def do_PATCH(self):
+        path = self._start()
+        if path is None: return
+        srv, body = self.server, json.loads(self.body)
+        if srv.commits[body["sha"]][1] != srv.head and not body.get("force"):
+            return self._send(422, {"message": "Update is not a fast forward"})
+        srv.head = body["sha"]; srv.files = dict(srv.trees[srv.commits[srv.head][0]])
+        self._send(200, {"object": {"sha": srv.head}})
+
+@pytest.fixture
+def fake_github():
+    srv = FakeGitHub()
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield srv
+    srv.shutdown(); srv.server_close()
@@ -0,0 +1,80 @@
+# tests/test_analytics.py
+import pandas as pd
+from utils_analytics import (
+    combine_weekly_locations, location_counts, read_weekly_locations, remote_quota_report, refresh_weekly_locations, remote_quota_breaches, team_frame, team_location_share,
+    week_window, weekly_attendance, weekly_locations, write_weekly_locations,
+)
+from utils_employees import EmployeeDirectory, normalize_employees
+from utils_locations import LocationResolver
+from utils_store import dataset_fingerprint, read_tracker_dataset, write_tracker_dataset, append_delta
+from utils_tracker import apply_canonical_fields, dedupe_last_then_sort_desc, to_compact, upsert_last_wins
+
+RESOLVER = LocationResolver(pd.DataFrame({"location_id": ["L1", "L2"], "name": ["Ured", "Rad od kuće"],
+                                          "type": ["URED", "REMOTE"], "aliases": ["office", "home office|wfh"]}))
+
+def _rows(items):
+    return apply_canonical_fields(pd.DataFrame([{"Datum": d, "Ime i prezime": n, "Lokacija": l} for d, n, l in items]))
+
+HISTORY = [("29.12.2025.", "Ana A", "Ured"), ("31.12.2025.", "Ana A", "wfh"),       # ISO week 1 of 2026
+           ("01.01.2026.", "Ana A", "office"), ("02.01.2026.", "Ana A", "WFH"),
+           ("05.01.2026.", "Ana A", "Ured"), ("06.01.2026.", "Ana A", "Neradni dan"),
+           ("05.01.2026.", "Ivo I", "Ured")]
+
+def test_counts_split_new_year_week_by_calendar_year():
+    agg = weekly_locations(to_compact(dedupe_last_then_sort_desc(_rows(HISTORY))), RESOLVER)
+    assert len(agg[agg["iso_week"] == 1]) == 4          # week 1/2026 split into Year 2025 and Year 2026 rows
+    assert location_counts(agg, "Ana A", 2025).to_dict() == {"Ured": 1, "Rad od kuće": 1}
+    assert location_counts(agg, "Ana A", 2026, through="2026-01-04").to_dict() == {"Ured": 1, "Rad od kuće": 1}
+    assert location_counts(agg, "Ana A", 2026).to_dict() == {"Ured": 2, "Rad od kuće": 1}   # blocked day dropped
+    assert location_counts(agg, "Nobody", 2026).empty
+
+def test_partial_aggregates_combine_to_the_full_one():
+    df = dedupe_last_then_sort_desc(_rows(HISTORY))
+    parts = [weekly_locations(df.iloc[::2], RESOLVER), weekly_locations(df.iloc[1::2], RESOLVER)]   # weeks split across parts
+    assert combine_weekly_locations(parts).equals(weekly_locations(df, RESOLVER))
+    assert combine_weekly_locations([]).empty
+
+def test_save_refresh_matches_full_rebuild(tmp_path):
+    base = dedupe_last_then_sort_desc(_rows(HISTORY))
+    write_tracker_dataset(base, tmp_path)
+    agg = weekly_locations(read_tracker_dataset(tmp_path, compact=True), RESOLVER)
+    write_weekly_locations(agg, tmp_path, dataset_fingerprint(tmp_path))
+    assert read_weekly_locations(tmp_path, dataset_fingerprint(tmp_path)).equals(agg)
+
+    save = _rows([("05.01.2026.", "Ana A", "wfh"), ("07.01.2026.", "Ana A", "Ured")])
+    append_delta(save, tmp_path)
+    assert read_weekly_locations(tmp_path, dataset_fingerprint(tmp_path)) is None      # stale after the write
+    d_from, d_to = week_window(save)
+    assert (str(d_from), str(d_to)) == ("2026-01-05", "2026-01-11")
+    rows = read_tracker_dataset(tmp_path, ["Ime i prezime", "date_iso", "Lokacija"], d_from, d_to, compact=True)
+    rows = rows[rows["Ime i prezime"].astype(str) == "Ana A"]
+    refreshed = refresh_weekly_locations(agg, rows, RESOLVER)
+    full = weekly_locations(upsert_last_wins(base, save), RESOLVER)
+    pd.testing.assert_frame_equal(refreshed, full)
+
+def test_team_reports_by_org_unit():
+    directory = EmployeeDirectory(normalize_employees(pd.DataFrame({
+        "Name": ["Ana A", "Ivo I", "Eva E"], "Department": ["Prodaja", "Prodaja", "Marketing"],
+        "eMail": ["a@x", "i@x", "e@x"], "Manager": ["Šef", "Šef", ""]})))
+    week = lambda n, locs, monday=5: [(f"{monday + i:02d}.01.2026.", n, l) for i, l in enumerate(locs)]
+    rows = _rows(week("Ana A", ["wfh", "wfh", "Ured", "Ured", "Ured"]) + week("Ivo I", ["Ured"] * 4 + ["home office"])
+                 + week("Eva E", ["Ured", "Teren"]) + week("Ana A", ["Ured"] * 5, monday=12))
+    team = team_frame(weekly_locations(rows, RESOLVER), directory, RESOLVER)
+    assert team.loc[team["Lokacija"] == "Rad od kuće", "remote"].all() and not team.loc[team["Lokacija"] == "Teren", "office"].any()
+    share = team_location_share(team, "Department", 2026)
+    assert share.loc["Prodaja", "days"] == 15 and share.loc["Prodaja", "Rad od kuće"] == 20.0
+    att = weekly_attendance(team, "Manager", 2026).set_index(["Manager", "iso_week"])
+    assert att.loc[("Šef", 2), "office_share"] == 70.0 and att.loc[("Šef", 3), "wow"] == 30.0
+    assert remote_quota_breaches(team, 2026, quota=1)[["Ime i prezime", "iso_week", "Department", "remote_days"]].values.tolist() \
+        == [["Ana A", 2, "Prodaja", 2]]
+
+def test_remote_quota_report_full_year():
+    rows = _rows([("05.01.2026.", "Ana A", "wfh"), ("06.01.2026.", "Ana A", "home office"), ("07.01.2026.", "Ana A", "wfh"),
+                  ("12.01.2026.", "Ana A", "wfh"), ("13.01.2026.", "Ana A", "wfh"), ("14.01.2026.", "Ana A", "Ured"),
+                  ("05.01.2026.", "Ivo I", "wfh"), ("06.01.2026.", "Ivo I", "Neradni dan"),
+                  ("29.12.2025.", "Ivo I", "wfh"), ("30.12.2025.", "Ivo I", "wfh")])      # ISO week 1 of 2026
+    rep = remote_quota_report(to_compact(rows), RESOLVER, 2026, quota=1)
+    assert rep.index.tolist() == ["Ana A", "Ivo I"]
+    assert rep.loc["Ana A"].tolist() == [2, 5, 2, 3, 3]      # weeks, remote days, weeks over, days over, worst week
+    assert rep.loc["Ivo I"].tolist() == [2, 3, 1, 1, 2]      # Dec 29-30 count towards ISO 2026
+    assert remote_quota_report(rows, RESOLVER, 2025).empty
@@ -0,0 +1,54 @@
+# tests/test_calendar.py
+from datetime import date, timedelta
+import pandas as pd
+import pytest
+from utils_analytics import location_counts
+from utils_calendar import WorkCalendar, holidays_from_frame
+
+HOLIDAYS = {date(2025, 1, 1): "Nova godina", date(2025, 12, 25): "Božić", date(2025, 12, 26): "Sveti Stjepan"}
+CAL = WorkCalendar(HOLIDAYS, 2024, 2026)
+
+def test_holidays_from_frame_skips_bad_dates():
+    raw = pd.DataFrame({"Datum": ["01.01.2025.", "x", "25.12.2025."], "Državni praznik": [" Nova godina", "?", "Božić"]})
+    assert holidays_from_frame(raw) == {date(2025, 1, 1): "Nova godina", date(2025, 12, 25): "Božić"}
+
+def test_lookups_match_timestamp_arithmetic():
+    d = date(2024, 1, 1)
+    while d <= date(2026, 12, 31):
+        ts = pd.Timestamp(d)
+        assert CAL.iso_week(d) == (ts.isocalendar().year, ts.isocalendar().week)
+        assert CAL.monday_of(d) == (ts - pd.Timedelta(days=d.weekday())).date()
+        d += timedelta(days=5)
+    assert CAL.weeks_until_year_end(date(2025, 12, 29)) == 0          # ISO week 1 of 2026, same calendar year
+    assert CAL.weeks_until_year_end(date(2025, 12, 1)) == 4
+    assert CAL.last_completed_week_end(date(2025, 1, 1)) == date(2024, 12, 29)
+    with pytest.raises(KeyError):
+        CAL.iso_week(date(2030, 1, 1))
+
+def test_week_table_and_working_days():
+    wk = CAL.week(2025, 52)
+    assert wk.index[0] == date(2025, 12, 22) and len(wk) == 7
+    assert wk["Dan"].tolist()[:2] == ["Ponedjeljak", "Utorak"]
+    assert wk["holiday"].tolist()[3:5] == ["Božić", "Sveti Stjepan"]
+    assert wk["working_day"].tolist() == [True, True, True, False, False, False, False]
+    assert [d.Index for d in CAL.week_days(date(2025, 12, 27))] == wk.index.tolist()
+    assert CAL.working_days(date(2025, 12, 22), date(2025, 12, 28)) == 3
+    assert CAL.working_days(date(2025, 1, 1), date(2025, 12, 31)) == 261 - 3
+
+def test_missing_entries_and_coverage():
+    df = pd.DataFrame({"Ime i prezime": ["Ana A", "Ana A", "Ivo I", "Ana A"],
+                       "date_iso": ["2025-12-22", "2025-12-23", "2025-12-22", "2025-12-25"]})
+    gaps = CAL.missing_entries(df, date(2025, 12, 22), date(2025, 12, 28), ["Ana A", "Ivo I", "Eva E"])
+    assert list(zip(gaps["Ime i prezime"], gaps["date"])) == [
+        ("Ana A", date(2025, 12, 24)), ("Ivo I", date(2025, 12, 23)), ("Ivo I", date(2025, 12, 24)),
+        ("Eva E", date(2025, 12, 22)), ("Eva E", date(2025, 12, 23)), ("Eva E", date(2025, 12, 24))]
+    cov = CAL.entry_coverage(df, date(2025, 12, 22), date(2025, 12, 28))
+    assert cov.to_dict("index") == {"Ivo I": {"working_days": 3, "recorded": 1, "missing": 2},
+                                    "Ana A": {"working_days": 3, "recorded": 2, "missing": 1}}
+
+def test_location_counts_accepts_an_iso_week_cutoff():
+    agg = pd.DataFrame({"Ime i prezime": "Ana A", "Year": 2025, "iso_year": 2025, "iso_week": [1, 2],
+                        "Lokacija": ["Ured", "Teren"], "location_id": "", "days": [3, 2]})
+    cutoff = date(2025, 1, 5)
+    assert location_counts(agg, "Ana A", 2025, through=CAL.iso_week(cutoff)).equals(
+        location_counts(agg, "Ana A", 2025, through=cutoff))
@@ -0,0 +1,35 @@
+# tests/test_charts.py
+import pandas as pd
+import pytest
+from utils_charts import ChartCache, location_labels, location_pie_png
+
+COUNTS = pd.Series({"Ured": 12, "Rad od kuće": 4, "Teren": 4}, name="days")
+
+def test_pie_png_leaves_no_open_figures():
+    plt = pytest.importorskip("matplotlib.pyplot")
+    before = plt.get_fignums()
+    png = location_pie_png(COUNTS)
+    assert png[:8] == b"\x89PNG\r\n\x1a\n"
+    assert plt.get_fignums() == before
+    assert location_labels(COUNTS) == ["Ured — 12 (60.0%)", "Rad od kuće — 4 (20.0%)", "Teren — 4 (20.0%)"]
+
+def test_chart_cache_renders_once_per_key_and_evicts_lru():
+    cache, calls = ChartCache(maxsize=2), []
+    render = lambda k: (lambda: calls.append(k) or k.encode())
+    assert cache.get_or_render("a", render("a")) == b"a"
+    assert cache.get_or_render("a", render("a")) == b"a"
+    cache.get_or_render("b", render("b"))
+    cache.get_or_render("a", render("a"))          # "a" is now most recent
+    cache.get_or_render("c", render("c"))          # evicts "b"
+    cache.get_or_render("b", render("b"))
+    assert calls == ["a", "b", "c", "b"]
+    assert cache.stats == {"hits": 2, "renders": 4} and len(cache) == 2
+
+def test_pdf_embeds_the_given_chart_without_rerendering(monkeypatch):
+    pytest.importorskip("reportlab")
+    import utils_charts
+    from scripts.make_pdf import location_share_pdf
+    png = location_pie_png(COUNTS)
+    monkeypatch.setattr(utils_charts, "location_pie_png", lambda *_: pytest.fail("chart rendered twice"))
+    pdf = location_share_pdf("Ana A", 2025, pd.Timestamp("2025-09-07").date(), COUNTS, chart_png=png)
+    assert pdf[:5] == b"%PDF-"
@@ -0,0 +1,40 @@
+# tests/test_compact.py
+import pandas as pd
+from utils_tracker import (
+    apply_canonical_fields, dedupe_last_then_sort_desc, from_compact, memory_report, to_compact, upsert_last_wins,
+)
+
+def _tracker():
+    rows = [{"Datum": f"{day:02d}.09.2025.", "Ime i prezime": name, "Lokacija": loc, "Week": 36.0, "Month": 9, "Year": 2025}
+            for day in range(1, 29) for name, loc in [("Ana A", "Ured"), ("Ivo I", "Remote")]]
+    rows.append({"Datum": "", "Ime i prezime": "Bez Datuma", "Lokacija": "Ured"})
+    df = pd.DataFrame(rows)
+    df["updated_at"] = "2025-09-05T08:00:00Z"
+    return dedupe_last_then_sort_desc(apply_canonical_fields(df))
+
+def test_roundtrip_and_dtypes():
+    df = _tracker()
+    c = to_compact(df)
+    assert isinstance(c["Ime i prezime"].dtype, pd.CategoricalDtype)
+    assert str(c["date_iso"].dtype) == "datetime64[ns]" and str(c["Week"].dtype) == "Int8"
+    back = from_compact(c)
+    for col in ["date_iso", "Ime i prezime", "Lokacija", "created_at", "updated_at", "record_id"]:
+        assert back[col].fillna("").astype(str).tolist() == df[col].fillna("").astype(str).tolist(), col
+    assert back["date_iso"].iloc[0] == "NaT"
+
+def test_upsert_on_compact_base_matches_string_base():
+    base = _tracker()
+    new = apply_canonical_fields(pd.DataFrame([
+        {"Datum": "01.09.2025.", "Ime i prezime": "Ana A", "Lokacija": "Teren"},      # replaces, new category
+        {"Datum": "30.09.2025.", "Ime i prezime": "Novi N", "Lokacija": "Ured"},      # new head, new name
+    ]))
+    plain = upsert_last_wins(base, new)
+    compact = upsert_last_wins(to_compact(base), new)
+    assert isinstance(compact["Lokacija"].dtype, pd.CategoricalDtype)
+    cols = ["date_iso", "Ime i prezime", "Lokacija"]
+    assert from_compact(compact)[cols].astype(str).values.tolist() == plain[cols].astype(str).values.tolist()
+
+def test_memory_report_shows_reduction():
+    rep = memory_report(_tracker())
+    assert rep.loc["TOTAL", "compact_bytes"] < rep.loc["TOTAL", "bytes"]
+    assert rep.loc["Ime i prezime", "compact_dtype"] == "category"
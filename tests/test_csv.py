@@ -0,0 +1,17 @@
+# tests/test_csv.py
+from utils_csv import read_csv_sniffed, sniff_csv
+
+def test_sniffs_cp1250_semicolon(tmp_path):
+    path = tmp_path / "emp.csv"
+    path.write_bytes("Name;Department;eMail\nVedran Čorak;Prodaja;v@x.hr\nŠime Đurić;Prodaja;s@x.hr\n".encode("cp1250"))
+    df = read_csv_sniffed(path)
+    assert list(df.columns) == ["Name", "Department", "eMail"]
+    assert df["Name"].tolist() == ["Vedran Čorak", "Šime Đurić"]
+
+def test_sniffs_bytes_with_bom_and_comma():
+    raw = "﻿Datum,Ime i prezime\n01.09.2025.,Ana A\n".encode("utf-8")
+    assert sniff_csv(raw) == ("utf-8-sig", ",")
+    assert list(read_csv_sniffed(raw).columns) == ["Datum", "Ime i prezime"]
+
+def test_missing_file_is_empty(tmp_path):
+    assert read_csv_sniffed(tmp_path / "nope.csv").empty
@@ -1,8 +1,13 @@
 # tests/test_dedupe.py
+import numpy as np
 import pandas as pd
-from utils_tracker import dedupe_last_then_sort_desc
+import pytest
+from utils_tracker import (
+    apply_canonical_fields, dedupe_last_then_sort_desc, is_normalized, normalize_columns, to_compact, with_parsed_date,
+)
 
-def test_last_wins_and_sort_desc():
+@pytest.mark.parametrize("engine", ["hash", "sort"])
+def test_last_wins_and_sort_desc(engine):
     df = pd.DataFrame([
         {"Datum":"01.09.2025.", "Ime i prezime":"Ana A", "Lokacija":"Ured"},
         {"Datum":"1.9.2025",   "Ime i prezime":"Ana A", "Lokacija":"Remote"},
@@ -11,7 +16,7 @@ def test_last_wins_and_sort_desc():
         {"Datum":"2025-09-04", "Ime i prezime":"Ana A", "Lokacija":"Ured"},
         {"Datum":"04.09.2025.", "Ime i prezime":"Ana A", "Lokacija":"Remote"},
     ])
-    out = dedupe_last_then_sort_desc(df)
+    out = dedupe_last_then_sort_desc(df, engine=engine)
     assert len(out) == 4
     row_1 = out[out["Datum"].str.contains("01.09")].iloc[0]
     assert row_1["Lokacija"].lower() == "remote"
@@ -19,3 +24,67 @@ def test_last_wins_and_sort_desc():
     assert row_4["Lokacija"].lower() == "remote"
     first = out.iloc[0]
     assert "04.09" in first["Datum"]
+
+def test_normalize_columns_rewrites_derived_datum_text():
+    df = pd.DataFrame({"Datum": ["1.9.2025", "03/09/2025", "2025-09-04", "bad", "5.9.2025"],
+                       "Ime i prezime": "Ana A", "date_iso": ["", "", None, "", "2025-09-05"]})
+    out = normalize_columns(df)
+    assert out["Datum"].tolist() == ["01.09.2025.", "03.09.2025.", "04.09.2025.", "bad", "5.9.2025"]
+    assert out["date_iso"].tolist() == ["2025-09-01", "2025-09-03", "2025-09-04", "NaT", "2025-09-05"]
+    assert df["Datum"].tolist()[0] == "1.9.2025"                  # the caller's frame is not modified
+
+def _messy(seed, n=400):
+    rng = np.random.default_rng(seed)
+    pick = lambda values: [values[i] for i in rng.integers(0, len(values), n)]
+    return pd.DataFrame({
+        "Datum": pick(["01.09.2025.", "1.9.2025", "02.09.2025.", "03/09/2025", "2025-09-04", "bad", "", None]),
+        "Ime i prezime": pick(["Ana A", "Ivo I", "Eva E", "", None]),
+        "Lokacija": pick(["Ured", "Teren", "Remote"]),
+        "updated_at": pick(["2025-09-01T08:00:00Z", "2025-09-01T09:00:00Z", "2025-09-02T07:00:00Z", "", None]),
+        "extra": rng.integers(0, 5, n),
+    }, index=rng.permutation(n) * 3)
+
+@pytest.mark.parametrize("seed", range(6))
+def test_hash_engine_matches_sort_engine(seed):
+    df = _messy(seed)
+    for frame in (df, df.drop(columns=["updated_at"]), apply_canonical_fields(df), to_compact(apply_canonical_fields(df))):
+        pd.testing.assert_frame_equal(dedupe_last_then_sort_desc(frame, engine="hash"),
+                                      dedupe_last_then_sort_desc(frame, engine="sort"))
+
+def test_unknown_engine_is_rejected():
+    with pytest.raises(ValueError):
+        dedupe_last_then_sort_desc(_messy(0), engine="fast")
+
+def test_normalized_marker_skips_repeat_passes_but_not_derived_frames():
+    raw = pd.DataFrame({"datum": ["01.09.2025.", "02.09.2025."], "Employee": ["Ana A", "Ivo I"], "Location": ["Ured", "Teren"]})
+    can = apply_canonical_fields(raw)
+    assert is_normalized(can) and not is_normalized(raw) and list(raw.columns) == ["datum", "Employee", "Location"]
+    assert normalize_columns(can) is can
+    out = dedupe_last_then_sort_desc(can)
+    assert is_normalized(out) and is_normalized(to_compact(out)) and "_row" not in can.columns
+    parsed = with_parsed_date(out)
+    assert "Datum_dt" in parsed.columns and "Datum_dt" not in out.columns
+    # a frame derived from a registered one is normalized again
+    edited = can.assign(Datum=["05.09.2025.", "06.09.2025."], date_iso="")
+    assert not is_normalized(edited) and not is_normalized(can[["Datum", "Lokacija"]])
+    assert dedupe_last_then_sort_desc(edited)["date_iso"].tolist() == ["2025-09-06", "2025-09-05"]
+
+def test_normalized_marker_survives_id_reuse():
+    # a derived frame allocated at a collected registered frame's id() must not pass as normalized
+    raw = pd.DataFrame({"Datum": ["01.09.2025."], "Ime i prezime": ["Ana A"], "Lokacija": ["Ured"]})
+    for _ in range(20):
+        can = normalize_columns(raw)
+        stale_id = id(can)
+        edited = can.assign(**{"Ime i prezime": ["  raw  "], "date_iso": [""]})
+        del can
+        for _ in range(200):
+            copy = edited.copy()
+            if id(copy) == stale_id:
+                break
+            del copy
+        else:
+            continue
+        assert not is_normalized(copy)
+        assert normalize_columns(copy)["date_iso"].tolist() == ["2025-09-01"]
+        return
+    pytest.skip("CPython did not reuse the collected frame's id")
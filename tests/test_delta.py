@@ -0,0 +1,100 @@
+# tests/test_delta.py
+import shutil
+from pathlib import Path
+import pandas as pd
+from utils_github import GitHubClient, GitHubDataset, GitHubDeltaLog
+import utils_store
+from utils_store import (
+    append_delta, compact_deltas, dataset_fingerprint, dataset_num_rows, dataset_signature, list_deltas, merge_deltas,
+    read_tracker_dataset, read_tracker_parts, seed_dataset, write_tracker_dataset,
+)
+from utils_tracker import apply_canonical_fields, dedupe_last_then_sort_desc
+
+def _rows(items):
+    return apply_canonical_fields(pd.DataFrame([{"Datum": d, "Ime i prezime": n, "Lokacija": l} for d, n, l in items]))
+
+BASE = [("01.09.2025.", "Ana A", "Ured"), ("02.09.2025.", "Ana A", "Ured"), ("01.10.2025.", "Ivo I", "Ured")]
+
+def _view(df):
+    return sorted(zip(df["Ime i prezime"], df["date_iso"].astype(str).str[:10], df["Lokacija"]))
+
+def test_local_deltas_merge_then_compact(tmp_path):
+    write_tracker_dataset(dedupe_last_then_sort_desc(_rows(BASE)), tmp_path)
+    append_delta(_rows([("02.09.2025.", "Ana A", "Teren"), ("03.09.2025.", "Ana A", "Ured")]), tmp_path)
+    append_delta(_rows([("02.09.2025.", "Ana A", "Remote")]), tmp_path)       # later delta wins
+    merged = read_tracker_dataset(tmp_path)
+    assert ("Ana A", "2025-09-02", "Remote") in _view(merged) and len(merged) == 4
+    sept = read_tracker_dataset(tmp_path, columns=["Lokacija"], date_from="2025-09-01", date_to="2025-09-30",
+                                employee="Ana A", compact=True)
+    assert [l for _, _, l in _view(sept)] == ["Ured", "Remote", "Ured"]
+    assert compact_deltas(tmp_path) == 2 and list_deltas(tmp_path) == []
+    assert _view(read_tracker_dataset(tmp_path)) == _view(merged)
+
+def test_delta_saves_keep_the_fallback_history(tmp_path):
+    repo, local = tmp_path / "tracker", tmp_path / "tracker.local"
+    write_tracker_dataset(dedupe_last_then_sort_desc(_rows(BASE)), repo)
+    append_delta(_rows([("02.10.2025.", "Ivo I", "Ured")]), repo)
+    base = len(read_tracker_dataset(repo))
+    save = _rows([("03.09.2025.", "Ana A", "Teren"), ("01.10.2025.", "Ivo I", "Remote")])   # 1 new row, 1 re-save
+    seed_dataset(local, repo)
+    append_delta(save, local)
+    assert len(read_tracker_dataset(local)) == base + 1
+    assert ("Ivo I", "2025-10-01", "Remote") in _view(read_tracker_dataset(local))
+
+    # tracker.local left holding only deltas by saves made before seeding: they are folded in on top of the base
+    stale = tmp_path / "stale"
+    append_delta(save, stale)
+    assert seed_dataset(stale, repo) and list_deltas(stale) == []
+    assert _view(read_tracker_dataset(stale)) == _view(read_tracker_dataset(local))
+
+def test_reader_relists_when_a_listed_delta_was_compacted_away(tmp_path, monkeypatch):
+    write_tracker_dataset(dedupe_last_then_sort_desc(_rows(BASE)), tmp_path)
+    append_delta(_rows([("03.09.2025.", "Ana A", "Teren")]), tmp_path)
+    expected = _view(read_tracker_dataset(tmp_path))
+    stale = list_deltas(tmp_path)
+    compact_deltas(tmp_path)                                  # another session: folds the delta in and deletes it
+    assert not stale[0].exists()
+    real, calls = utils_store.list_deltas, []
+    def listing(root):                                        # every reader's first listing predates the compaction
+        calls.append(root)
+        return stale if len(calls) % 2 else real(root)
+    monkeypatch.setattr(utils_store, "list_deltas", listing)
+    assert _view(read_tracker_dataset(tmp_path)) == expected
+    assert dataset_num_rows(tmp_path) == 4 and len(dataset_signature(tmp_path)) == 2 and dataset_fingerprint(tmp_path)
+
+def test_github_dataset_save_is_one_small_delta_commit(fake_github):
+    gh = GitHubClient("t", "o/r", base_url=fake_github.url, backoff=0.001)
+    ds = GitHubDataset(gh)
+    ds.write_rows(_rows(BASE), "seed")
+    fake_github.log.clear()
+    ds.append_delta(_rows([("01.09.2025.", "Ana A", "Remote")]), "save 1")
+    GitHubDataset(GitHubClient("t", "o/r", base_url=fake_github.url)).append_delta(_rows([("01.10.2025.", "Ivo I", "Teren")]), "save 2")
+    assert sum(1 for m, p, _ in fake_github.log if m == "POST" and p.endswith("/blobs")) == 2
+    assert len([p for p in fake_github.files if "/_delta/" in p]) == 2
+    expected = _view(ds.read())
+    assert ("Ana A", "2025-09-01", "Remote") in expected and ("Ivo I", "2025-10-01", "Teren") in expected
+    assert ds.compact().status_code == 200
+    assert not [p for p in fake_github.files if "/_delta/" in p]
+    assert _view(ds.read()) == expected
+
+def test_contents_delta_log_roundtrip(fake_github):
+    log = GitHubDeltaLog(GitHubClient("t", "o/r", base_url=fake_github.url, backoff=0.001))
+    assert log.files() == {}
+    log.append(_rows([("02.09.2025.", "Ana A", "Teren")]), "save")
+    log.append(_rows([("02.09.2025.", "Ana A", "Remote")]), "save")
+    files = log.files()
+    assert len(files) == 2
+    base = dedupe_last_then_sort_desc(_rows(BASE))
+    assert ("Ana A", "2025-09-02", "Remote") in _view(merge_deltas(base, log.read(files)))
+    assert len(read_tracker_parts(log.read(files))) == 2
+
+def test_fingerprint_rehashes_only_new_files(tmp_path, monkeypatch):
+    write_tracker_dataset(dedupe_last_then_sort_desc(_rows(BASE)), tmp_path / "a")
+    fp = dataset_fingerprint(tmp_path / "a")
+    shutil.copytree(tmp_path / "a", tmp_path / "b")                       # fresh checkout: new mtimes, same content
+    assert dataset_fingerprint(tmp_path / "b") == fp
+    reads = []
+    real = Path.read_bytes
+    monkeypatch.setattr(Path, "read_bytes", lambda p: reads.append(p.name) or real(p))
+    delta = append_delta(_rows([("03.09.2025.", "Ana A", "Teren")]), tmp_path / "a")
+    assert dataset_fingerprint(tmp_path / "a") != fp and reads == [delta.name]
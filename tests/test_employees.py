@@ -0,0 +1,39 @@
+# tests/test_employees.py
+import pandas as pd
+import pytest
+from utils_employees import EmployeeDirectory, load_employee_directory, normalize_employees
+
+def _dir():
+    raw = pd.DataFrame({
+        "Ime i prezime": ["Ana A", "Ivo I", "Marko M"],
+        "Odjel": ["Prodaja", "Prodaja", "Marketing"],
+        "E-mail": ["Ana@X.hr ", "ivo@x.hr", "marko@x.hr"],
+        "Menadžer": ["Marko M", "Marko M", ""],
+    })
+    return EmployeeDirectory(normalize_employees(raw))
+
+def test_lookups_and_rollups():
+    d = _dir()
+    assert d.by_email(" ANA@x.hr")["Name"] == "Ana A"
+    assert d.by_email("nobody@x.hr") is None
+    assert d.by_name("Ivo I")["Department"] == "Prodaja"
+    assert d.members(department="Prodaja")["Name"].tolist() == ["Ana A", "Ivo I"]
+    assert d.members(manager="Marko M", department="Prodaja")["Name"].tolist() == ["Ana A", "Ivo I"]
+    assert d.units("Manager") == ["Marko M"]
+    out = d.attach_org(pd.DataFrame({"Ime i prezime": ["Ivo I", "Nepoznat"]}))
+    assert out["Department"].tolist()[0] == "Prodaja" and pd.isna(out["Department"].iloc[1])
+
+def test_missing_required_columns():
+    with pytest.raises(ValueError):
+        normalize_employees(pd.DataFrame({"Name": ["Ana A"]}))
+
+def test_directory_cached_per_mtime():
+    a = load_employee_directory("data/Popis_djelatnika_HR_Sales.csv")
+    assert load_employee_directory("data/Popis_djelatnika_HR_Sales.csv") is a
+    assert a.by_email("vcorak@intercars.eu")["Name"] == "Vedran Čorak"
+
+def test_attach_org_with_names_differing_only_in_whitespace():
+    d = EmployeeDirectory(normalize_employees(pd.DataFrame({
+        "Name": ["Ana A", "Ana A ", "Ivo I"], "Department": ["Prodaja", "Marketing", "Prodaja"], "eMail": ["a@x", "a2@x", "i@x"]})))
+    out = d.attach_org(pd.DataFrame({"Ime i prezime": [" Ana A", "Ivo I", "Nova N"]}))
+    assert out["Department"].tolist()[:2] == ["Prodaja", "Prodaja"] and pd.isna(out["Department"].iloc[2])   # first row wins
@@ -0,0 +1,44 @@
+# tests/test_github.py
+from conftest import blob_sha
+from utils_github import GitHubClient
+
+def _client(srv, **kw):
+    return GitHubClient("t", "o/r", base_url=srv.url, backoff=0.001, **kw)
+
+def test_etag_cache_pooled_and_sha_listing(fake_github):
+    fake_github.files["data/Tracker.csv"] = b"a;b\n1;2\n"
+    gh, parses = _client(fake_github), []
+    parse = lambda b: parses.append(b) or b.decode()
+    f1, sha, etag, s1 = gh.fetch_frame("data/Tracker.csv", parse)
+    f2, sha2, _, s2 = gh.fetch_frame("data/Tracker.csv", parse)
+    assert (s1, s2) == (200, 304) and f1 is f2 and sha == sha2 and len(parses) == 1
+    assert gh.get_sha("data/Tracker.csv") == sha
+    assert fake_github.log[-1][:2] == ("GET", "/repos/o/r/contents/data")
+    assert len(fake_github.ports) == 1          # one keep-alive connection for all requests
+
+def test_retries_5xx_then_succeeds(fake_github):
+    fake_github.files["x.csv"] = b"1"
+    fake_github.fail = [502, 503]
+    r = _client(fake_github).get_file("x.csv")
+    assert r.status_code == 200 and len(fake_github.log) == 3
+
+def test_put_conflict_rebuilds_payload(fake_github):
+    fake_github.files["data/Tracker.csv"] = b"v1"
+    gh = _client(fake_github)
+    _, stale, _, _ = gh.fetch_frame("data/Tracker.csv", bytes)
+    fake_github.files["data/Tracker.csv"] = b"v2"            # concurrent commit
+    seen = []
+    r = gh.put_file("data/Tracker.csv", b"v1+mine", "msg", sha=stale,
+                    on_conflict=lambda fresh: seen.append(fresh) or b"v2+mine")
+    assert r.status_code == 200 and fake_github.files["data/Tracker.csv"] == b"v2+mine"
+    assert seen == [blob_sha(b"v2")]
+    # without a callback a conflict is returned, never overwritten
+    assert gh.put_file("data/Tracker.csv", b"x", "msg", sha=stale).status_code == 409
+
+def test_raw_read_past_contents_limit(fake_github):
+    big = b"Datum;Lokacija\n" + b"01.09.2025.;Ured\n" * 200_000          # ~3.4 MB
+    fake_github.files["data/Tracker.csv"] = big
+    gh = _client(fake_github)
+    assert gh.get_file("data/Tracker.csv").json()["content"] == ""    # JSON body is cut off above 1 MB
+    frame, sha, _, status = gh.fetch_frame("data/Tracker.csv", bytes)
+    assert status == 200 and frame == big and sha == blob_sha(big)
@@ -0,0 +1,57 @@
+# tests/test_github_dataset.py
+import pandas as pd
+from utils_github import GitHubClient, GitHubDataset
+from utils_store import partition_path, tracker_parquet_bytes
+from utils_tracker import apply_canonical_fields, dedupe_last_then_sort_desc
+
+def _rows(dates, names, loc="Ured"):
+    return apply_canonical_fields(pd.DataFrame([{"Datum": d, "Ime i prezime": n, "Lokacija": loc} for d in dates for n in names]))
+
+def _seed(fake_github, months=24, names=120):
+    # ~2 years x 120 people x every day: multi-MB of Parquet spread over 24 partitions
+    dates = [d.strftime("%d.%m.%Y.") for d in pd.date_range("2024-01-01", periods=months * 30, freq="D")]
+    df = dedupe_last_then_sort_desc(_rows(dates, [f"Osoba {i:03d}" for i in range(names)]))
+    dt = pd.to_datetime(df["date_iso"])
+    files = {partition_path("data/tracker", y, m).as_posix(): tracker_parquet_bytes(g)
+             for (y, m), g in df.groupby([dt.dt.year, dt.dt.month], sort=False)}
+    fake_github.push(files)
+    return df, files
+
+def test_multi_mb_dataset_reads_and_uploads_only_touched_partition(fake_github):
+    df, files = _seed(fake_github)
+    assert sum(map(len, files.values())) > 1_000_000
+    ds = GitHubDataset(GitHubClient("t", "o/r", base_url=fake_github.url, backoff=0.001))
+
+    assert len(ds.read(columns=["Lokacija"])) == len(df)
+    window = ds.read(columns=["Lokacija"], date_from="2024-03-01", date_to="2024-03-31", employee="Osoba 007")
+    assert len(window) == 31 and set(window["Lokacija"]) == {"Ured"}
+
+    fake_github.log.clear()
+    r = ds.write_rows(_rows(["05.03.2024."], ["Osoba 007"], loc="Rad od kuće"), "save")
+    assert r.status_code == 200
+    posts = [(p, n) for m, p, n in fake_github.log if m == "POST" and p.endswith("/blobs")]
+    assert len(posts) == 1                                      # one partition blob, nothing else re-uploaded
+    assert posts[0][1] < 2 * len(files["data/tracker/Year=2024/Month=3/part-0.parquet"])
+    after = ds.read(date_from="2024-03-05", date_to="2024-03-05", employee="Osoba 007")
+    assert after["Lokacija"].tolist() == ["Rad od kuće"]
+    assert len(ds.read(columns=["Lokacija"])) == len(df)        # last-wins: replaced, not appended
+
+def test_concurrent_push_is_rebased(fake_github):
+    _seed(fake_github, months=2, names=3)
+    ds = GitHubDataset(GitHubClient("t", "o/r", base_url=fake_github.url, backoff=0.001))
+    ds.read()
+    ours = _rows(["02.01.2024."], ["Osoba 001"], loc="Teren")
+    # someone else saves into the same partition between our listing and our ref update
+    theirs = dedupe_last_then_sort_desc(_rows(["03.01.2024."], ["Osoba 002"], loc="Vukovina"))
+    orig = ds.client.commit_files
+    def racing(*a, **kw):
+        if not getattr(racing, "done", False):
+            racing.done = True
+            other = GitHubDataset(GitHubClient("t", "o/r", base_url=fake_github.url))
+            other.write_rows(theirs, "theirs")
+        return orig(*a, **kw)
+    ds.client.commit_files = racing
+    assert ds.write_rows(ours, "ours").status_code == 200
+    jan = ds.read(date_from="2024-01-01", date_to="2024-01-31")
+    got = dict(zip(jan["Ime i prezime"] + "|" + jan["date_iso"], jan["Lokacija"]))
+    assert got["Osoba 001|2024-01-02"] == "Teren" and got["Osoba 002|2024-01-03"] == "Vukovina"
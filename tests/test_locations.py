@@ -0,0 +1,59 @@
+# tests/test_locations.py
+import pandas as pd
+from utils_locations import BLOCKED, LocationResolver, load_location_resolver
+from utils_tracker import is_remote_value, is_remote_values
+
+CATALOG = pd.DataFrame({
+    "location_id": ["L1", "L2", "L3"],
+    "name": ["Špansko", "Rad od kuće", "Godišnji odmor"],
+    "type": ["office", "remote", "ostalo"],
+    "aliases": ["spansko hq", "HO|home office", "GO"],
+})
+
+def test_resolve_matches_scalar_canonical():
+    r = LocationResolver(CATALOG)
+    raw = pd.Series([" spansko ", "HOME  office", "go", "Neradni dan", None, "", "Negdje drugdje", "ŠPANSKO"])
+    res = r.resolve(raw)
+    assert res.index.equals(raw.index)
+    expected = ["" if pd.isna(v) or r.canonical(v) == BLOCKED else r.canonical(v) for v in raw]
+    assert res["Lokacija"].astype(str).tolist() == expected
+    assert res["location_id"].astype(str).tolist() == ["L1", "L2", "L3", "", "", "", "", "L1"]
+    assert res["location_type"].astype(str).tolist()[:3] == ["OFFICE", "REMOTE", "OSTALO"]
+    assert r.canonical("neradni  DAN") == BLOCKED
+
+def test_canonicalize_rows_and_empty_input():
+    r = LocationResolver(CATALOG)
+    rows = r.canonicalize_rows(pd.DataFrame({"Ime i prezime": ["Ana", "Ana"], "Lokacija": ["ho", "Neradni dan"]}))
+    assert rows[["Lokacija", "location_id", "location_name"]].values.tolist() == [
+        ["Rad od kuće", "L2", "Rad od kuće"], ["", "", ""]]
+    assert r.resolve(pd.Series([], dtype=object)).empty
+
+def test_resolver_cached_per_mtime():
+    a = load_location_resolver("data/Locations_normalized.csv")
+    assert load_location_resolver("data/Locations_normalized.csv") is a
+    assert a.canonical("Home  Office") == "Rad od kuće"
+
+def test_remote_mask_matches_scalar_rule():
+    r = LocationResolver(CATALOG)
+    def scalar(v):   # app.is_remote_by_catalog before vectorization
+        if not v or pd.isna(v): return False
+        canon = r.canonical(v)
+        return canon != BLOCKED and (r.type_of(canon) == "REMOTE" or is_remote_value(canon))
+    raw = pd.Series(["HO", "home office", "Rad od Kuće", "WFH petkom", "Špansko", "Neradni dan", None, "", "doma", "Remote"] * 3,
+                    index=range(100, 130))
+    mask = r.remote_mask(raw)
+    assert mask.index.equals(raw.index) and mask.tolist() == [scalar(v) for v in raw]
+    assert is_remote_values(raw.astype("category")).tolist() == [is_remote_value(v) for v in raw]
+    assert r.remote_mask(pd.Series([], dtype=object)).empty
+
+def test_resolve_survives_a_memo_cleared_by_another_session(monkeypatch):
+    import utils_locations
+    r = LocationResolver(CATALOG)
+    r.resolve(pd.Series(["spansko hq", "GO"]))                    # memoized
+    real = utils_locations.norm_keys
+    def clearing(values):                                          # another session passes MEMO_MAX mid-call
+        r._memo.clear()
+        return real(values)
+    monkeypatch.setattr(utils_locations, "norm_keys", clearing)
+    res = r.resolve(pd.Series(["spansko hq", "HO", "GO"]))
+    assert res["location_id"].astype(str).tolist() == ["L1", "L2", "L3"]
@@ -0,0 +1,67 @@
+# tests/test_merge.py
+import numpy as np
+import pandas as pd
+import pytest
+from utils_tracker import apply_canonical_fields, dedupe_last_then_sort_desc, from_compact, to_compact, upsert_last_wins
+
+def _rows(items, updated):
+    df = pd.DataFrame([{"Datum": d, "Ime i prezime": n, "Lokacija": l} for d, n, l in items])
+    df["updated_at"] = updated
+    return apply_canonical_fields(df)
+
+def test_upsert_matches_full_merge():
+    base = dedupe_last_then_sort_desc(_rows([
+        ("01.09.2025.", "Ana A", "Ured"),
+        ("01.09.2025.", "Marko M", "Ured"),
+        ("02.09.2025.", "Ana A", "Ured"),
+        ("04.09.2025.", "Ivo I", "Remote"),
+    ], "2025-09-05T08:00:00Z"))
+    new = _rows([
+        ("01.09.2025.", "Ana A", "Remote"),      # replaces
+        ("01.09.2025.", "Boris B", "Ured"),      # inserted inside the date block
+        ("03.09.2025.", "Ana A", "Na terenu"),   # new date between existing ones
+        ("05.09.2025.", "Ana A", "Ured"),        # new head
+    ], "2025-09-06T08:00:00Z")
+
+    out = upsert_last_wins(base, new)
+    full = dedupe_last_then_sort_desc(pd.concat([base, new], ignore_index=True))
+
+    cols = ["date_iso", "Ime i prezime", "Lokacija"]
+    assert out[cols].reset_index(drop=True).equals(full[cols].reset_index(drop=True))
+    assert len(out) == 7
+
+def test_upsert_into_empty_base():
+    new = _rows([("01.09.2025.", "Ana A", "Ured")], "2025-09-06T08:00:00Z")
+    out = upsert_last_wins(pd.DataFrame(), new)
+    assert out["Lokacija"].tolist() == ["Ured"]
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_chained_upserts_match_full_merge(compact):
+    # later upserts reuse the date keys remembered for the previous result
+    rng = np.random.default_rng(3)
+    names, days = ["Ana A", "Boris B", "Ivo I", "Marko M"], [f"{d:02d}.09.2025." for d in range(1, 15)]
+    def batch(k, stamp):
+        return _rows([(days[rng.integers(len(days))], names[rng.integers(len(names))], f"L{rng.integers(5)}")
+                      for _ in range(k)], stamp)
+    base = dedupe_last_then_sort_desc(batch(30, "2025-09-01T00:00:00Z"))
+    out, full = to_compact(base) if compact else base, base
+    for step in range(6):
+        new = batch(5, f"2025-09-{step + 2:02d}T00:00:00Z")
+        out = upsert_last_wins(out, new)
+        full = dedupe_last_then_sort_desc(pd.concat([full, new], ignore_index=True))
+    cols = ["date_iso", "Ime i prezime", "Lokacija"]
+    got = from_compact(out) if compact else out
+    assert got[cols].astype(str).reset_index(drop=True).equals(full[cols].astype(str).reset_index(drop=True))
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_upsert_rows_without_a_name_match_full_merge(compact):
+    base = dedupe_last_then_sort_desc(_rows([("01.09.2025.", "Ana A", "Ured"), ("01.09.2025.", None, "Ured"),
+                                             ("02.09.2025.", "Ivo I", "Ured")], "2025-09-05T08:00:00Z"))
+    new = _rows([("01.09.2025.", None, "Remote"), ("02.09.2025.", None, "Teren"), ("01.09.2025.", "Boris B", "Ured")],
+                "2025-09-06T08:00:00Z")
+    out = upsert_last_wins(to_compact(base) if compact else base, new)
+    full = dedupe_last_then_sort_desc(pd.concat([base, new], ignore_index=True))
+    cols = ["date_iso", "Ime i prezime", "Lokacija"]
+    got = from_compact(out) if compact else out
+    assert got[cols].astype(str).reset_index(drop=True).equals(full[cols].astype(str).reset_index(drop=True))
+    assert len(out) == 5
@@ -0,0 +1,19 @@
+# tests/test_record_id.py
+import pandas as pd
+from utils_tracker import apply_canonical_fields, new_record_id, new_record_ids
+
+def test_batched_ids_match_per_row():
+    names = pd.Series(["Ana A", " Ana A ", "Ivo I", None, "Ana A"])
+    dates = pd.Series(["2025-09-01", "2025-09-01", "2025-09-02", "2025-09-03", "2025-09-04"])
+    ids = new_record_ids(names, dates)
+    assert list(ids) == [new_record_id(str(n), str(d)) for n, d in zip(names.astype(object), dates)]
+    assert ids[0] == ids[1]
+
+def test_only_missing_ids_are_filled():
+    df = pd.DataFrame({
+        "Datum": ["01.09.2025.", "02.09.2025."],
+        "Ime i prezime": ["Ana A", "Ana A"],
+        "record_id": ["keep-me", ""],
+    })
+    out = apply_canonical_fields(df)
+    assert out["record_id"].tolist() == ["keep-me", new_record_id("Ana A", "2025-09-02")]
@@ -0,0 +1,63 @@
+# tests/test_reports.py
+import zipfile
+import pandas as pd
+import pytest
+from scripts.make_reports import month_bounds, report_jobs, write_reports
+from utils_employees import EmployeeDirectory, normalize_employees
+from utils_locations import LocationResolver
+from utils_tracker import apply_canonical_fields
+
+RESOLVER = LocationResolver(pd.DataFrame({"location_id": ["L1", "L2"], "name": ["Ured", "Rad od kuće"],
+                                          "type": ["URED", "REMOTE"], "aliases": ["office", "home office|wfh"]}))
+DIRECTORY = EmployeeDirectory(normalize_employees(pd.DataFrame({
+    "Name": ["Ana A", "Ivo I", "Eva E"], "Department": ["Prodaja", "Prodaja", "Marketing"], "eMail": ["a@x", "i@x", "e@x"]})))
+
+def _month():
+    items = [("01.09.2025.", "Ana A", "Ured"), ("02.09.2025.", "Ana A", "wfh"), ("03.09.2025.", "Ana A", "Teren"),
+             ("01.09.2025.", "Ivo I", "office"), ("02.09.2025.", "Nova N", "Ured")]
+    return apply_canonical_fields(pd.DataFrame([{"Datum": d, "Ime i prezime": n, "Lokacija": l} for d, n, l in items]))
+
+def test_month_bounds():
+    assert [str(d) for d in month_bounds("2024-02")] == ["2024-02-01", "2024-02-29"]
+    assert [str(d) for d in month_bounds("2025-12")] == ["2025-12-01", "2025-12-31"]
+
+def test_report_jobs_tables_and_counts():
+    jobs = {j[0]: j for j in report_jobs(_month(), DIRECTORY, RESOLVER, "2025-09")}
+    assert set(jobs) == {"djelatnici/Ana_A.pdf", "djelatnici/Ivo_I.pdf", "djelatnici/Nova_N.pdf",
+                         "odjeli/bez_odjela.pdf", "odjeli/Marketing.pdf", "odjeli/Prodaja.pdf"}
+    _, _, rows, counts = jobs["djelatnici/Ana_A.pdf"]
+    assert rows[1:] == [["01.09.2025.", "Ponedjeljak", "Ured"], ["02.09.2025.", "Utorak", "Rad od kuće"],
+                        ["03.09.2025.", "Srijeda", "Teren"]]
+    assert dict(counts) == {"Ured": 1, "Rad od kuće": 1, "Teren": 1}
+    _, _, rows, counts = jobs["odjeli/Prodaja.pdf"]
+    assert rows[1:] == [["Ana A", "3", "1", "1", "1"], ["Ivo I", "1", "1", "0", "0"], ["Ukupno", "4", "2", "1", "1"]]
+    assert jobs["odjeli/Marketing.pdf"][2][1:] == [["Eva E", "0", "0", "0", "0"], ["Ukupno", "0", "0", "0", "0"]]
+    assert jobs["odjeli/Marketing.pdf"][3] == ()
+
+def test_write_reports_streams_every_pdf_into_the_zip(tmp_path):
+    pytest.importorskip("reportlab")
+    jobs = list(report_jobs(_month(), DIRECTORY, RESOLVER, "2025-09"))
+    stats = write_reports(jobs, tmp_path / "r.zip", workers=2, inflight=2)
+    with zipfile.ZipFile(tmp_path / "r.zip") as zf:
+        assert sorted(zf.namelist()) == sorted(j[0] for j in jobs)
+        assert all(zf.read(n)[:5] == b"%PDF-" for n in zf.namelist())
+    assert stats["docs"] == len(jobs)
+
+def test_rows_without_a_name_get_no_report():
+    df = pd.concat([_month(), apply_canonical_fields(pd.DataFrame({"Datum": ["04.09.2025."] * 3, "Lokacija": "Ured",
+                                                                    "Ime i prezime": [None, " ", "nan"]}))], ignore_index=True)
+    jobs = {j[0]: j for j in report_jobs(df, DIRECTORY, RESOLVER, "2025-09")}
+    assert sorted(n for n in jobs if n.startswith("djelatnici/")) == [
+        "djelatnici/Ana_A.pdf", "djelatnici/Ivo_I.pdf", "djelatnici/Nova_N.pdf"]
+    assert jobs["odjeli/Prodaja.pdf"][2][-1] == ["Ukupno", "4", "2", "1", "1"]
+
+def test_report_arcnames_stay_distinct_when_names_sanitize_alike():
+    names = ["Ana  A", "Ana A", "Ana/A", "ana a"]
+    df = apply_canonical_fields(pd.DataFrame({"Datum": "01.09.2025.", "Lokacija": "Ured", "Ime i prezime": names}))
+    directory = EmployeeDirectory(normalize_employees(pd.DataFrame({
+        "Name": names, "Department": ["Prodaja A", "Prodaja/A", "Prodaja A", "Prodaja/A"], "eMail": list("abcd")})))
+    arcnames = [j[0] for j in report_jobs(df, directory, RESOLVER, "2025-09")]
+    assert len(arcnames) == len(set(arcnames)) == 6
+    assert {n.casefold() for n in arcnames} == {
+        "djelatnici/ana_a.pdf", "djelatnici/ana_a_2.pdf", "djelatnici/ana_a_3.pdf", "djelatnici/ana_a_4.pdf",
+        "odjeli/prodaja_a.pdf", "odjeli/prodaja_a_2.pdf"}
@@ -0,0 +1,56 @@
+# tests/test_save.py
+import threading
+import pandas as pd
+import pytest
+from utils_github import GitHubClient, GitHubDataset
+from utils_save import SaveCoalescer
+from utils_tracker import apply_canonical_fields
+
+def _rows(name, loc, day="01.09.2025."):
+    return apply_canonical_fields(pd.DataFrame([{"Datum": day, "Ime i prezime": name, "Lokacija": loc}]))
+
+def _burst(coalescer, frames):
+    results, start = [None] * len(frames), threading.Barrier(len(frames))
+    def run(i):
+        start.wait()
+        try: results[i] = coalescer.submit(frames[i])
+        except Exception as e: results[i] = e
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(len(frames))]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    return results
+
+def test_burst_is_merged_once_per_flush():
+    calls = []
+    sc = SaveCoalescer(lambda rows: calls.append(rows) or len(calls), window=0.2)
+    results = _burst(sc, [_rows(f"User {i:02d}", "Ured") for i in range(20)])
+    assert len(calls) < 20 and sum(len(c) for c in calls) == 20
+    assert sc.stats == {"saves": 20, "flushes": len(calls), "rows": 20}
+    assert set(results) <= set(range(1, len(calls) + 1))
+    # same key twice in a batch: the later submission wins
+    sc.submit(pd.concat([_rows("Ana A", "Ured"), _rows("Ana A", "Remote")], ignore_index=True))
+    assert calls[-1]["Lokacija"].tolist() == ["Remote"]
+
+def test_flush_error_reaches_every_submitter():
+    def boom(rows): raise RuntimeError("down")
+    results = _burst(SaveCoalescer(boom, window=0.1), [_rows(f"User {i}", "Ured") for i in range(5)])
+    assert all(isinstance(r, RuntimeError) for r in results)
+    with pytest.raises(RuntimeError):
+        SaveCoalescer(boom, window=0).submit(_rows("Ana A", "Ured"))
+
+def test_coalesced_burst_rebases_onto_foreign_commit(fake_github):
+    ds = GitHubDataset(GitHubClient("t", "o/r", base_url=fake_github.url, backoff=0.001))
+    foreign, listing = {"README.md": b"x"}, ds.listing
+    def stale_listing():
+        out = listing()
+        if foreign: fake_github.push(foreign.copy()); foreign.clear()   # someone pushes before our ref update
+        return out
+    ds.listing = stale_listing
+    flush = lambda rows: ds.append_delta(rows, "save batch")
+    fake_github.latency = 0.005
+    sc = SaveCoalescer(flush, window=0.2)
+    results = _burst(sc, [_rows(f"User {i:02d}", "Ured") for i in range(30)])
+    assert all(r.status_code == 200 for r in results)
+    patches = [m for m, _, _ in fake_github.log if m == "PATCH"]
+    assert len(patches) == sc.stats["flushes"] + 1 < 30     # one rejected (not a fast-forward), then rebased
+    assert "README.md" in fake_github.files and len(ds.read()) == 30
@@ -0,0 +1,48 @@
+# tests/test_schema.py
+from datetime import date
+import pandas as pd
+from utils_tracker import (WEEKDAY_NAMES, apply_canonical_fields, new_record_id, record_ids_ascii, to_compact,
+                           validate_tracker_schema, with_parsed_date)
+
+HOLIDAYS = {date(2025, 9, 3): "Dan sjećanja"}
+
+def _rows():
+    items = [("01.09.2025.", "Ana A", "Ured", "L1"), ("02.09.2025.", "Ana A", "Teren", "L2"),
+             ("03.09.2025.", "Ana A", "Dan sjećanja", ""), ("01.09.2025.", "Ivo I", "Ured", "L1")]
+    df = pd.DataFrame([{"Datum": d, "Dan": WEEKDAY_NAMES[pd.to_datetime(d, format="%d.%m.%Y.").weekday()],
+                        "Ime i prezime": n, "Lokacija": l, "location_id": i} for d, n, l, i in items])
+    return apply_canonical_fields(df)
+
+def test_record_ids_ascii_match_new_record_id():
+    keys = [("Ana A", "2025-09-01"), ("Čedo Ž", "2024-02-29"), ("", "")]
+    got = record_ids_ascii([f"{n}|{d}" for n, d in keys]).astype(str).tolist()
+    assert got == [new_record_id(n, d) for n, d in keys]
+    assert len(record_ids_ascii([])) == 0
+
+def test_clean_frame_has_no_issues_in_string_and_compact_form():
+    df = _rows()
+    assert validate_tracker_schema(df, ["L1", "L2"], HOLIDAYS) == []
+    assert validate_tracker_schema(to_compact(with_parsed_date(df)), ["L1", "L2"], HOLIDAYS) == []
+
+def test_each_problem_is_counted():
+    df = _rows()
+    df.loc[0, "record_id"] = "not-an-id"
+    df.loc[1, "Dan"] = "Nedjelja"
+    df.loc[1, "location_id"] = "L9"
+    df.loc[3, "Lokacija"] = "Dan sjećanja"
+    bad = pd.concat([df, df.iloc[[2]], df.iloc[[0]].assign(date_iso="31.02.2025")], ignore_index=True)
+    assert validate_tracker_schema(bad, ["L1", "L2"], HOLIDAYS) == [
+        "date_iso missing or not a date: 1 of 6 rows",
+        "duplicate (Ime i prezime, date_iso) keys: 1 of 6 rows",
+        "record_id is not uuid5(Ime i prezime|date_iso): 2 of 6 rows",
+        "Dan does not match the weekday of date_iso: 1 of 6 rows",
+        "location_id not in the location catalog: 1 of 6 rows",
+        "Lokacija is a holiday name on another date: 1 of 6 rows",
+    ]
+
+def test_missing_columns_and_empty_names():
+    raw = pd.DataFrame({"datum": ["01.09.2025."], "Ime i prezime": [" "], "Lokacija": ["Ured"]})
+    assert validate_tracker_schema(raw) == [
+        "missing columns: Dan, Odjel, Week, Month, Year, date_iso, record_id, created_at, updated_at",
+        "Ime i prezime empty: 1 of 1 rows",
+    ]
@@ -0,0 +1,116 @@
+# tests/test_store.py
+import pandas as pd
+import pyarrow.parquet as pq
+from utils_tracker import apply_canonical_fields, dedupe_last_then_sort_desc
+from utils_store import read_tracker_parquet, write_tracker_parquet
+
+def _tracker():
+    rows = []
+    for day in range(1, 29):
+        for name in ["Ana A", "Ivo I"]:
+            rows.append({"Datum": f"{day:02d}.09.2025.", "Ime i prezime": name, "Lokacija": "Ured",
+                         "Week": 36.0, "Month": 9, "Year": 2025})
+    return dedupe_last_then_sort_desc(apply_canonical_fields(pd.DataFrame(rows)))
+
+def test_roundtrip_typed_schema(tmp_path):
+    df = _tracker()
+    path = write_tracker_parquet(df, tmp_path / "t.parquet")
+    schema = pq.read_schema(path)
+    assert str(schema.field("date_iso").type) == "date32[day]"
+    assert str(schema.field("Year").type) == "int16"
+    back = read_tracker_parquet(path)
+    assert back["date_iso"].tolist() == df["date_iso"].tolist()
+    assert back["record_id"].tolist() == df["record_id"].tolist()
+
+def test_projection_and_pushdown(tmp_path):
+    path = write_tracker_parquet(_tracker(), tmp_path / "t.parquet", row_group_size=8)
+    out = read_tracker_parquet(path, columns=["Lokacija"], date_from="2025-09-10", date_to="2025-09-12", employee="Ana A")
+    assert len(out) == 3
+    assert set(out.columns) == {"Lokacija", "date_iso", "Datum_dt"}
+
+def test_dataset_prunes_partitions_and_rewrites_only_touched(tmp_path):
+    from utils_store import list_partitions, read_tracker_dataset, write_tracker_dataset, write_tracker_partitions
+    df = _tracker()
+    oct_rows = df.assign(Datum=df["Datum"].str.replace(".09.", ".10.", regex=False), date_iso=None, record_id=None)
+    df = dedupe_last_then_sort_desc(apply_canonical_fields(pd.concat([df, oct_rows], ignore_index=True)))
+    root = tmp_path / "tracker"
+    write_tracker_dataset(df, root)
+    assert [(y, m) for y, m, _ in list_partitions(root)] == [(2025, 10), (2025, 9)]
+
+    out = read_tracker_dataset(root, columns=["Lokacija"], date_from="2025-10-01", date_to="2025-10-31", employee="Ivo I")
+    assert len(out) == 28 and out["date_iso"].str.startswith("2025-10").all()
+
+    sep_file = [p for y, m, p in list_partitions(root) if m == 9][0]
+    before = sep_file.stat().st_mtime_ns
+    new = apply_canonical_fields(pd.DataFrame([{"Datum": "05.10.2025.", "Ime i prezime": "Ivo I", "Lokacija": "Remote"}]))
+    touched = write_tracker_partitions(new, root)
+    assert [p.parent.name for p in touched] == ["Month=10"]
+    assert sep_file.stat().st_mtime_ns == before
+    after = read_tracker_dataset(root, date_from="2025-10-05", date_to="2025-10-05", employee="Ivo I")
+    assert after["Lokacija"].tolist() == ["Remote"]
+
+def test_streamed_months_match_in_memory_import(tmp_path):
+    from utils_store import (TrackerParquetWriter, append_delta, export_tracker_csv, from_arrow_table, import_tracker_csv,
+                             iter_normalized_months, list_deltas, merge_deltas)
+    df = _tracker()
+    resaves = df.iloc[::5].assign(Lokacija="Remote", updated_at="2030-01-01T00:00:00Z")   # later rows, other chunks
+    undated = df.iloc[:2].assign(Datum="", date_iso=None, record_id=None)
+    src = pd.concat([df.iloc[::-1], resaves, undated, df.iloc[::7]], ignore_index=True)
+    export_tracker_csv(src, tmp_path / "Tracker.csv")
+    append_delta(apply_canonical_fields(pd.DataFrame([{"Datum": "05.09.2025.", "Ime i prezime": "Ivo I", "Lokacija": "Teren"}])),
+                 tmp_path)
+    deltas = list_deltas(tmp_path)
+
+    expected = merge_deltas(import_tracker_csv(tmp_path / "Tracker.csv"), deltas).drop(columns="Datum_dt", errors="ignore")
+    months = list(iter_normalized_months(tmp_path / "Tracker.csv", deltas, chunk_rows=9))
+    assert [(y, m) for y, m, _ in months] == [(0, 0), (2025, 9)]
+    with TrackerParquetWriter(tmp_path / "t.parquet") as w:
+        for _, _, table in months:
+            w.write(table)
+    streamed = pd.concat([from_arrow_table(t) for _, _, t in months], ignore_index=True)
+    for got in (streamed, read_tracker_parquet(tmp_path / "t.parquet")):
+        got = got[expected.columns]
+        assert got[["Ime i prezime", "date_iso", "Lokacija", "updated_at"]].values.tolist() == \
+            expected[["Ime i prezime", "date_iso", "Lokacija", "updated_at"]].values.tolist()
+    assert (streamed["Lokacija"] == "Teren").sum() == 1
+
+def test_streamed_months_keep_columns_that_appear_later(tmp_path):
+    import pytest
+    from utils_store import TrackerParquetWriter, append_delta, export_tracker_csv, iter_normalized_months, list_deltas
+    october = apply_canonical_fields(pd.DataFrame([{"Datum": "01.10.2025.", "Ime i prezime": "Ana A", "Lokacija": "Ured"}]))
+    export_tracker_csv(pd.concat([october, _tracker()], ignore_index=True), tmp_path / "Tracker.csv")
+    note = apply_canonical_fields(pd.DataFrame([{"Datum": "05.09.2025.", "Ime i prezime": "Ivo I", "Lokacija": "Teren",
+                                                 "Napomena": "sajam"}]))
+    append_delta(note, tmp_path)
+    extra = apply_canonical_fields(pd.DataFrame([{"Datum": "06.09.2025.", "Ime i prezime": "Ana A", "Lokacija": "Ured",
+                                                  "Odobrio": "Eva E"}]))
+    append_delta(extra, tmp_path)
+    months = list(iter_normalized_months(tmp_path / "Tracker.csv", list_deltas(tmp_path), chunk_rows=9))
+    assert [(y, m) for y, m, _ in months] == [(2025, 10), (2025, 9)]
+    assert all(t.schema == months[0][2].schema for _, _, t in months)
+    sep = months[1][2].to_pandas()
+    assert sep.loc[sep["Napomena"].notna(), ["Ime i prezime", "Datum", "Napomena"]].values.tolist() == \
+        [["Ivo I", "05.09.2025.", "sajam"]]
+    assert sep["Odobrio"].dropna().tolist() == ["Eva E"]
+    with TrackerParquetWriter(tmp_path / "t.parquet") as w:
+        for _, _, table in months:
+            w.write(table)
+    assert read_tracker_parquet(tmp_path / "t.parquet")["Napomena"].dropna().tolist() == ["sajam"]
+
+    with pytest.raises(ValueError, match="Napomena"):
+        with TrackerParquetWriter(tmp_path / "u.parquet") as w:
+            w.write(_tracker())
+            w.write(note)
+    assert not (tmp_path / "u.parquet").exists()
+
+def test_first_save_seeds_the_dataset_readers_fell_back_to(tmp_path):
+    from utils_store import list_partitions, read_tracker_dataset, seed_dataset, write_tracker_dataset, write_tracker_partitions
+    repo, local = tmp_path / "tracker", tmp_path / "tracker.local"
+    write_tracker_dataset(_tracker(), repo)
+    base = len(read_tracker_dataset(repo))
+    new = apply_canonical_fields(pd.DataFrame([{"Datum": "05.10.2025.", "Ime i prezime": "Ivo I", "Lokacija": "Remote"}]))
+    assert seed_dataset(local, repo)
+    write_tracker_partitions(new, local)
+    assert len(read_tracker_dataset(local)) == base + 1
+    assert not seed_dataset(local, repo)                       # only before the first write
+    assert not seed_dataset(tmp_path / "other", tmp_path / "missing") and not list_partitions(tmp_path / "other")
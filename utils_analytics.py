@@ -0,0 +1,175 @@
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from utils_locations import LocationResolver
+from utils_tracker import parse_date_flexible
+
+# -------- Materialized weekly location aggregates --------
+# One row per (employee, calendar Year, ISO year, ISO week, location) with the number of days recorded there.
+# Year splits the ISO weeks that straddle New Year, so "this year up to week W" stays exact.
+WEEKLY_KEYS = ["Ime i prezime", "Year", "iso_year", "iso_week"]
+WEEKLY_COLUMNS = WEEKLY_KEYS + ["Lokacija", "location_id", "days"]
+WEEKLY_DTYPES = {"Year": "int16", "iso_year": "int16", "iso_week": "int8", "days": "int16"}
+ANALYTICS_DIR = "_analytics"
+WEEKLY_FILE = "weekly_locations.parquet"
+_STAMP = b"tracker_fingerprint"
+
+def _empty() -> pd.DataFrame:
+    return pd.DataFrame({c: pd.Series(dtype=WEEKLY_DTYPES.get(c, "object")) for c in WEEKLY_COLUMNS})
+
+def _dates(df: pd.DataFrame) -> pd.Series:
+    if "Datum_dt" in df.columns and pd.api.types.is_datetime64_any_dtype(df["Datum_dt"]):
+        return df["Datum_dt"]
+    if "date_iso" in df.columns and pd.api.types.is_datetime64_any_dtype(df["date_iso"]):
+        return df["date_iso"]
+    return parse_date_flexible(df["date_iso"] if "date_iso" in df.columns else df["Datum"])
+
+def _week_keys(df: pd.DataFrame) -> pd.DataFrame:
+    dt = _dates(df)
+    iso = dt.dt.isocalendar()
+    keys = pd.DataFrame({"Ime i prezime": df["Ime i prezime"].astype(str).str.strip(), "Year": dt.dt.year,
+                         "iso_year": iso["year"], "iso_week": iso["week"]}, index=df.index)
+    return keys[dt.notna()].astype({c: WEEKLY_DTYPES[c] for c in WEEKLY_KEYS[1:]})
+
+def weekly_locations(df: pd.DataFrame, resolver: LocationResolver) -> pd.DataFrame:
+    """Canonical tracker frame (string or compact) -> WEEKLY_COLUMNS; locations resolved once, blanks/blocked dropped."""
+    if df is None or df.empty or "Lokacija" not in df.columns:
+        return _empty()
+    keys = _week_keys(df)
+    res = resolver.resolve(df.loc[keys.index, "Lokacija"])
+    t = keys.assign(Lokacija=res["Lokacija"].astype(str), location_id=res["location_id"].astype(str))
+    t = t[t["Lokacija"] != ""]
+    out = t.groupby(WEEKLY_KEYS + ["Lokacija", "location_id"], sort=True).size().rename("days").reset_index()
+    return out.astype({"days": WEEKLY_DTYPES["days"]})[WEEKLY_COLUMNS]
+
+def week_window(rows: pd.DataFrame) -> tuple:
+    """(Monday, Sunday) spanning the ISO weeks of `rows`: the read window refresh_weekly_locations needs."""
+    dt = _dates(rows).dropna()
+    if dt.empty:
+        return None, None
+    monday = (dt.min() - pd.Timedelta(days=dt.min().weekday())).date()
+    return monday, (dt.max() + pd.Timedelta(days=6 - dt.max().weekday())).date()
+
+def refresh_weekly_locations(agg: pd.DataFrame, rows: pd.DataFrame, resolver: LocationResolver) -> pd.DataFrame:
+    """
+    Incremental update: the (employee, week) groups present in `rows` are recomputed from `rows` alone, so
+    `rows` must hold every current tracker row of those weeks (see week_window); all other groups are kept.
+    """
+    if rows is None or rows.empty:
+        return agg
+    if agg is None or agg.empty:
+        return weekly_locations(rows, resolver)
+    touched = pd.MultiIndex.from_frame(_week_keys(rows).drop_duplicates())
+    keep = agg[~pd.MultiIndex.from_frame(agg[WEEKLY_KEYS]).isin(touched)]
+    out = pd.concat([keep, weekly_locations(rows, resolver)], ignore_index=True)
+    return out.sort_values(WEEKLY_KEYS + ["Lokacija"], kind="mergesort", ignore_index=True)
+
+def combine_weekly_locations(parts) -> pd.DataFrame:
+    """weekly_locations of disjoint row sets (e.g. month by month) -> the aggregate of their union; split weeks are summed."""
+    parts = [p for p in parts if p is not None and not p.empty]
+    if not parts:
+        return _empty()
+    out = pd.concat(parts, ignore_index=True).groupby(WEEKLY_KEYS + ["Lokacija", "location_id"], sort=True)["days"].sum()
+    return out.reset_index().astype({"days": WEEKLY_DTYPES["days"]})[WEEKLY_COLUMNS]
+
+def location_counts(agg: pd.DataFrame, employee: str, year: int, through=None) -> pd.Series:
+    """
+    Days per canonical location for one employee in calendar `year`, up to and including the ISO week of `through`
+    (a date, or its (iso_year, iso_week) from WorkCalendar.iso_week).
+    """
+    if agg is None or agg.empty:
+        return pd.Series(dtype="int64", name="days")
+    a = agg[(agg["Ime i prezime"] == str(employee).strip()) & (agg["Year"] == int(year))]
+    if through is not None:
+        iso_year, iso_week = through if isinstance(through, tuple) else tuple(pd.Timestamp(through).isocalendar())[:2]
+        a = a[a["iso_year"].astype(int) * 100 + a["iso_week"].astype(int) <= iso_year * 100 + iso_week]
+    counts = a.groupby("Lokacija", sort=False)["days"].sum().astype("int64")
+    return counts[counts > 0].sort_values(ascending=False, kind="mergesort")
+
+# -------- Team dashboard (weekly aggregate x employee directory) --------
+ORG_UNITS = {"Odjel": "Department", "Manager": "Manager", "Director": "Director"}   # UI label -> directory column
+ORG_COLUMNS = list(ORG_UNITS.values())
+OFFICE_TYPES = {"URED"}
+
+def team_frame(agg: pd.DataFrame, directory, resolver: LocationResolver) -> pd.DataFrame:
+    """
+    Weekly aggregate + Department/Manager/Director (EmployeeDirectory.attach_org) + boolean remote
+    (LocationResolver.remote_mask) and office (catalog type) columns.
+    """
+    if agg is None or agg.empty:
+        return pd.concat([_empty(), pd.DataFrame(columns=ORG_COLUMNS + ["remote", "office"])], axis=1)
+    t = directory.attach_org(agg)
+    for c in ORG_COLUMNS:
+        t[c] = t[c].fillna("").astype(str)
+    t["remote"] = resolver.remote_mask(t["Lokacija"]).to_numpy()
+    t["office"] = resolver.resolve(t["Lokacija"])["location_type"].isin(OFFICE_TYPES).to_numpy()
+    return t
+
+def team_location_share(team: pd.DataFrame, by: str = "Department", year=None) -> pd.DataFrame:
+    """Org unit x location: % of recorded days in calendar `year`; `days` = recorded days of the unit."""
+    t = team if year is None else team[team["Year"] == int(year)]
+    days = t.pivot_table(index=by, columns="Lokacija", values="days", aggfunc="sum", fill_value=0, observed=True)
+    total = days.sum(axis=1)
+    share = days.div(total.where(total > 0), axis=0).mul(100).round(1)
+    share.insert(0, "days", total)
+    return share.sort_values("days", ascending=False, kind="mergesort")
+
+def weekly_attendance(team: pd.DataFrame, by: str = "Department", year=None) -> pd.DataFrame:
+    """Per (org unit, ISO week of `year`): office days, recorded days, office share (%) and its week-over-week change (pp)."""
+    t = team if year is None else team[team["iso_year"] == int(year)]
+    g = (t.assign(office_days=t["days"].where(t["office"], 0))
+          .groupby([by, "iso_year", "iso_week"], sort=True)[["office_days", "days"]].sum().reset_index())
+    g["office_share"] = (g["office_days"] / g["days"].where(g["days"] > 0) * 100).round(1)
+    g["wow"] = g.groupby(by, sort=False)["office_share"].diff().round(1)
+    return g
+
+def remote_quota_breaches(team: pd.DataFrame, year=None, quota: int = 1) -> pd.DataFrame:
+    """(employee, ISO week) with more than `quota` remote days: the form's weekly rule checked across a team."""
+    t = team[team["remote"]] if year is None else team[team["remote"] & (team["iso_year"] == int(year))]
+    g = t.groupby(["Ime i prezime", "iso_year", "iso_week"] + ORG_COLUMNS, sort=True)["days"].sum().rename("remote_days")
+    g = g.reset_index()
+    return g[g["remote_days"] > quota].reset_index(drop=True)
+
+def remote_quota_report(df: pd.DataFrame, resolver: LocationResolver, year: int, quota: int = 1) -> pd.DataFrame:
+    """
+    Full-year compliance from raw tracker rows, one row per employee over the ISO weeks of `year`: weeks with entries,
+    remote days, weeks above `quota` remote days, days above quota and the worst week. Sorted worst first.
+    """
+    cols = ["weeks", "remote_days", "weeks_over", "days_over", "max_remote_week"]
+    if df is None or df.empty or "Lokacija" not in df.columns:
+        return pd.DataFrame(columns=cols).rename_axis("Ime i prezime")
+    keys = _week_keys(df)
+    keys = keys[keys["iso_year"] == int(year)]
+    w = (keys.assign(remote=resolver.remote_mask(df.loc[keys.index, "Lokacija"]).to_numpy())
+             .groupby(["Ime i prezime", "iso_week"], sort=False)["remote"].sum().rename("remote_days").reset_index())
+    w["over"] = (w["remote_days"] - quota).clip(lower=0)
+    w["is_over"] = w["over"] > 0
+    out = w.groupby("Ime i prezime", sort=True).agg(weeks=("iso_week", "size"), remote_days=("remote_days", "sum"),
+                                                    weeks_over=("is_over", "sum"), days_over=("over", "sum"),
+                                                    max_remote_week=("remote_days", "max"))
+    return out[cols].astype("int64").sort_values(["days_over", "weeks_over"], ascending=False, kind="mergesort")
+
+# ---- persisted next to the partitioned dataset ----
+def weekly_path(root) -> Path:
+    return Path(root) / ANALYTICS_DIR / WEEKLY_FILE
+
+def write_weekly_locations(agg: pd.DataFrame, root, fingerprint: str) -> Path:
+    """Stamped with the dataset_fingerprint it was built from; a reader with another fingerprint ignores it."""
+    path = weekly_path(root)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    table = pa.Table.from_pandas(agg[WEEKLY_COLUMNS], preserve_index=False)
+    pq.write_table(table.replace_schema_metadata({**(table.schema.metadata or {}), _STAMP: fingerprint.encode()}), path)
+    return path
+
+def read_weekly_locations(root, fingerprint: str):
+    """The stored aggregate, or None when it is missing or was built from other data."""
+    path = weekly_path(root)
+    if not path.exists():
+        return None
+    table = pq.read_table(path)
+    if (table.schema.metadata or {}).get(_STAMP) != fingerprint.encode():
+        return None
+    return table.to_pandas().astype(WEEKLY_DTYPES)
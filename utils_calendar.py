@@ -0,0 +1,181 @@
+import os
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from utils_csv import read_csv_sniffed
+from utils_tracker import WEEKDAY_NAMES, parse_date_flexible
+
+# -------- Holidays (CroatianHolidays.csv) --------
+def holidays_from_frame(df: pd.DataFrame) -> dict:
+    """{date: name}; date column = first header with datum/date, name = first with praznik/holiday/naziv/name."""
+    if df is None or df.empty:
+        return {}
+    cols_lower = {str(c).lower(): c for c in df.columns}
+    date_col = next((cols_lower[k] for k in cols_lower if "datum" in k or "date" in k), df.columns[0])
+    name_col = next((cols_lower[k] for k in cols_lower if any(x in k for x in ["praznik", "holiday", "naziv", "name"])),
+                    df.columns[1] if len(df.columns) > 1 else df.columns[0])
+    days = parse_date_flexible(df[date_col])
+    ok = days.notna().to_numpy()
+    return dict(zip(days[ok].dt.date, df.loc[ok, name_col].astype(str).str.strip()))
+
+def read_holidays(path) -> dict:
+    return holidays_from_frame(read_csv_sniffed(path, sep=";"))
+
+# -------- Work calendar --------
+CALENDAR_COLUMNS = ["Datum", "Dan", "iso_year", "iso_week", "weekday", "Month", "Year", "holiday", "is_holiday", "working_day"]
+YEARS_BACK, YEARS_AHEAD = 10, 2      # default span around the current year (holiday years are always covered)
+
+def _as_date(d) -> date:
+    return d.date() if isinstance(d, datetime) else d
+
+class WorkCalendar:
+    """
+    Day table for whole ISO weeks around [first_year, last_year], built once: dd.mm.yyyy. text, weekday name (Dan),
+    ISO year/week, holiday name/flag and working_day (Mon-Fri, not a holiday). Dates are positions (days since `start`)
+    and (iso_year, iso_week) is a dict hit, so scalar queries are array lookups; ranges use a cumulative working-day count.
+    """
+    def __init__(self, holidays: dict, first_year: int, last_year: int):
+        lo, hi = date(first_year, 1, 1), date(last_year, 12, 31)
+        days = pd.date_range(lo - timedelta(days=lo.weekday()), hi + timedelta(days=6 - hi.weekday()), freq="D")
+        iso = days.isocalendar()
+        weekday = days.dayofweek.to_numpy(dtype=np.int8)
+        self.holidays = {pd.Timestamp(k).date(): str(v).strip() for k, v in (holidays or {}).items() if pd.notna(k)}
+        self.dates = days.date                                    # object array of datetime.date
+        holiday = np.array([self.holidays.get(d, "") for d in self.dates], dtype=object)
+        self.table = pd.DataFrame({
+            "Datum": days.strftime("%d.%m.%Y."), "Dan": np.array(WEEKDAY_NAMES, dtype=object)[weekday],
+            "iso_year": iso["year"].to_numpy(dtype=np.int16), "iso_week": iso["week"].to_numpy(dtype=np.int8),
+            "weekday": weekday, "Month": days.month.to_numpy(dtype=np.int8), "Year": days.year.to_numpy(dtype=np.int16),
+            "holiday": holiday, "is_holiday": holiday != "", "working_day": (weekday < 5) & (holiday == ""),
+        }, index=pd.Index(self.dates, name="date"))
+        self.start, self.end = self.dates[0], self.dates[-1]
+        self._iso = list(zip(self.table["iso_year"].tolist(), self.table["iso_week"].tolist()))
+        self._weeks = {self._iso[i]: i for i in range(0, len(self.dates), 7)}   # (iso_year, iso_week) -> Monday
+        self._holiday, self._working = holiday, self.table["working_day"].to_numpy()
+        self._rows = list(self.table.itertuples(name="Day"))    # per-day records for the form, built once
+        self._cum = np.concatenate([[0], np.cumsum(self._working)])
+
+    @classmethod
+    def from_csv(cls, path, first_year=None, last_year=None) -> "WorkCalendar":
+        holidays = read_holidays(path)
+        years = [d.year for d in holidays] + [date.today().year]
+        return cls(holidays, first_year or min(years) - YEARS_BACK, last_year or max(years) + YEARS_AHEAD)
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def __contains__(self, d) -> bool:
+        return 0 <= (_as_date(d) - self.start).days < len(self.dates)
+
+    def _pos(self, d) -> int:
+        i = (_as_date(d) - self.start).days
+        if not 0 <= i < len(self.dates):
+            raise KeyError(f"{d} is outside the work calendar ({self.start} - {self.end})")
+        return i
+
+    # ---- scalar lookups (form, cutoffs) ----
+    def iso_week(self, d) -> tuple:
+        """(iso_year, iso_week) of `d`."""
+        return self._iso[self._pos(d)]
+
+    def monday_of(self, d) -> date:
+        i = self._pos(d)
+        return self.dates[i - i % 7]
+
+    def holiday(self, d) -> str:
+        """Holiday name of `d`, "" on other days."""
+        return self._holiday[self._pos(d)]
+
+    def is_working_day(self, d) -> bool:
+        return bool(self._working[self._pos(d)])
+
+    def last_completed_week_end(self, d) -> date:
+        """Sunday before the ISO week of `d`."""
+        return self.monday_of(d) - timedelta(days=1)
+
+    def weeks_until_year_end(self, d) -> int:
+        """Whole weeks from the week of `d` to the week holding 31 December of its year."""
+        d = _as_date(d)
+        return max(0, (self._pos(date(d.year, 12, 31)) // 7) - (self._pos(d) // 7))
+
+    def week(self, iso_year: int, iso_week: int) -> pd.DataFrame:
+        """The 7 days (Monday first) of an ISO week."""
+        i = self._weeks.get((int(iso_year), int(iso_week)))
+        if i is None:
+            raise KeyError(f"week {iso_week}/{iso_year} is outside the work calendar ({self.start} - {self.end})")
+        return self.table.iloc[i:i + 7]
+
+    def week_of(self, d) -> pd.DataFrame:
+        i = self._pos(d)
+        return self.table.iloc[i - i % 7:i - i % 7 + 7]
+
+    def week_days(self, d) -> list:
+        """week_of as a list of Day tuples (Index = date, then CALENDAR_COLUMNS): no frame slicing per rerun."""
+        i = self._pos(d)
+        return self._rows[i - i % 7:i - i % 7 + 7]
+
+    # ---- ranges (working-day metrics) ----
+    def working_days(self, start, end) -> int:
+        """Working days in [start, end], both inclusive."""
+        a, b = self._pos(start), self._pos(end)
+        return int(self._cum[b + 1] - self._cum[a]) if b >= a else 0
+
+    def _recorded(self, df: pd.DataFrame, start, end, employees=None):
+        """(employee names, working-day mask of the window, employee x day grid of days with at least one entry)."""
+        a, b = self._pos(start), self._pos(end)
+        names = df["Ime i prezime"].astype(str).str.strip() if df is not None and not df.empty else pd.Series(dtype=object)
+        if employees is None:
+            employees = sorted(set(names) - {"", "nan"})
+        employees = pd.Index(dict.fromkeys(str(e).strip() for e in employees))
+        grid = np.zeros((len(employees), max(b - a + 1, 0)), dtype=bool)
+        if len(names) and len(employees):
+            if "Datum_dt" in df.columns:
+                dt = df["Datum_dt"]
+            elif "date_iso" in df.columns and pd.api.types.is_datetime64_any_dtype(df["date_iso"]):
+                dt = df["date_iso"]
+            else:
+                dt = parse_date_flexible(df["date_iso"] if "date_iso" in df.columns else df["Datum"])
+            day = dt.to_numpy(dtype="datetime64[D]")
+            pos = (day - np.datetime64(self.start, "D")).astype(np.int64) - a
+            who = employees.get_indexer(names)
+            ok = ~np.isnat(day) & (who >= 0) & (pos >= 0) & (pos < grid.shape[1])
+            grid[who[ok], pos[ok]] = True
+        return employees, self._working[a:b + 1], grid
+
+    def missing_entries(self, df: pd.DataFrame, start, end, employees=None) -> pd.DataFrame:
+        """
+        (employee, working day) pairs in [start, end] with no tracker row; `employees` defaults to the names in `df`.
+        Columns: Ime i prezime, date, Datum, Dan, iso_year, iso_week.
+        """
+        employees, working, grid = self._recorded(df, start, end, employees)
+        who, pos = np.nonzero(~grid & working)
+        days = self.table.iloc[self._pos(start) + pos] if len(pos) else self.table.iloc[:0]
+        out = days[["Datum", "Dan", "iso_year", "iso_week"]].reset_index()
+        out.insert(0, "Ime i prezime", employees.to_numpy()[who])
+        return out
+
+    def entry_coverage(self, df: pd.DataFrame, start, end, employees=None) -> pd.DataFrame:
+        """Per employee over [start, end]: working days, working days with an entry, missing days. Most missing first."""
+        employees, working, grid = self._recorded(df, start, end, employees)
+        recorded = (grid & working).sum(axis=1)
+        out = pd.DataFrame({"working_days": int(working.sum()), "recorded": recorded,
+                            "missing": int(working.sum()) - recorded}, index=employees.rename("Ime i prezime"))
+        return out.astype("int64").sort_values("missing", ascending=False, kind="mergesort")
+
+_CALENDAR_CACHE: dict = {}   # path -> ((mtime_ns, size, today's year), WorkCalendar)
+
+def load_work_calendar(path) -> WorkCalendar:
+    """WorkCalendar built once per holidays file version; missing file -> calendar without holidays."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return WorkCalendar({}, date.today().year - YEARS_BACK, date.today().year + YEARS_AHEAD)
+    ver = (st.st_mtime_ns, st.st_size, date.today().year)
+    hit = _CALENDAR_CACHE.get(str(path))
+    if hit and hit[0] == ver:
+        return hit[1]
+    cal = WorkCalendar.from_csv(path)
+    _CALENDAR_CACHE[str(path)] = (ver, cal)
+    return cal
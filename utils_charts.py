@@ -0,0 +1,63 @@
+import io
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+# -------- Location share chart (PNG bytes; shared by app.py and scripts/make_pdf.py) --------
+PIE_SIZE = (5.2, 5.2)
+PIE_DPI = 100
+
+def location_labels(counts: pd.Series) -> list:
+    """Legend entries "Location — days (share%)" in the order of `counts`."""
+    total = int(counts.sum())
+    return [f"{n} — {int(v)} ({v / total * 100:.1f}%)" for n, v in zip(counts.index, counts.values)]
+
+def location_pie_png(counts: pd.Series, dpi: int = PIE_DPI) -> bytes:
+    """
+    Pie + legend of days per location (utils_analytics.location_counts) as PNG bytes.
+    Drawn on a bare matplotlib Figure, not pyplot: nothing is registered in pyplot's global figure manager,
+    and the figure is cleared before returning, so no figure outlives the call.
+    """
+    from matplotlib.figure import Figure   # lazy: keeps matplotlib out of app cold start
+    fig = Figure(figsize=PIE_SIZE)
+    try:
+        ax = fig.subplots()
+        wedges, _ = ax.pie(counts.values, startangle=90)
+        ax.axis("equal")
+        ax.legend(wedges, location_labels(counts), loc="center left", bbox_to_anchor=(1, 0.5))
+        buf = io.BytesIO()
+        fig.savefig(buf, format="png", dpi=dpi, bbox_inches="tight")
+        return buf.getvalue()
+    finally:
+        fig.clear()
+
+class ChartCache:
+    """
+    Thread-safe LRU of rendered charts: key -> PNG bytes. Keys carry the data version (tracker sha or dataset
+    signature), so entries of an old version are never hit again and simply age out.
+    """
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "renders": 0}
+
+    def get_or_render(self, key, render) -> bytes:
+        with self._lock:
+            png = self._items.get(key)
+            if png is not None:
+                self._items.move_to_end(key)
+                self.stats["hits"] += 1
+                return png
+        png = render()   # outside the lock: a slow render does not block other sessions' hits
+        with self._lock:
+            self._items[key] = png
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+            self.stats["renders"] += 1
+        return png
+
+    def __len__(self) -> int:
+        return len(self._items)
@@ -0,0 +1,112 @@
+import codecs, io, os
+from pathlib import Path
+
+import pandas as pd
+
+# -------- CSV sniffing (one bounded read, one C-engine parse) --------
+SNIFF_BYTES = 64 * 1024
+SEPARATORS = (";", ",", "\t", "|")
+FALLBACK_ENCODINGS = ("utf-8", "cp1250", "latin1")
+
+_DIALECT_CACHE: dict = {}   # (path, mtime_ns, size) -> (encoding, sep)
+
+def _detect_encoding(prefix: bytes) -> str:
+    if prefix.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    try:
+        # incremental decoder tolerates a multi-byte char cut off at the end of the prefix
+        codecs.getincrementaldecoder("utf-8")().decode(prefix, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        pass
+    try:
+        # short prefixes fool unrestricted detection (CJK guesses); limit it to encodings these files actually use
+        from charset_normalizer import from_bytes
+        best = from_bytes(prefix, cp_isolation=["cp1250", "iso8859_2", "latin_1"]).best()
+        if best and best.encoding:
+            return best.encoding
+    except Exception:
+        pass
+    return "cp1250"
+
+def _header_line(prefix: bytes, encoding: str) -> str:
+    text = prefix.decode(encoding, errors="ignore")
+    for line in text.splitlines():
+        if line.strip():
+            return line
+    return ""
+
+def _detect_sep(header: str, preferred=None) -> str:
+    counts = {s: header.count(s) for s in SEPARATORS}
+    best = max(counts.values()) if counts else 0
+    if best == 0:
+        return preferred or ","
+    if preferred and counts.get(preferred) == best:
+        return preferred
+    return max(SEPARATORS, key=lambda s: counts[s])
+
+def sniff_csv(prefix: bytes, preferred_sep=None) -> tuple:
+    """(encoding, sep) from the first SNIFF_BYTES only: BOM/utf-8 check, charset_normalizer fallback, header delimiter count."""
+    prefix = prefix[:SNIFF_BYTES]
+    enc = _detect_encoding(prefix)
+    return enc, _detect_sep(_header_line(prefix, enc), preferred_sep)
+
+def sniff_csv_file(path, preferred_sep=None) -> tuple:
+    """sniff_csv for a file; cached per (path, mtime, size) so reruns skip even the prefix read."""
+    st = os.stat(path)
+    key = (str(path), st.st_mtime_ns, st.st_size, preferred_sep)
+    hit = _DIALECT_CACHE.get(key)
+    if hit is None:
+        with open(path, "rb") as fh:
+            hit = _DIALECT_CACHE[key] = sniff_csv(fh.read(SNIFF_BYTES), preferred_sep)
+    return hit
+
+def read_csv_sniffed(src, sep=None, preferred_sep=None, **kw) -> pd.DataFrame:
+    """
+    Reads a CSV path or bytes with a sniffed dialect and a single C-engine parse.
+    `sep` forces the delimiter; only a decode error triggers a retry with the fallback encodings.
+    """
+    if isinstance(src, (bytes, bytearray)):
+        enc, sniffed = sniff_csv(bytes(src[:SNIFF_BYTES]), preferred_sep)
+        open_src = lambda: io.BytesIO(src)
+    else:
+        if not Path(src).exists():
+            return pd.DataFrame()
+        enc, sniffed = sniff_csv_file(src, preferred_sep)
+        open_src = lambda: src
+    kw.setdefault("low_memory", False)
+    last_err = None
+    for e in [enc] + [x for x in FALLBACK_ENCODINGS if x != enc]:
+        try:
+            return pd.read_csv(open_src(), sep=sep or sniffed, encoding=e, engine="c", **kw)
+        except UnicodeDecodeError as err:
+            last_err = err
+        except pd.errors.EmptyDataError:
+            return pd.DataFrame()
+    raise last_err
+
+def iter_csv_sniffed(path, chunk_rows: int, sep=None, preferred_sep=None, **kw):
+    """
+    read_csv_sniffed in chunks of `chunk_rows` rows (same dialect sniffing, one C-engine pass over the file).
+    The fallback encodings are only tried while nothing has been yielded; a later decode error is raised.
+    """
+    if not Path(path).exists():
+        return
+    enc, sniffed = sniff_csv_file(path, preferred_sep)
+    kw.setdefault("low_memory", False)
+    last_err = None
+    for e in [enc] + [x for x in FALLBACK_ENCODINGS if x != enc]:
+        yielded = False
+        try:
+            with pd.read_csv(path, sep=sep or sniffed, encoding=e, engine="c", chunksize=chunk_rows, **kw) as reader:
+                for chunk in reader:
+                    yielded = True
+                    yield chunk
+            return
+        except UnicodeDecodeError as err:
+            if yielded:
+                raise
+            last_err = err
+        except pd.errors.EmptyDataError:
+            return
+    raise last_err
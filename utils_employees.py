@@ -0,0 +1,118 @@
+import os, re, unicodedata
+
+import pandas as pd
+
+from utils_csv import read_csv_sniffed
+
+# -------- Employee directory (Popis djelatnika) --------
+EMPLOYEE_COLUMNS = ["Name", "Department", "eMail", "Manager", "Director", "eMail_lc"]
+
+# canonical -> accepted headers
+EMPLOYEE_HEADERS = {
+    "Name": ["Name", "Ime i prezime", "ImeIPrezime", "Zaposlenik", "Employee"],
+    "Department": ["Department", "Odjel", "Odjeljenje", "OrgUnit", "Organizacijska jedinica"],
+    "eMail": ["eMail", "Email", "E-mail", "e-mail", "mail", "Kontakt e-mail", "Kontakt email"],
+    "Manager": ["Manager", "Menadzer", "Menadžer", "Prvi nadređeni", "Nadređeni", "Line Manager"],
+    "Director": ["Director", "Direktor", "Drugi nadređeni"],
+}
+REQUIRED_LABELS = {"Name": "Name / Ime i prezime", "Department": "Department / Odjel", "eMail": "Email / eMail / E-mail"}
+
+def _norm(s) -> str:
+    s = unicodedata.normalize("NFKD", str(s))
+    s = "".join(ch for ch in s if not unicodedata.combining(ch))
+    return re.sub(r"[^a-z0-9]+", "", s.lower())
+
+_HEADER_LOOKUP = {_norm(c): canon for canon, cands in EMPLOYEE_HEADERS.items() for c in cands}
+
+def normalize_employees(df: pd.DataFrame) -> pd.DataFrame:
+    """Raw roster -> EMPLOYEE_COLUMNS; raises ValueError naming the missing required columns."""
+    if df is None or df.empty:
+        return pd.DataFrame(columns=EMPLOYEE_COLUMNS)
+    picked = {}
+    for c in df.columns:
+        canon = _HEADER_LOOKUP.get(_norm(c))
+        if canon and canon not in picked:
+            picked[canon] = c
+    missing = [label for canon, label in REQUIRED_LABELS.items() if canon not in picked]
+    if missing:
+        raise ValueError("U CSV-u nedostaju obavezne kolone: " + ", ".join(missing) + f" | Nađene kolone: {list(df.columns)}")
+    out = pd.DataFrame({c: df[picked[c]] for c in ["Name", "Department", "eMail"]})
+    for c in ["Manager", "Director"]:
+        out[c] = df[picked[c]].fillna("").astype(str).str.strip() if c in picked else ""
+    out["eMail_lc"] = out["eMail"].astype(str).str.strip().str.lower()
+    return out[EMPLOYEE_COLUMNS].reset_index(drop=True)
+
+def _group_index(values: pd.Series) -> dict:
+    clean = values.fillna("").astype(str).str.strip()
+    return {k: list(v) for k, v in clean.groupby(clean, sort=False).groups.items() if k and k.lower() != "nan"}
+
+class EmployeeDirectory:
+    """
+    Roster with hash indexes: lowercase e-mail and name -> record, department/manager/director -> members.
+    Build once per file version (see load_employee_directory); lookups are dict hits.
+    """
+    def __init__(self, df: pd.DataFrame):
+        self.df = df.reset_index(drop=True)
+        self._records = self.df.to_dict("records")
+        # first occurrence wins, like the previous df[df.eMail_lc == email].iloc[0]
+        self._by_email, self._by_name = {}, {}
+        for i, (mail, name) in enumerate(zip(self.df["eMail_lc"], self.df["Name"].astype(str).str.strip())):
+            self._by_email.setdefault(mail, i)
+            self._by_name.setdefault(name, i)
+        self._by_unit = {c: _group_index(self.df[c]) for c in ["Department", "Manager", "Director"]}
+        # keyed (and deduped) on the stripped name, like _by_name: "Ana A" and "Ana A " are one label
+        org = self.df[["Department", "Manager", "Director"]].set_index(self.df["Name"].astype(str).str.strip())
+        self._org = org[~org.index.duplicated()]
+
+    @classmethod
+    def from_csv(cls, path) -> "EmployeeDirectory":
+        return cls(normalize_employees(read_csv_sniffed(path, sep=";")))
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def by_email(self, email: str):
+        i = self._by_email.get(str(email or "").strip().lower())
+        return None if i is None else self._records[i]
+
+    def by_name(self, name: str):
+        i = self._by_name.get(str(name or "").strip())
+        return None if i is None else self._records[i]
+
+    def units(self, kind: str = "Department") -> list:
+        return sorted(self._by_unit[kind])
+
+    def members(self, department=None, manager=None, director=None) -> pd.DataFrame:
+        """Roster rows for an org unit (intersection when several are given)."""
+        rows = None
+        for kind, key in (("Department", department), ("Manager", manager), ("Director", director)):
+            if key is None:
+                continue
+            hit = set(self._by_unit[kind].get(str(key).strip(), []))
+            rows = hit if rows is None else rows & hit
+        return self.df if rows is None else self.df.iloc[sorted(rows)]
+
+    def attach_org(self, frame: pd.DataFrame, name_col: str = "Ime i prezime") -> pd.DataFrame:
+        """Adds Department/Manager/Director to any frame keyed by employee name (distinct names looked up once)."""
+        codes, uniq = pd.factorize(frame[name_col], use_na_sentinel=False)
+        rows = self._org.reindex(pd.Index(uniq).astype(str).str.strip())
+        out = frame.copy()
+        for c in ["Department", "Manager", "Director"]:
+            out[c] = rows[c].to_numpy()[codes]
+        return out
+
+_DIRECTORY_CACHE: dict = {}   # path -> ((mtime_ns, size), EmployeeDirectory)
+
+def load_employee_directory(path) -> EmployeeDirectory:
+    """EmployeeDirectory built once per file version (mtime + size); missing file -> empty directory."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return EmployeeDirectory(pd.DataFrame(columns=EMPLOYEE_COLUMNS))
+    ver = (st.st_mtime_ns, st.st_size)
+    hit = _DIRECTORY_CACHE.get(str(path))
+    if hit and hit[0] == ver:
+        return hit[1]
+    directory = EmployeeDirectory.from_csv(path)
+    _DIRECTORY_CACHE[str(path)] = (ver, directory)
+    return directory
@@ -0,0 +1,360 @@
+import base64, hashlib, posixpath, random, time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from utils_store import (
+    DELTA_DIR, DELTA_KEY_COLUMNS, delta_file_name, merge_deltas, partition_in_window, partition_keys, partition_of,
+    partition_order, partition_path, read_tracker_parts, tracker_parquet_bytes,
+)
+from utils_tracker import dedupe_last_then_sort_desc, upsert_last_wins
+
+# -------- GitHub contents transport (pooled session, conditional GET, retries) --------
+API_URL = "https://api.github.com"
+RETRY_STATUSES = {500, 502, 503, 504}
+CONFLICT_STATUSES = {409}          # contents PUT with a stale sha
+REF_CONFLICT_STATUSES = {409, 422} # ref update that is not a fast-forward
+RAW = "application/vnd.github.raw+json"   # raw bytes, works past the 1 MB limit of the JSON "content" field
+
+def git_blob_sha(content: bytes) -> str:
+    """The sha git (and the contents API) reports for a file with these bytes."""
+    return hashlib.sha1(b"blob %d\0" % len(content) + content).hexdigest()
+
+class GitHubClient:
+    """
+    One keep-alive requests.Session per process (see app.gh_client) for the contents API.
+    fetch_frame() keeps an ETag -> (sha, parsed frame) cache per path, so an unchanged file costs one 304
+    and no parse. get_sha() reads the parent directory listing (no file body). put_file() retries 5xx
+    with exponential backoff and hands 409 sha conflicts to an on_conflict callback that rebuilds the payload.
+    """
+    def __init__(self, token, repo, branch="main", base_url=API_URL, retries=3, backoff=0.5, timeout=30, session=None):
+        self.repo, self.branch = repo.strip().strip("/"), branch
+        self.base_url = base_url.rstrip("/")
+        self.retries, self.backoff, self.timeout = retries, backoff, timeout
+        self.session = session or requests.Session()
+        self.session.headers.update({"Accept": "application/vnd.github+json", "X-GitHub-Api-Version": "2022-11-28"})
+        if token:
+            self.session.headers["Authorization"] = f"Bearer {token}"
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+        self.session.mount("https://", adapter); self.session.mount("http://", adapter)
+        self._frames: dict = {}   # path -> (etag, sha, frame)
+        self._shas: dict = {}     # path -> last known blob sha
+        self._refs: dict = {}     # branch -> (etag, head commit sha)
+        self._commit_trees: dict = {}   # commit sha -> root tree sha
+        self._trees: dict = {}    # root tree sha -> {path: blob sha}
+        self._dirs: dict = {}     # directory -> (etag, {path: blob sha})
+
+    def _url(self, path: str) -> str:
+        return f"{self.base_url}/repos/{self.repo}/contents/{path.lstrip('/')}"
+
+    def _sleep(self, attempt: int):
+        time.sleep(self.backoff * (2 ** attempt) * (0.5 + random.random() / 2))
+
+    def request(self, method, url, **kw) -> requests.Response:
+        """Session request; retries connection errors and RETRY_STATUSES with exponential backoff + jitter."""
+        kw.setdefault("timeout", self.timeout)
+        for attempt in range(self.retries + 1):
+            try:
+                r = self.session.request(method, url, **kw)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.retries: raise
+                self._sleep(attempt); continue
+            if r.status_code not in RETRY_STATUSES or attempt == self.retries:
+                return r
+            self._sleep(attempt)
+        return r
+
+    # ---- reads ----
+    def get_file(self, path, etag=None) -> requests.Response:
+        headers = {"If-None-Match": etag} if etag else None
+        r = self.request("GET", self._url(path), params={"ref": self.branch}, headers=headers)
+        if r.status_code == 200:
+            self._shas[path] = r.json().get("sha")
+        return r
+
+    def get_sha(self, path):
+        """Current blob sha from the parent directory listing (entries only, no base64 body); None if absent."""
+        parent, name = posixpath.split(path.strip("/"))
+        r = self.request("GET", self._url(parent), params={"ref": self.branch})
+        if r.status_code != 200:
+            return None
+        sha = next((e.get("sha") for e in r.json() if isinstance(e, dict) and e.get("name") == name), None)
+        self._shas[path] = sha
+        return sha
+
+    def known_sha(self, path):
+        return self._shas.get(path)
+
+    def fetch_frame(self, path, parse):
+        """
+        Conditional raw GET through the ETag cache: (frame, sha, etag, status). The body is read as raw bytes
+        (no base64, no 1 MB cut-off) and the sha is computed locally. `parse(bytes)` runs only on a 200;
+        a 304 returns the cached frame. 404 -> (None, None, None, 404); other errors leave the cache as is.
+        """
+        hit = self._frames.get(path)
+        headers = {"Accept": RAW}
+        if hit: headers["If-None-Match"] = hit[0]
+        r = self.request("GET", self._url(path), params={"ref": self.branch}, headers=headers)
+        if r.status_code == 304 and hit:
+            etag, sha, frame = hit
+            return frame, sha, etag, 304
+        if r.status_code == 200:
+            sha, etag = git_blob_sha(r.content), r.headers.get("ETag")
+            self._shas[path] = sha
+            frame = parse(r.content)
+            if etag: self._frames[path] = (etag, sha, frame)
+            return frame, sha, etag, 200
+        if r.status_code == 404:
+            self._frames.pop(path, None); self._shas.pop(path, None)
+        return None, None, None, r.status_code
+
+    # ---- Git Data API (blobs/trees/commits/refs) ----
+    def _git(self, suffix: str) -> str:
+        return f"{self.base_url}/repos/{self.repo}/git/{suffix}"
+
+    def _json(self, method, suffix, **kw):
+        r = self.request(method, self._git(suffix), **kw)
+        r.raise_for_status()
+        return r.json()
+
+    def head(self):
+        """Branch head commit sha via a conditional GET of the ref (304 while nothing was pushed); None if no branch."""
+        hit = self._refs.get(self.branch)
+        r = self.request("GET", self._git(f"ref/heads/{self.branch}"), headers={"If-None-Match": hit[0]} if hit else None)
+        if r.status_code == 304 and hit:
+            return hit[1]
+        if r.status_code == 404:
+            return None
+        r.raise_for_status()
+        sha = r.json()["object"]["sha"]
+        if r.headers.get("ETag"): self._refs[self.branch] = (r.headers["ETag"], sha)
+        return sha
+
+    def commit_tree(self, commit_sha: str) -> str:
+        if commit_sha not in self._commit_trees:   # commits are immutable
+            self._commit_trees[commit_sha] = self._json("GET", f"commits/{commit_sha}")["tree"]["sha"]
+        return self._commit_trees[commit_sha]
+
+    def list_tree(self, commit_sha: str, prefix: str = "") -> dict:
+        """{path: blob sha} for every file under `prefix` in the commit's tree (one recursive tree call, cached per tree)."""
+        tree = self.commit_tree(commit_sha)
+        if tree not in self._trees:
+            entries = self._json("GET", f"trees/{tree}", params={"recursive": "1"}).get("tree", [])
+            self._trees.clear()   # only the latest listing is useful
+            self._trees[tree] = {e["path"]: e["sha"] for e in entries if e.get("type") == "blob"}
+        prefix = prefix.strip("/") + "/" if prefix.strip("/") else ""
+        return {p: sha for p, sha in self._trees[tree].items() if p.startswith(prefix)}
+
+    def get_blob(self, sha: str) -> bytes:
+        r = self.request("GET", self._git(f"blobs/{sha}"), headers={"Accept": RAW})
+        r.raise_for_status()
+        return r.content
+
+    def create_blob(self, content: bytes) -> str:
+        return self._json("POST", "blobs", json={"content": base64.b64encode(content).decode("ascii"), "encoding": "base64"})["sha"]
+
+    def commit_files(self, files: dict, message, parent, remote_shas=None, committer=None, on_conflict=None, deletes=()):
+        """
+        One commit on top of `parent` with `files` ({path: bytes}) and `deletes` (paths); files whose blob sha
+        already matches `remote_shas` are not uploaded. The ref moves only as a fast-forward: if someone pushed
+        meanwhile, `on_conflict()` returns a rebuilt (files, parent, remote_shas[, deletes]) or None to give up.
+        Returns the ref-update response, or None when nothing changed.
+        """
+        for attempt in range(self.retries + 1):
+            remote_shas = remote_shas or {}
+            changed = {p: b for p, b in files.items() if remote_shas.get(p) != git_blob_sha(b)}
+            gone = [p for p in deletes if p in remote_shas and p not in files]
+            if not changed and not gone:
+                return None
+            entries = [{"path": p, "mode": "100644", "type": "blob", "sha": self.create_blob(b)} for p, b in changed.items()]
+            entries += [{"path": p, "mode": "100644", "type": "blob", "sha": None} for p in gone]
+            body = {"tree": entries}
+            if parent: body["base_tree"] = self.commit_tree(parent)
+            tree = self._json("POST", "trees", json=body)["sha"]
+            commit = {"message": message, "tree": tree, "parents": [parent] if parent else []}
+            if committer: commit["committer"] = committer
+            new_sha = self._json("POST", "commits", json=commit)["sha"]
+            r = self.request("PATCH", self._git(f"refs/heads/{self.branch}"), json={"sha": new_sha, "force": False})
+            if r.status_code == 200:
+                self._refs.pop(self.branch, None); self._frames.clear()
+                return r
+            if r.status_code not in REF_CONFLICT_STATUSES or on_conflict is None or attempt == self.retries:
+                return r
+            self._refs.pop(self.branch, None)
+            rebuilt = on_conflict()
+            if rebuilt is None:
+                return r
+            files, parent, remote_shas, *rest = rebuilt
+            if rest: deletes = rest[0]
+            self._sleep(attempt)
+        return r
+
+    def list_dir(self, path) -> dict:
+        """{path: blob sha} of the files in a directory via a conditional contents listing; {} if it does not exist."""
+        hit = self._dirs.get(path)
+        r = self.request("GET", self._url(path), params={"ref": self.branch}, headers={"If-None-Match": hit[0]} if hit else None)
+        if r.status_code == 304 and hit:
+            return hit[1]
+        if r.status_code != 200 or not isinstance(r.json(), list):
+            self._dirs.pop(path, None)
+            return {}
+        files = {e["path"]: e["sha"] for e in r.json() if e.get("type") == "file"}
+        if r.headers.get("ETag"): self._dirs[path] = (r.headers["ETag"], files)
+        return files
+
+    # ---- writes ----
+    def put_file(self, path, content: bytes, message, sha=None, committer=None, on_conflict=None) -> requests.Response:
+        """
+        Contents PUT. On a 409 (someone committed in between) the fresh sha is fetched and, when given,
+        `on_conflict(fresh_sha)` returns the content to retry with (None gives up); never overwrites blindly.
+        """
+        for attempt in range(self.retries + 1):
+            data = {"message": message, "content": base64.b64encode(content).decode("utf-8"), "branch": self.branch}
+            if sha: data["sha"] = sha
+            if committer: data["committer"] = committer
+            r = self.request("PUT", self._url(path), json=data, timeout=max(self.timeout, 60))
+            if r.status_code in (200, 201):
+                self._shas[path] = (r.json().get("content") or {}).get("sha")
+                self._frames.pop(path, None); self._dirs.pop(posixpath.dirname(path), None)
+                return r
+            if r.status_code not in CONFLICT_STATUSES or on_conflict is None or attempt == self.retries:
+                return r
+            sha = self.get_sha(path)
+            content = on_conflict(sha)
+            if content is None:
+                return r
+            self._sleep(attempt)
+        return r
+
+
+# -------- Delta log next to a single tracker file (contents API) --------
+class GitHubDeltaLog:
+    """
+    <root>/_delta/*.parquet written with contents PUTs to new paths (no shared sha, so saves do not conflict).
+    Readers list the directory (conditional GET) and fetch only unseen blobs; CI compaction folds them into the base.
+    """
+    def __init__(self, client: GitHubClient, root: str = "data/tracker"):
+        self.client, self.dir = client, f"{root.strip('/')}/{DELTA_DIR}"
+        self._blobs: dict = {}   # blob sha -> parquet bytes
+
+    def files(self) -> dict:
+        return dict(sorted(self.client.list_dir(self.dir).items()))
+
+    def read(self, files: dict) -> list:
+        for sha in [s for s in self._blobs if s not in files.values()]:
+            del self._blobs[sha]
+        for sha in files.values():
+            if sha not in self._blobs: self._blobs[sha] = self.client.get_blob(sha)
+        return [self._blobs[sha] for sha in files.values()]
+
+    def append(self, rows, message, committer=None):
+        """Save path: one new delta file with the canonical rows."""
+        if rows is None or rows.empty:
+            return None
+        payload = tracker_parquet_bytes(dedupe_last_then_sort_desc(rows))
+        return self.client.put_file(f"{self.dir}/{delta_file_name()}", payload, message, committer=committer,
+                                    on_conflict=lambda _sha: payload)
+
+# -------- Partitioned tracker on GitHub (Year=/Month= Parquet blobs + delta log) --------
+class GitHubDataset:
+    """
+    data/tracker/Year=YYYY/Month=M/part-0.parquet plus data/tracker/_delta/*.parquet in the repo, through the Git Data API.
+    Change check = one conditional GET of the branch ref; files are downloaded as raw blobs only when their sha
+    changes (bytes cached by sha). A save commits one new delta file (no shared file, so concurrent saves only
+    need a fast-forward retry); compact() folds the deltas into the partitions they touch.
+    """
+    def __init__(self, client: GitHubClient, root: str = "data/tracker"):
+        self.client, self.root = client, root.strip("/")
+        self._blobs: dict = {}   # blob sha -> parquet bytes (immutable)
+
+    def listing(self):
+        """(head commit sha, {path: blob sha} of partitions and deltas); (None, {}) for a missing branch."""
+        head = self.client.head()
+        if head is None:
+            return None, {}
+        return head, {p: sha for p, sha in self.client.list_tree(head, self.root).items() if partition_of(p) or self._is_delta(p)}
+
+    def _is_delta(self, path: str) -> bool:
+        return posixpath.dirname(path) == f"{self.root}/{DELTA_DIR}" and path.endswith(".parquet")
+
+    def deltas(self, files: dict) -> list:
+        return sorted(p for p in files if self._is_delta(p))
+
+    def _bytes(self, sha: str) -> bytes:
+        if sha not in self._blobs:
+            self._blobs[sha] = self.client.get_blob(sha)
+        return self._blobs[sha]
+
+    def _prune(self, live):
+        for sha in [s for s in self._blobs if s not in live]:
+            del self._blobs[sha]
+
+    def read(self, columns=None, date_from=None, date_to=None, employee=None, compact=False, listing=None):
+        """Like utils_store.read_tracker_dataset (partition pruning, pushdown, deltas merged), at the branch head."""
+        _head, files = listing or self.listing()
+        self._prune(set(files.values()))
+        parts = sorted(((partition_of(p), sha) for p, sha in files.items() if partition_of(p)), key=lambda x: partition_order(*x[0]))
+        deltas = [self._bytes(files[p]) for p in self.deltas(files)]
+        if deltas and columns is not None:
+            columns = list(columns) + [c for c in DELTA_KEY_COLUMNS if c not in columns]
+        base = read_tracker_parts([self._bytes(sha) for (y, m), sha in parts if partition_in_window(y, m, date_from, date_to)],
+                                  columns, date_from, date_to, employee, compact)
+        return merge_deltas(base, deltas, columns, date_from, date_to, employee, compact)
+
+    def _merged_files(self, rows, files) -> dict:
+        out = {}
+        keys = partition_keys(rows)
+        for (y, m), idx in keys.groupby(["y", "m"], sort=False).groups.items():
+            path = partition_path(self.root, y, m).as_posix()
+            base = read_tracker_parts([self._bytes(files[path])]) if path in files else None
+            out[path] = tracker_parquet_bytes(upsert_last_wins(base, rows.loc[idx]))
+        return out
+
+    def append_delta(self, rows, message, committer=None):
+        """Save path: commits the canonical rows as one new delta file; on a concurrent push only the parent changes."""
+        if rows is None or rows.empty:
+            return None
+        path = f"{self.root}/{DELTA_DIR}/{delta_file_name()}"
+        payload = {path: tracker_parquet_bytes(dedupe_last_then_sort_desc(rows))}
+        head, files = self.listing()
+
+        def rebase():
+            fresh_head, fresh = self.listing()
+            return payload, fresh_head, fresh
+
+        return self.client.commit_files(payload, message, head, remote_shas=files, committer=committer, on_conflict=rebase)
+
+    def write_rows(self, rows, message, committer=None):
+        """Upserts canonical rows straight into their partitions (last-wins) and commits only those."""
+        if rows is None or rows.empty:
+            return None
+        head, files = self.listing()
+
+        def rebuild():
+            fresh_head, fresh = self.listing()
+            return self._merged_files(rows, fresh), fresh_head, fresh
+
+        return self.client.commit_files(self._merged_files(rows, files), message, head, remote_shas=files,
+                                        committer=committer, on_conflict=rebuild)
+
+    def compact(self, message="Compact tracker deltas", committer=None):
+        """Folds every pending delta into its partitions and deletes the deltas, in one commit. None if nothing to do."""
+        head, files = self.listing()
+        if not self.deltas(files):
+            return None
+
+        def fold(files):
+            deltas = self.deltas(files)
+            rows = read_tracker_parts([self._bytes(files[p]) for p in deltas])
+            return (self._merged_files(rows, files) if not rows.empty else {}), deltas
+
+        merged, deltas = fold(files)
+
+        def rebuild():
+            # new deltas may have arrived meanwhile: fold those as well
+            fresh_head, fresh = self.listing()
+            merged, deltas = fold(fresh)
+            return merged, fresh_head, fresh, deltas
+
+        return self.client.commit_files(merged, message, head, remote_shas=files, committer=committer,
+                                        on_conflict=rebuild, deletes=deltas)
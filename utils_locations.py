@@ -0,0 +1,157 @@
+import os, re, unicodedata
+
+import numpy as np
+import pandas as pd
+
+from utils_csv import read_csv_sniffed
+from utils_tracker import is_remote_values
+
+# -------- Location catalog (Locations_normalized.csv) --------
+LOCATION_COLUMNS = ["location_id", "name", "type", "aliases"]
+BLOCKED = "__BLOCKED__"                  # "Neradni dan" is never a valid user entry
+_BLOCKED_RX = re.compile(r"(?i)^neradni\s*dan$")
+RESOLVED_COLUMNS = ["Lokacija", "location_id", "location_name", "location_type"]
+
+def norm_key(s: str) -> str:
+    s = unicodedata.normalize("NFKD", str(s or ""))
+    s = "".join(ch for ch in s if not unicodedata.combining(ch))
+    s = s.strip().lower()
+    return re.sub(r"\s+", " ", s)
+
+def norm_keys(values: pd.Series) -> pd.Series:
+    """Vectorized norm_key (NFKD, combining marks dropped, trimmed, lowercased, whitespace collapsed)."""
+    s = values.astype(object).where(values.notna(), "").astype(str)
+    s = s.str.normalize("NFKD").str.replace("[\u0300-\u036f\u1ab0-\u1aff\u1dc0-\u1dff\u20d0-\u20ff\ufe20-\ufe2f]", "", regex=True)
+    return s.str.strip().str.lower().str.replace(r"\s+", " ", regex=True)
+
+def normalize_location_catalog(df: pd.DataFrame) -> pd.DataFrame:
+    if df is None or df.empty:
+        return pd.DataFrame(columns=LOCATION_COLUMNS)
+    # header fix if needed
+    if all(str(c).lower().startswith("column") for c in df.columns) and len(df) > 0:
+        new_header = [str(x).strip() for x in df.iloc[0].tolist()]
+        df = df.iloc[1:].reset_index(drop=True)
+        df.columns = new_header
+    df = df.rename(columns={c: str(c).strip().lower() for c in df.columns})
+    for c in LOCATION_COLUMNS:
+        if c not in df.columns: df[c] = ""
+    df["aliases"] = df["aliases"].fillna("").astype(str)
+    df["type"] = df["type"].fillna("").astype(str).str.strip().str.upper()
+    df["name"] = df["name"].fillna("").astype(str).str.strip()
+    df["location_id"] = df["location_id"].fillna("").astype(str).str.strip()
+    df = df[(df["name"] != "") & (df["location_id"] != "")]
+    return df[LOCATION_COLUMNS].drop_duplicates("location_id", keep="last").reset_index(drop=True)
+
+class LocationResolver:
+    """
+    Precompiled catalog: normalized name/alias -> canonical name, plus id/type code tables.
+    resolve() canonicalizes a whole Series in one pass: distinct values are normalized together,
+    looked up once (memoized for free-text values) and broadcast back through categorical codes.
+    """
+    MEMO_MAX = 50_000
+
+    def __init__(self, catalog: pd.DataFrame):
+        self.catalog = normalize_location_catalog(catalog)
+        c = self.catalog
+        self.options = sorted(dict.fromkeys(c["name"]))
+        canon_keys = norm_keys(c["name"])
+        self.type_map = dict(zip(canon_keys, c["type"]))
+        self.id_map = dict(zip(canon_keys, c["location_id"]))
+        self.alias_map = {}
+        for key, canon, ali in zip(canon_keys, c["name"], c["aliases"]):   # file order: later rows win
+            self.alias_map[key] = canon
+            for a in ali.split("|"):
+                if a.strip(): self.alias_map[norm_key(a)] = canon
+        self._memo: dict = {}   # raw value -> (Lokacija, location_id, location_name, location_type)
+
+    @classmethod
+    def from_csv(cls, path) -> "LocationResolver":
+        return cls(read_csv_sniffed(path, sep=";"))
+
+    # ---- scalar API (form widgets) ----
+    def canonical(self, user_value) -> str:
+        """Canonical name, BLOCKED for "Neradni dan", the trimmed input when unknown."""
+        if not user_value: return ""
+        s = str(user_value).strip()
+        if _BLOCKED_RX.search(s):
+            return BLOCKED
+        return self.alias_map.get(norm_key(s), s)
+
+    def type_of(self, canon: str) -> str:
+        return self.type_map.get(norm_key(canon), "")
+
+    def id_of(self, canon: str) -> str:
+        return self.id_map.get(norm_key(canon), "")
+
+    # ---- vectorized API ----
+    def _resolve_distinct(self, values: list) -> list:
+        # the memo is shared by every session (cached resolver): answers come from a dict local to this call, so a
+        # concurrent clear() can only cost a re-lookup, never a KeyError
+        memo = self._memo
+        found = {v: memo.get(v) for v in values}
+        todo = [v for v, t in found.items() if t is None]
+        if todo:
+            raw = pd.Series(todo, dtype=object).str.strip()
+            keys = norm_keys(raw)
+            blocked = raw.str.match(_BLOCKED_RX)
+            new = {}
+            for v, r, k, b in zip(todo, raw, keys, blocked):
+                if b or not r:
+                    new[v] = ("", "", "", "")
+                    continue
+                canon = self.alias_map.get(k, r)
+                ck = k if canon == r else norm_key(canon)
+                new[v] = (canon, self.id_map.get(ck, ""), canon, self.type_map.get(ck, ""))
+            if len(memo) > self.MEMO_MAX:
+                memo.clear()
+            memo.update(new)
+            found.update(new)
+        return [found[v] for v in values]
+
+    def resolve(self, values: pd.Series) -> pd.DataFrame:
+        """Series of raw locations -> RESOLVED_COLUMNS (categoricals, same index); blocked/empty values -> ""."""
+        s = values.astype(object).where(values.notna(), "")
+        codes, uniq = pd.factorize(s)
+        table = self._resolve_distinct([str(u) for u in uniq])
+        out = {}
+        for j, col in enumerate(RESOLVED_COLUMNS):
+            col_codes, cats = pd.factorize(pd.Series([t[j] for t in table] or [""], dtype=object))
+            out[col] = pd.Categorical.from_codes(col_codes[codes] if len(codes) else np.array([], dtype=int), categories=cats)
+        return pd.DataFrame(out, index=values.index)
+
+    def remote_mask(self, values: pd.Series) -> pd.Series:
+        """
+        Vectorized app.is_remote_by_catalog: per distinct raw value, catalog type REMOTE first, then the keyword
+        fallback (is_remote_value) on the canonical name; blocked/empty -> False. Boolean Series, same index.
+        """
+        s = values.astype(object).where(values.notna(), "")
+        codes, uniq = pd.factorize(s)
+        table = self._resolve_distinct([str(u) for u in uniq])
+        canon = pd.Series([t[0] for t in table], dtype=object)
+        remote = (np.array([t[3] == "REMOTE" for t in table], dtype=bool) | is_remote_values(canon).to_numpy()) \
+            if table else np.zeros(0, dtype=bool)
+        return pd.Series(remote[codes] if len(codes) else np.zeros(0, dtype=bool), index=values.index)
+
+    def canonicalize_rows(self, df_rows: pd.DataFrame) -> pd.DataFrame:
+        """Save helper: Lokacija -> canonical name, plus location_id/location_name ("" for blocked values)."""
+        rows = df_rows.copy()
+        res = self.resolve(rows["Lokacija"] if "Lokacija" in rows.columns else pd.Series("", index=rows.index))
+        for c in ["Lokacija", "location_id", "location_name"]:
+            rows[c] = res[c].astype(object)
+        return rows
+
+_RESOLVER_CACHE: dict = {}   # path -> ((mtime_ns, size), LocationResolver)
+
+def load_location_resolver(path) -> LocationResolver:
+    """LocationResolver compiled once per file version; missing file -> empty catalog."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return LocationResolver(pd.DataFrame(columns=LOCATION_COLUMNS))
+    ver = (st.st_mtime_ns, st.st_size)
+    hit = _RESOLVER_CACHE.get(str(path))
+    if hit and hit[0] == ver:
+        return hit[1]
+    resolver = LocationResolver.from_csv(path)
+    _RESOLVER_CACHE[str(path)] = (ver, resolver)
+    return resolver
@@ -0,0 +1,57 @@
+import threading, time
+from concurrent.futures import Future
+
+import pandas as pd
+
+from utils_tracker import concat_normalized, dedupe_last_then_sort_desc
+
+# -------- Save coalescing (one write per burst of saves) --------
+class SaveCoalescer:
+    """
+    Process-wide save queue (one per Streamlit server, see app.save_coalescer). The first submit() of a burst
+    becomes the leader: it waits `window` seconds (or until `max_rows` are pending, or until the previous
+    flush finished), merges every pending row set once (last-wins, submission order) and calls `flush(rows)`
+    a single time. Every submitter gets that call's result, or its exception re-raised.
+    Flushes never overlap; `flush` itself rebases onto a fresh head on conflicts (see GitHubDataset.append_delta).
+    """
+    def __init__(self, flush, window: float = 0.5, max_rows: int = 5_000):
+        self.flush, self.window, self.max_rows = flush, window, max_rows
+        self._cond = threading.Condition()
+        self._flushing = threading.Lock()
+        self._pending: list = []     # (rows, Future) in submission order
+        self._leader = False
+        self.stats = {"saves": 0, "flushes": 0, "rows": 0}
+
+    def _pending_rows(self) -> int:
+        return sum(len(r) for r, _ in self._pending)
+
+    def submit(self, rows: pd.DataFrame, timeout=None):
+        """Queues canonical rows and blocks until the batch holding them is written; returns the flush result."""
+        fut = Future()
+        with self._cond:
+            self._pending.append((rows, fut))
+            lead = not self._leader
+            self._leader = True
+            if self._pending_rows() >= self.max_rows:
+                self._cond.notify_all()
+        if lead:
+            self._lead()
+        return fut.result(timeout)
+
+    def _lead(self):
+        deadline = time.monotonic() + self.window
+        with self._cond:
+            while self._pending_rows() < self.max_rows and (left := deadline - time.monotonic()) > 0:
+                self._cond.wait(left)
+        with self._flushing:
+            # saves that arrived while the previous batch was flushing join this one
+            with self._cond:
+                batch, self._pending, self._leader = self._pending, [], False
+            try:
+                merged = dedupe_last_then_sort_desc(concat_normalized([r for r, _ in batch]))
+                result = self.flush(merged)
+            except Exception as e:
+                for _, fut in batch: fut.set_exception(e)
+                return
+            self.stats["saves"] += len(batch); self.stats["flushes"] += 1; self.stats["rows"] += len(merged)
+            for _, fut in batch: fut.set_result(result)
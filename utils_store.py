@@ -0,0 +1,502 @@
+import hashlib, os, tempfile, uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from utils_csv import iter_csv_sniffed, read_csv_sniffed
+from utils_tracker import (
+    apply_canonical_fields, dedupe_last_then_sort_desc, format_dates, from_compact, last_wins_positions, mark_normalized,
+    parse_date_flexible, to_compact, upsert_last_wins, with_parsed_date,
+)
+
+# -------- Typed Parquet schema (CSV is import/export only) --------
+_DICT = pa.dictionary(pa.int32(), pa.string())
+
+TRACKER_SCHEMA = pa.schema([
+    ("Datum", pa.string()),
+    ("Dan", _DICT),
+    ("Ime i prezime", _DICT),
+    ("Odjel", _DICT),
+    ("Lokacija", _DICT),
+    ("Week", pa.int8()),
+    ("Month", pa.int8()),
+    ("Year", pa.int16()),
+    ("date_iso", pa.date32()),
+    ("record_id", pa.string()),
+    ("location_id", _DICT),
+    ("location_name", _DICT),
+    ("created_at", pa.string()),
+    ("updated_at", pa.string()),
+    ("source", _DICT),
+    ("version", pa.int16()),
+])
+TRACKER_COLUMNS = TRACKER_SCHEMA.names
+# derived in memory, never persisted
+HELPER_COLUMNS = ["Datum_dt", "Godina"]
+ROW_GROUP_SIZE = 50_000
+
+def _blank_to_null(s: pd.Series) -> pd.Series:
+    s = s.astype(object)
+    x = s.astype(str).str.strip()
+    return s.where(s.notna() & (x != "") & (x.str.lower() != "nan"), None)
+
+def _string_array(s: pd.Series) -> pa.Array:
+    """Column -> Arrow strings with blank / "nan" cells as nulls; string dtypes stay in Arrow compute (no per-cell objects)."""
+    if not pd.api.types.is_string_dtype(s.dtype) or s.dtype == object:
+        return pa.array(_blank_to_null(s).map(lambda v: None if v is None else str(v)), type=pa.string(), from_pandas=True)
+    arr = pa.array(s, from_pandas=True).cast(pa.string())
+    x = pc.utf8_trim_whitespace(arr)
+    return pc.if_else(pc.or_kleene(pc.equal(x, ""), pc.equal(pc.utf8_lower(x), "nan")), pa.scalar(None, pa.string()), arr)
+
+def to_arrow_table(df: pd.DataFrame) -> pa.Table:
+    """Canonical tracker frame (string or compact form) -> typed Arrow table (TRACKER_SCHEMA first, unknown extra columns as strings)."""
+    df = from_compact(df)
+    n = len(df)
+    arrays, fields = [], []
+    for f in TRACKER_SCHEMA:
+        col = df[f.name] if f.name in df.columns else pd.Series([None] * n, index=df.index, dtype=object)
+        if f.name == "date_iso":
+            dt = parse_date_flexible(col)
+            arr = pa.array(dt.dt.date.astype(object).where(dt.notna(), None), type=pa.date32(), from_pandas=True)
+        elif pa.types.is_integer(f.type):
+            num = pd.to_numeric(col, errors="coerce")
+            arr = pa.array(num.astype("Int64"), type=pa.int64(), from_pandas=True).cast(f.type, safe=False)
+        elif pa.types.is_dictionary(f.type):
+            arr = _string_array(col).dictionary_encode()
+        else:
+            arr = _string_array(col)
+        arrays.append(arr); fields.append(pa.field(f.name, arr.type))
+    for c in df.columns:
+        if c in TRACKER_COLUMNS or c in HELPER_COLUMNS:
+            continue
+        arr = _string_array(df[c])
+        arrays.append(arr); fields.append(pa.field(str(c), pa.string()))
+    return pa.Table.from_arrays(arrays, schema=pa.schema(fields))
+
+def from_arrow_table(table: pa.Table, compact: bool = False) -> pd.DataFrame:
+    """
+    Arrow table -> tracker frame in the in-memory string form used by utils_tracker
+    (date_iso as "YYYY-MM-DD", plain string columns). Datum_dt comes for free from the date32 column.
+    compact=True keeps dictionaries as categoricals and date_iso as datetime64 (utils_tracker.to_compact).
+    Full-schema reads are stamped as normalized (they were written from canonical frames).
+    """
+    df = table.to_pandas(date_as_object=False)
+    if compact:
+        if "date_iso" in df.columns:
+            df["Datum_dt"] = df["date_iso"].astype("datetime64[ns]")
+        return mark_normalized(to_compact(df))
+    for c in df.columns:
+        if isinstance(df[c].dtype, pd.CategoricalDtype):
+            df[c] = df[c].astype(object)
+    if "date_iso" in df.columns:
+        dt = df["date_iso"].astype("datetime64[ns]")
+        df["date_iso"] = format_dates(dt, "%Y-%m-%d", na="NaT")
+        df["Datum_dt"] = dt
+    return mark_normalized(df)
+
+# -------- Single-file store --------
+def write_tracker_parquet(df: pd.DataFrame, path, row_group_size: int = ROW_GROUP_SIZE) -> Path:
+    """
+    Writes atomically (tmp + replace); rows keep the canonical DESC order so row-group date stats stay tight.
+    `df` may also be an already typed table (to_arrow_table / iter_normalized_months).
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    pq.write_table(df if isinstance(df, pa.Table) else to_arrow_table(df), tmp, row_group_size=row_group_size, compression="zstd")
+    os.replace(tmp, path)
+    return path
+
+def tracker_parquet_bytes(df: pd.DataFrame, row_group_size: int = ROW_GROUP_SIZE) -> bytes:
+    """Same file as write_tracker_parquet, in memory (remote stores upload these bytes)."""
+    buf = pa.BufferOutputStream()
+    pq.write_table(to_arrow_table(df), buf, row_group_size=row_group_size, compression="zstd")
+    return buf.getvalue().to_pybytes()
+
+def tracker_filters(date_from=None, date_to=None, employee=None):
+    """Arrow/Parquet predicate for a date window and/or employee (None when unfiltered)."""
+    flt = []
+    if date_from is not None: flt.append(("date_iso", ">=", pd.Timestamp(date_from).date()))
+    if date_to is not None:   flt.append(("date_iso", "<=", pd.Timestamp(date_to).date()))
+    if employee is not None:  flt.append(("Ime i prezime", "=", str(employee)))
+    return flt or None
+
+def _projection(columns, available):
+    if columns is None:
+        return None
+    cols = list(dict.fromkeys(list(columns) + ["date_iso"]))
+    return [c for c in cols if c in available]
+
+def read_tracker_parquet(path, columns=None, date_from=None, date_to=None, employee=None, compact=False) -> pd.DataFrame:
+    """Reads only the requested columns; row groups outside the date window are skipped via statistics."""
+    path = Path(path)
+    if not path.exists():
+        return pd.DataFrame()
+    names = pq.read_schema(path).names
+    table = pq.read_table(path, columns=_projection(columns, names),
+                          filters=tracker_filters(date_from, date_to, employee))
+    return from_arrow_table(table, compact)
+
+def filter_tracker(df: pd.DataFrame, columns=None, date_from=None, date_to=None, employee=None) -> pd.DataFrame:
+    """In-memory equivalent of read_tracker_parquet for a frame that already has Datum_dt."""
+    if df is None or df.empty:
+        return pd.DataFrame() if df is None else df
+    mask = np.ones(len(df), dtype=bool)
+    if date_from is not None: mask &= (df["Datum_dt"] >= pd.Timestamp(date_from)).to_numpy()
+    if date_to is not None:   mask &= (df["Datum_dt"] <= pd.Timestamp(date_to)).to_numpy()
+    if employee is not None:  mask &= (df["Ime i prezime"] == employee).to_numpy()
+    out = df[mask]
+    if columns is not None:
+        keep = list(dict.fromkeys(list(columns) + ["date_iso", "Datum_dt"]))
+        out = out[[c for c in keep if c in out.columns]]
+    return out
+
+# -------- CSV import/export --------
+def import_tracker_csv(path, source: str = "import", **read_kw) -> pd.DataFrame:
+    df = read_csv_sniffed(path, **read_kw)
+    return dedupe_last_then_sort_desc(apply_canonical_fields(df, source=source))
+
+def export_tracker_csv(df: pd.DataFrame, path=None, sep: str = ";"):
+    """Canonical column order, helper columns dropped; returns the CSV text when path is None."""
+    out = from_compact(df).drop(columns=[c for c in HELPER_COLUMNS if c in df.columns])
+    cols = [c for c in TRACKER_COLUMNS if c in out.columns] + [c for c in out.columns if c not in TRACKER_COLUMNS]
+    return out[cols].to_csv(path, index=False, sep=sep)
+
+def read_tracker(path, columns=None, date_from=None, date_to=None, employee=None) -> pd.DataFrame:
+    """Parquet with projection/pushdown; a .csv path is imported (canonical + last-wins) and filtered in memory."""
+    path = Path(path)
+    if path.suffix.lower() == ".parquet":
+        return read_tracker_parquet(path, columns, date_from, date_to, employee)
+    if not path.exists():
+        return pd.DataFrame()
+    return filter_tracker(with_parsed_date(import_tracker_csv(path)), columns, date_from, date_to, employee)
+
+# -------- Year/Month partitioned dataset --------
+# <root>/Year=YYYY/Month=M/part-0.parquet; rows without a valid date go to Year=0/Month=0.
+PART_FILE = "part-0.parquet"
+
+def partition_keys(df: pd.DataFrame) -> pd.DataFrame:
+    dt = df["Datum_dt"] if "Datum_dt" in df.columns and pd.api.types.is_datetime64_any_dtype(df["Datum_dt"]) \
+        else parse_date_flexible(df["date_iso"])
+    return pd.DataFrame({"y": dt.dt.year.fillna(0).astype(int), "m": dt.dt.month.fillna(0).astype(int)}, index=df.index)
+
+def partition_path(root, year: int, month: int) -> Path:
+    return Path(root) / f"Year={int(year)}" / f"Month={int(month)}" / PART_FILE
+
+def partition_of(path):
+    """(year, month) from a ".../Year=Y/Month=M/part-0.parquet" path (str or Path, any separator); None otherwise."""
+    parts = str(path).replace("\\", "/").split("/")
+    if len(parts) < 3 or parts[-1] != PART_FILE or not parts[-3].startswith("Year=") or not parts[-2].startswith("Month="):
+        return None
+    try: return int(parts[-3][5:]), int(parts[-2][6:])
+    except ValueError: return None
+
+def partition_order(year: int, month: int) -> tuple:
+    # tracker order: undated partition first (like "NaT" in a DESC string sort), then newest first
+    return (year != 0, -year, -month)
+
+def list_partitions(root) -> list:
+    """[(year, month, path)] in tracker order (see partition_order)."""
+    root = Path(root)
+    out = []
+    if not root.exists():
+        return out
+    for f in root.glob(f"Year=*/Month=*/{PART_FILE}"):
+        ym = partition_of(f)
+        if ym: out.append((*ym, f))
+    return sorted(out, key=lambda p: partition_order(p[0], p[1]))
+
+LISTING_RETRIES = 5
+
+def with_fresh_listing(read):
+    """
+    Runs read() (lists the dataset files, then opens them) again when a listed file is gone: another session's
+    compaction folded its deltas into the partitions (or pruned a partition) in between, so a new listing sees it all.
+    """
+    for attempt in range(LISTING_RETRIES):
+        try:
+            return read()
+        except FileNotFoundError:
+            if attempt == LISTING_RETRIES - 1:
+                raise
+
+def dataset_files(root) -> list:
+    return [p for _, _, p in list_partitions(root)] + list_deltas(root)
+
+def dataset_signature(root) -> tuple:
+    """Cheap change marker (partition and delta files + mtimes) for caches."""
+    return with_fresh_listing(lambda: tuple((str(p), p.stat().st_mtime_ns) for p in dataset_files(root)))
+
+def dataset_num_rows(root) -> int:
+    """Row count from the Parquet footers of the partitions and pending deltas (deltas may repeat keys)."""
+    return with_fresh_listing(lambda: sum(pq.read_metadata(p).num_rows for p in dataset_files(root)))
+
+_FILE_DIGESTS: dict = {}   # root -> {relative path: ((inode, size, mtime_ns), sha1 of the bytes)}
+
+def dataset_fingerprint(root) -> str:
+    """
+    Content hash of the partition and delta files; unlike dataset_signature it survives a fresh checkout.
+    Per-file digests are kept by (inode, size, mtime_ns), so after a save only the new delta file is read.
+    """
+    root = Path(root)
+    def read():
+        seen, cur, h = _FILE_DIGESTS.get(str(root), {}), {}, hashlib.sha1()
+        for p in dataset_files(root):
+            rel, st = p.relative_to(root).as_posix(), p.stat()
+            ver = (st.st_ino, st.st_size, st.st_mtime_ns)
+            hit = seen.get(rel)
+            cur[rel] = (ver, hit[1] if hit and hit[0] == ver else hashlib.sha1(p.read_bytes()).digest())
+            h.update(rel.encode() + b"\0" + cur[rel][1])
+        _FILE_DIGESTS[str(root)] = cur
+        return h.hexdigest()
+    return with_fresh_listing(read)
+
+def partition_in_window(year: int, month: int, date_from, date_to) -> bool:
+    if year == 0:
+        return date_from is None and date_to is None
+    if date_from is not None:
+        f = pd.Timestamp(date_from)
+        if (year, month) < (f.year, f.month): return False
+    if date_to is not None:
+        t = pd.Timestamp(date_to)
+        if (year, month) > (t.year, t.month): return False
+    return True
+
+def read_tracker_parts(sources, columns=None, date_from=None, date_to=None, employee=None, compact=False) -> pd.DataFrame:
+    """Parquet files (paths or in-memory bytes) -> one frame; projection + date/employee pushdown inside each."""
+    flt = tracker_filters(date_from, date_to, employee)
+    tables = []
+    for src in sources:
+        src = pa.BufferReader(src) if isinstance(src, (bytes, bytearray)) else src
+        pf = pq.ParquetFile(src)
+        tables.append(pq.read_table(src, columns=_projection(columns, pf.schema_arrow.names), filters=flt))
+    if not tables:
+        return pd.DataFrame()
+    return from_arrow_table(pa.concat_tables(tables, promote_options="permissive"), compact)
+
+def read_tracker_dataset(root, columns=None, date_from=None, date_to=None, employee=None, compact=False) -> pd.DataFrame:
+    """
+    Opens only the partitions overlapping [date_from, date_to]; inside them, projection + pushdown as in
+    read_tracker_parquet. Pending delta files are merged on top (last-wins). Safe against a concurrent
+    compaction (see with_fresh_listing).
+    """
+    def read():
+        parts = [p for y, m, p in list_partitions(root) if partition_in_window(y, m, date_from, date_to)]
+        deltas = list_deltas(root)
+        cols = list(columns) + [c for c in DELTA_KEY_COLUMNS if c not in columns] if deltas and columns is not None else columns
+        base = read_tracker_parts(parts, cols, date_from, date_to, employee, compact)
+        return merge_deltas(base, deltas, cols, date_from, date_to, employee, compact)
+    return with_fresh_listing(read)
+
+def write_tracker_dataset(df: pd.DataFrame, root, row_group_size: int = ROW_GROUP_SIZE) -> list:
+    """Full rewrite: one file per Year/Month (canonical DESC order kept); stale partitions and deltas are removed."""
+    root = Path(root)
+    keys = partition_keys(df)
+    written = []
+    for (y, m), idx in keys.groupby(["y", "m"], sort=False).groups.items():
+        written.append(write_tracker_parquet(df.loc[idx], partition_path(root, y, m), row_group_size))
+    prune_dataset(root, written)
+    return written
+
+def prune_dataset(root, keep) -> None:
+    """After a full rewrite: removes every partition not in `keep` (paths) and all pending deltas."""
+    keep = {str(p) for p in keep}
+    for _, _, p in list_partitions(root):
+        if str(p) not in keep:
+            p.unlink()
+    for p in list_deltas(root):
+        p.unlink(missing_ok=True)
+
+def seed_dataset(root, source) -> bool:
+    """
+    Before the first write to a `root` without partitions whose readers fall back to `source`: copies `source` (deltas
+    applied), so the write lands on top of that history instead of hiding it. Deltas already in `root` (saved before it
+    was seeded) are folded in on top. False when `root` has partitions or `source` has no data.
+    """
+    if list_partitions(root) or not (list_partitions(source) or list_deltas(source)):
+        return False
+    write_tracker_dataset(merge_deltas(read_tracker_dataset(source), list_deltas(root)), root)
+    return True
+
+def write_tracker_partitions(rows: pd.DataFrame, root) -> list:
+    """Save path: upserts canonical rows into the partitions they touch (last-wins) and rewrites only those."""
+    if rows is None or rows.empty:
+        return []
+    keys = partition_keys(rows)
+    written = []
+    for (y, m), idx in keys.groupby(["y", "m"], sort=False).groups.items():
+        path = partition_path(root, y, m)
+        part = read_tracker_parquet(path)
+        written.append(write_tracker_parquet(upsert_last_wins(part, rows.loc[idx]), path))
+    return written
+
+# -------- Write-ahead delta log --------
+# <root>/_delta/<utc timestamp>-<random>.parquet: one immutable file per save with just the canonical rows.
+# Readers apply deltas in name (= time) order on top of the partitions; compact_deltas folds them in.
+DELTA_DIR = "_delta"
+DELTA_KEY_COLUMNS = ["Ime i prezime", "date_iso", "updated_at"]
+
+def delta_file_name(now=None) -> str:
+    now = now or datetime.now(timezone.utc)
+    return f"{now.strftime('%Y%m%dT%H%M%S%fZ')}-{uuid.uuid4().hex[:8]}.parquet"
+
+def list_deltas(root) -> list:
+    d = Path(root) / DELTA_DIR
+    return sorted(d.glob("*.parquet")) if d.exists() else []
+
+def append_delta(rows: pd.DataFrame, root) -> Path:
+    """Save path: writes the canonical rows as a new delta file; cost does not depend on history size."""
+    return write_tracker_parquet(dedupe_last_then_sort_desc(rows), Path(root) / DELTA_DIR / delta_file_name())
+
+def merge_deltas(base: pd.DataFrame, deltas, columns=None, date_from=None, date_to=None, employee=None,
+                 compact=False) -> pd.DataFrame:
+    """Applies delta files (paths or bytes, oldest first) to a canonical base frame with last-wins; same window as base."""
+    if not deltas:
+        return base
+    rows = read_tracker_parts(deltas, columns, date_from, date_to, employee)
+    if rows.empty:
+        return base
+    if base is None or base.empty:
+        rows = dedupe_last_then_sort_desc(rows).reset_index(drop=True)
+        return to_compact(rows) if compact else rows
+    return upsert_last_wins(base, rows)
+
+def compact_deltas(root) -> int:
+    """Folds all pending deltas into their partitions, then deletes them (re-applying a delta is harmless). Returns the count."""
+    deltas = list_deltas(root)
+    if not deltas:
+        return 0
+    write_tracker_partitions(read_tracker_parts(deltas), root)
+    for p in deltas:
+        p.unlink(missing_ok=True)
+    return len(deltas)
+
+# -------- Streaming normalize (CI, bounded memory) --------
+# Pass 1 parses the CSV in chunks, canonicalizes and types each chunk once, and spills its rows to one temporary
+# Parquet file per Year/Month (deltas to a second set). A (name, date) key never leaves its month, so pass 2 dedupes
+# month by month, in Arrow: only the key columns go through pandas, the rows themselves are one take.
+# Peak memory is one chunk or one month, never the whole history.
+CHUNK_ROWS = 100_000
+
+def _conform(table: pa.Table, schema: pa.Schema) -> pa.Table:
+    """
+    Same columns and types as `schema` (missing columns as nulls) so one writer takes every table. Columns the schema
+    lacks raise ValueError: a writer opened on an earlier table must never drop them silently.
+    """
+    extra = [c for c in table.column_names if c not in schema.names]
+    if extra:
+        raise ValueError(f"columns not in the target schema: {extra}")
+    n = table.num_rows
+    cols = [table.column(f.name).cast(f.type) if f.name in table.column_names else pa.nulls(n, f.type) for f in schema]
+    return pa.Table.from_arrays(cols, schema=schema)
+
+def _spill_months(frames, spill_dir, tag: str) -> dict:
+    """
+    Canonical frames -> rows appended, in input order, to <spill_dir>/<tag>-Y-M-<segment>.parquet; returns
+    {(y, m): [segment paths]}. A table with columns the month's open file lacks (e.g. a delta with an extra column)
+    closes it and opens the next segment on the union schema, so the segments read back in order hold every column.
+    """
+    writers, paths = {}, {}
+    try:
+        for df in frames:
+            if df is None or df.empty:
+                continue
+            table = to_arrow_table(df)
+            d = table.column("date_iso")   # typed date32: the month comes without re-parsing strings
+            ym = pc.fill_null(pc.add(pc.multiply(pc.year(d), 100), pc.month(d)), 0).to_numpy()
+            order = np.argsort(ym, kind="stable")
+            keys, starts = np.unique(ym[order], return_index=True)
+            for k, pos in zip(keys.tolist(), np.split(order, starts[1:])):
+                y, m = divmod(k, 100)
+                w = writers.get((y, m))
+                if w is None or not set(table.column_names) <= set(w.schema.names):
+                    schema = table.schema if w is None else pa.unify_schemas([w.schema, table.schema])
+                    if w is not None:
+                        w.close()
+                    segments = paths.setdefault((y, m), [])
+                    segments.append(Path(spill_dir) / f"{tag}-{y}-{m}-{len(segments)}.parquet")
+                    w = writers[(y, m)] = pq.ParquetWriter(segments[-1], schema)
+                w.write_table(_conform(table.take(pos), w.schema))
+    finally:
+        for w in writers.values():
+            w.close()
+    return paths
+
+def _read_spill(segments) -> pa.Table:
+    return pa.concat_tables([pq.read_table(p) for p in segments], promote_options="permissive")
+
+def last_wins_table(base: pa.Table = None, rows: pa.Table = None) -> pa.Table:
+    """
+    dedupe_last_then_sort_desc(base), then upsert_last_wins of `rows` on top, for typed Arrow tables
+    (either may be None). Same result as the pandas functions; only the key columns are converted.
+    """
+    table = pa.concat_tables([t for t in (base, rows) if t is not None], promote_options="permissive")
+    keys = from_arrow_table(table.select(DELTA_KEY_COLUMNS))
+    n = base.num_rows if base is not None else 0
+    pos = last_wins_positions(keys.iloc[:n])
+    if rows is not None:
+        new = n + last_wins_positions(keys.iloc[n:])
+        index = lambda p: pd.MultiIndex.from_frame(keys.iloc[p][["Ime i prezime", "date_iso"]])
+        pos = np.concatenate([pos[~index(pos).isin(index(new))], new])
+        pos = pos[last_wins_positions(keys.iloc[pos])]   # unique keys now: this only orders them
+    return table.take(pos)
+
+def iter_normalized_months(csv_path, deltas=(), source: str = "import", chunk_rows: int = CHUNK_ROWS, **read_kw):
+    """
+    Streaming import_tracker_csv + merge_deltas: yields (year, month, typed Arrow table) in tracker order
+    (partition_order), each month canonical, last-wins and DESC; concatenated they are the in-memory result.
+    Every month has the same schema, the union of all chunk and delta columns, so one writer takes them all.
+    """
+    with tempfile.TemporaryDirectory(prefix="tracker-spill-") as tmp:
+        chunks = (apply_canonical_fields(c, source=source) for c in iter_csv_sniffed(csv_path, chunk_rows, **read_kw))
+        base = _spill_months(chunks, tmp, "base")
+        pending = _spill_months((read_tracker_parts([d]) for d in deltas), tmp, "delta")
+        segments = [p for spill in (base, pending) for paths in spill.values() for p in paths]
+        schema = pa.unify_schemas([pq.read_schema(p) for p in segments]) if segments else None
+        for y, m in sorted(base.keys() | pending.keys(), key=lambda k: partition_order(*k)):
+            table = last_wins_table(_read_spill(base[(y, m)]) if (y, m) in base else None,
+                                    _read_spill(pending[(y, m)]) if (y, m) in pending else None)
+            yield y, m, _conform(table, schema)
+
+class TrackerParquetWriter:
+    """
+    write_tracker_parquet for frames or typed tables that arrive in tracker order (e.g. from iter_normalized_months):
+    one ParquetWriter stream (row groups never straddle two writes), replaced atomically when the `with` block exits
+    cleanly. The file schema is the first table's: a later table with other columns raises ValueError.
+    """
+    def __init__(self, path, row_group_size: int = ROW_GROUP_SIZE):
+        self.path = Path(path)
+        self.row_group_size = row_group_size
+        self._tmp = self.path.with_name(self.path.name + ".tmp")
+        self._writer = None
+        self.rows = 0
+
+    def write(self, data) -> None:
+        table = data if isinstance(data, pa.Table) else to_arrow_table(data)
+        if table.num_rows == 0:
+            return
+        if self._writer is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._writer = pq.ParquetWriter(self._tmp, table.schema, compression="zstd")
+        self._writer.write_table(_conform(table, self._writer.schema), row_group_size=self.row_group_size)
+        self.rows += table.num_rows
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *_):
+        if self._writer is None:
+            if exc_type is None:
+                pq.write_table(to_arrow_table(pd.DataFrame(columns=TRACKER_COLUMNS)), self._tmp, compression="zstd")
+        else:
+            self._writer.close()
+        if exc_type is None:
+            os.replace(self._tmp, self.path)
+        else:
+            self._tmp.unlink(missing_ok=True)
+        return False
@@ -1,7 +1,8 @@
-
+import numpy as np
 import pandas as pd
-import re, unicodedata, uuid
+import hashlib, re, unicodedata, uuid, weakref
 from datetime import datetime
+from functools import lru_cache
 
 # -------- Helpers for header normalization --------
 def _norm_header(s: str) -> str:
@@ -37,38 +38,229 @@ def _build_reverse_map():
 
 REV = _build_reverse_map()
 
+# -------- Flexible date parsing --------
+# Detected pattern -> explicit format; the tracker mixes "01.09.2025.", "1.9.2025", "03/09/2025" and ISO.
+_DATE_FORMATS = [
+    (re.compile(r"^\d{4}-\d{1,2}-\d{1,2}$"), "%Y-%m-%d"),
+    (re.compile(r"^\d{1,2}\.\d{1,2}\.\d{4}$"), "%d.%m.%Y"),
+    (re.compile(r"^\d{1,2}/\d{1,2}/\d{4}$"), "%d/%m/%Y"),
+    (re.compile(r"^\d{1,2}-\d{1,2}-\d{4}$"), "%d-%m-%Y"),
+]
+_ISO_WITH_TIME = re.compile(r"^(\d{4}-\d{1,2}-\d{1,2})[T ]")
+_DATE_CACHE: dict = {}          # raw value -> np.datetime64 (few hundred distinct dates in practice)
+_DATE_CACHE_MAX = 100_000
+_NAT = np.datetime64("NaT", "ns")
+
+def _clean_date_str(s: str) -> str:
+    s = re.sub(r"\s*\.\s*", ".", s.strip())
+    m = _ISO_WITH_TIME.match(s)
+    return m.group(1) if m else s.rstrip(".")
+
+def _parse_distinct(values) -> np.ndarray:
+    """Parses distinct raw values into datetime64[ns]; one explicit-format to_datetime call per detected pattern."""
+    out = np.empty(len(values), dtype="datetime64[ns]")
+    groups: dict = {}
+    for i, v in enumerate(values):
+        hit = _DATE_CACHE.get(v) if isinstance(v, str) else None
+        if hit is not None:
+            out[i] = hit
+        elif isinstance(v, str):
+            c = _clean_date_str(v)
+            fmt = next((f for rx, f in _DATE_FORMATS if rx.match(c)), None)
+            if fmt is None:
+                out[i] = _NAT
+            else:
+                groups.setdefault(fmt, []).append((i, c))
+        else:
+            try: out[i] = pd.Timestamp(v).to_datetime64()
+            except Exception: out[i] = _NAT
+    for fmt, items in groups.items():
+        parsed = pd.to_datetime([c for _, c in items], format=fmt, errors="coerce").to_numpy().astype("datetime64[ns]")
+        for (i, _), ts in zip(items, parsed):
+            out[i] = ts
+    if len(_DATE_CACHE) > _DATE_CACHE_MAX:
+        _DATE_CACHE.clear()
+    for v, ts in zip(values, out):
+        if isinstance(v, str): _DATE_CACHE[v] = ts
+    return out
+
+def parse_date_flexible(value):
+    """
+    Parses tracker dates ("01.09.2025.", "1.9.2025", "03/09/2025", "2025-09-01", ...), always day-first.
+    Scalar -> pd.Timestamp / NaT. Series/array -> datetime64[ns] Series: each distinct value is parsed once
+    (results are cached across calls), then broadcast back by factorize codes.
+    """
+    if isinstance(value, (pd.Series, pd.Index, np.ndarray, list, tuple)):
+        s = value if isinstance(value, pd.Series) else pd.Series(value)
+        if pd.api.types.is_datetime64_any_dtype(s):
+            return s.astype("datetime64[ns]")
+        codes, uniq = pd.factorize(s.astype(object))
+        parsed = np.append(_parse_distinct(list(uniq)), _NAT)   # code -1 (missing) -> NaT
+        return pd.Series(parsed[codes], index=s.index, name=s.name)
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return pd.NaT
+    return pd.Timestamp(_parse_distinct([value])[0])
+
+def format_dates(dt: pd.Series, fmt: str, na: str = "") -> pd.Series:
+    """strftime over distinct values only."""
+    codes, uniq = pd.factorize(dt)
+    text = np.append(pd.DatetimeIndex(uniq).strftime(fmt).to_numpy(dtype=object), na)
+    return pd.Series(text[codes], index=dt.index, dtype=object)
+
+def _blank(s: pd.Series) -> pd.Series:
+    x = s.astype(str).str.strip().str.lower()
+    return s.isna() | x.isin(["", "nan", "nat", "none"])
+
+# -------- Normalized-frame marker --------
+# The pipeline stages (normalize_columns, apply_canonical_fields, dedupe_last_then_sort_desc, with_parsed_date,
+# to_compact/from_compact) register the frame they return and skip the header pass and the defensive deep copies for
+# a registered input. The registry holds weak references to the frame objects themselves (id -> frame, checked by
+# identity), so a derived frame (assign, slices, concat, copy) is never registered, and an id reused after the
+# registered frame was collected does not match. Stages never modify their input; a caller that edits a registered
+# frame in place must not hand it back as normalized.
+NORMALIZED_COLUMNS = ["Datum","Dan","Ime i prezime","Odjel","Lokacija","Week","Month","Year","date_iso"]
+_NORMALIZED = weakref.WeakValueDictionary()   # id(frame) -> frame; entries vanish with the frame
+
+def is_normalized(df: pd.DataFrame) -> bool:
+    return df is not None and _NORMALIZED.get(id(df)) is df and all(c in df.columns for c in NORMALIZED_COLUMNS)
+
+def mark_normalized(df: pd.DataFrame) -> pd.DataFrame:
+    """Registers a frame that already has canonical headers and a derived date_iso (e.g. read back from our own Parquet)."""
+    if df is not None and all(c in df.columns for c in NORMALIZED_COLUMNS):
+        _NORMALIZED[id(df)] = df
+    return df
+
+def concat_normalized(frames) -> pd.DataFrame:
+    """pd.concat that keeps the stamp when every input carries it (columns missing in one input come back as NaN)."""
+    out = pd.concat(frames, ignore_index=True)
+    return mark_normalized(out) if all(is_normalized(f) for f in frames) else out
+
 def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Canonical headers, all NORMALIZED_COLUMNS present, date_iso derived from Datum. Rows whose date_iso is derived
+    also get their parseable Datum rewritten to "dd.mm.yyyy." ("1.9.2025" -> "01.09.2025."); rows that already
+    have a date_iso and unparseable dates keep their text. A stamped frame is returned as is.
+    """
     if df is None or df.empty:
         return pd.DataFrame(columns=list(HEADER_MAP.keys()))
+    if is_normalized(df):
+        return df
     # drop duplicate columns by first occurrence
-    df = df.loc[:, ~df.columns.duplicated()].copy()
-    # rename by normalized headers
+    dup = df.columns.duplicated()
+    if dup.any():
+        df = df.loc[:, ~dup]
+    # rename by normalized headers (a new frame: the caller's frame is never modified below)
     newcols = {}
     for c in df.columns:
         canon = REV.get(_norm_header(c))
         newcols[c] = canon if canon else c
-    t = df.rename(columns=newcols).copy()
+    t = df.rename(columns=newcols)
 
     # ensure all expected columns exist
-    for c in ["Datum","Dan","Ime i prezime","Odjel","Lokacija","Week","Month","Year","date_iso"]:
+    for c in NORMALIZED_COLUMNS:
         if c not in t.columns:
             t[c] = ""
 
-    # if date_iso empty, derive from Datum
-    if t["date_iso"].isna().all() or (t["date_iso"].astype(str).str.strip() == "").all():
-        s = t["Datum"].astype(str).str.strip().str.rstrip(".")
-        t["date_iso"] = pd.to_datetime(s, dayfirst=True, errors="coerce").dt.date.astype("str")
+    # derive date_iso from Datum where missing; Datum gets the canonical "dd.mm.yyyy." form there
+    # (a compact, datetime-typed date_iso is already parsed: undated rows stay NaT)
+    need = np.zeros(len(t), dtype=bool) if is_compact(t) else _blank(t["date_iso"]).to_numpy()
+    if need.any():
+        dt = parse_date_flexible(t["Datum"][need])
+        iso = t["date_iso"].to_numpy(dtype=object, copy=True)
+        iso[need] = format_dates(dt, "%Y-%m-%d", na="NaT").to_numpy()
+        t["date_iso"] = iso
+        ok = dt.notna().to_numpy()
+        if ok.any():
+            datum = t["Datum"].to_numpy(dtype=object, copy=True)
+            datum[np.flatnonzero(need)[ok]] = format_dates(dt[ok], "%d.%m.%Y.").to_numpy()
+            t["Datum"] = datum
 
-    return t
+    return mark_normalized(t)
 
 def with_parsed_date(df: pd.DataFrame) -> pd.DataFrame:
     if df is None or df.empty:
         return pd.DataFrame(columns=["Datum_dt","Godina"])
-    t = normalize_columns(df).copy()
-    s = t["Datum"].astype(str).str.strip().str.rstrip(".")
-    t["Datum_dt"] = pd.to_datetime(s, dayfirst=True, errors="coerce")
+    t = normalize_columns(df).copy(deep=False)   # only whole columns are (re)assigned below
+    # reuse an already parsed column; otherwise parse date_iso (ISO, cached) and fall back to Datum
+    if "Datum_dt" not in t.columns or not pd.api.types.is_datetime64_any_dtype(t["Datum_dt"]):
+        dt = parse_date_flexible(t["date_iso"])
+        if dt.isna().any():
+            dt = dt.fillna(parse_date_flexible(t["Datum"]))
+        t["Datum_dt"] = dt
     t["Godina"] = t["Datum_dt"].dt.year
-    return t
+    return mark_normalized(t)
+
+# -------- Compact in-memory schema --------
+# Load-time representation: low-cardinality text as categoricals, timestamps as datetime64,
+# calendar numbers as small ints. from_compact() restores the string form used by the functions below.
+COMPACT_CATEGORIES = ["Datum", "Dan", "Ime i prezime", "Odjel", "Lokacija", "source", "location_id", "location_name"]
+COMPACT_DATETIMES = ["date_iso", "created_at", "updated_at"]
+COMPACT_INTS = {"Week": "Int8", "Month": "Int8", "Year": "Int16", "version": "Int16"}
+_TS_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+def is_compact(df: pd.DataFrame) -> bool:
+    return df is not None and "date_iso" in df.columns and pd.api.types.is_datetime64_any_dtype(df["date_iso"])
+
+def _parse_timestamps(s: pd.Series):
+    """ISO timestamps -> naive UTC datetime64[ns]; None if any non-blank value does not parse (column stays text)."""
+    dt = pd.to_datetime(s.where(~_blank(s)), format="ISO8601", utc=True, errors="coerce")
+    if (dt.isna() & ~_blank(s)).any():
+        return None
+    return dt.dt.tz_localize(None).astype("datetime64[ns]")
+
+def to_compact(df: pd.DataFrame) -> pd.DataFrame:
+    """Tracker frame -> compact dtypes (see COMPACT_*); columns that are missing or already compact are left as they are."""
+    if df is None or df.empty:
+        return df
+    normalized = is_normalized(df)
+    t = df.copy(deep=False)   # columns are replaced, never written in place
+    for c in COMPACT_CATEGORIES:
+        if c in t.columns and not isinstance(t[c].dtype, pd.CategoricalDtype):
+            t[c] = t[c].astype("category")
+    if "date_iso" in t.columns:
+        dt = t["Datum_dt"] if "Datum_dt" in t.columns and pd.api.types.is_datetime64_any_dtype(t["Datum_dt"]) \
+            else parse_date_flexible(t["date_iso"])
+        t["date_iso"] = dt
+    for c in ["created_at", "updated_at"]:
+        if c in t.columns and not pd.api.types.is_datetime64_any_dtype(t[c]):
+            dt = _parse_timestamps(t[c])
+            if dt is not None: t[c] = dt
+    for c, dtype in COMPACT_INTS.items():
+        if c in t.columns:
+            t[c] = pd.to_numeric(t[c], errors="coerce").round().astype(dtype)
+    return mark_normalized(t) if normalized else t
+
+def from_compact(df: pd.DataFrame) -> pd.DataFrame:
+    """Compact frame -> string form (date_iso "YYYY-MM-DD"/"NaT", timestamps "...Z", plain text columns)."""
+    if df is None or df.empty:
+        return df
+    normalized = is_normalized(df)
+    t = df.copy(deep=False)
+    for c in t.columns:
+        if isinstance(t[c].dtype, pd.CategoricalDtype):
+            t[c] = t[c].astype(object)
+    if is_compact(t):
+        t["date_iso"] = format_dates(t["date_iso"], "%Y-%m-%d", na="NaT")
+    for c in ["created_at", "updated_at"]:
+        if c in t.columns and pd.api.types.is_datetime64_any_dtype(t[c]):
+            t[c] = format_dates(t[c], _TS_FORMAT)
+    return mark_normalized(t) if normalized else t
+
+def _string_form(df: pd.DataFrame) -> pd.DataFrame:
+    return from_compact(df) if is_compact(df) else df
+
+def memory_report(df: pd.DataFrame) -> pd.DataFrame:
+    """Per-column deep memory (bytes) of the string form vs the compact form, with a TOTAL row."""
+    plain, compact = _string_form(df), to_compact(_string_form(df))
+    rep = pd.DataFrame({
+        "dtype": plain.dtypes.astype(str),
+        "bytes": plain.memory_usage(index=False, deep=True),
+        "compact_dtype": compact.dtypes.astype(str),
+        "compact_bytes": compact.memory_usage(index=False, deep=True),
+    })
+    rep.loc["TOTAL"] = ["", rep["bytes"].sum(), "", rep["compact_bytes"].sum()]
+    rep["ratio"] = (rep["bytes"] / rep["compact_bytes"].where(rep["compact_bytes"] > 0)).round(1)
+    return rep
 
 # -------- Remote detection fallback --------
 REMOTE_KEYS = {"remote","wfh","work from home","home office","rad od kuce","rad od kuće","kuci","kući","doma"}
@@ -79,15 +271,51 @@ def is_remote_value(s: str) -> bool:
     x = x.lower()
     return any(k in x for k in REMOTE_KEYS)
 
+_REMOTE_RX = "|".join(re.escape(k) for k in sorted(REMOTE_KEYS))
+_COMBINING_RX = "[\u0300-\u036f\u1ab0-\u1aff\u1dc0-\u1dff\u20d0-\u20ff\ufe20-\ufe2f]"
+
+def is_remote_values(values: pd.Series) -> pd.Series:
+    """Vectorized is_remote_value: distinct values normalized and scanned once, broadcast back through factorize codes."""
+    codes, uniq = pd.factorize(values.astype(object).where(values.notna(), ""))
+    u = pd.Series(uniq, dtype=object).astype(str).str.normalize("NFKD").str.replace(_COMBINING_RX, "", regex=True)
+    hit = u.str.lower().str.contains(_REMOTE_RX, regex=True).to_numpy(dtype=bool)
+    return pd.Series(hit[codes] if len(codes) else np.zeros(0, dtype=bool), index=values.index)
+
 # -------- Stable keys --------
 def record_key(name: str, date_iso: str) -> str:
     n = str(name or "").strip()
     d = str(date_iso or "").strip()
     return f"{n}|{d}"
 
+RECORD_NS = uuid.UUID('12345678-1234-5678-1234-567812345678')
+
+_RECORD_NS_BYTES = RECORD_NS.bytes
+
+@lru_cache(maxsize=100_000)
+def _record_id_for_key(key: str) -> str:
+    # == str(uuid.uuid5(RECORD_NS, key)) without building UUID objects
+    h = bytearray(hashlib.sha1(_RECORD_NS_BYTES + key.encode("utf-8")).digest()[:16])
+    h[6] = (h[6] & 0x0F) | 0x50
+    h[8] = (h[8] & 0x3F) | 0x80
+    x = h.hex()
+    return f"{x[:8]}-{x[8:12]}-{x[12:16]}-{x[16:20]}-{x[20:]}"
+
 def new_record_id(name: str, date_iso: str) -> str:
-    ns = uuid.UUID('12345678-1234-5678-1234-567812345678')
-    return str(uuid.uuid5(ns, record_key(name, date_iso)))
+    return _record_id_for_key(record_key(name, date_iso))
+
+def _str_stripped(values) -> np.ndarray:
+    # str(v).strip() per distinct value (NaN -> "nan", like the per-row path), broadcast back by codes
+    codes, uniq = pd.factorize(pd.Series(values, dtype=object), use_na_sentinel=False)
+    return np.array([str(u).strip() for u in uniq], dtype=object)[codes]
+
+def new_record_ids(names, dates) -> np.ndarray:
+    """
+    Batched new_record_id: one uuid5 per distinct (name, date_iso) pair, memoized across calls.
+    Returns an object array aligned with the inputs.
+    """
+    keys = _str_stripped(names) + "|" + _str_stripped(dates)
+    codes, uniq = pd.factorize(keys)
+    return np.array([_record_id_for_key(k) for k in uniq], dtype=object)[codes]
 
 # -------- Canonical fields & dedupe --------
 def apply_canonical_fields(df: pd.DataFrame, source: str = "app") -> pd.DataFrame:
@@ -97,21 +325,16 @@ def apply_canonical_fields(df: pd.DataFrame, source: str = "app") -> pd.DataFram
     """
     if df is None:
         return pd.DataFrame()
-    t = normalize_columns(df).copy()
-
-    # Derive/ensure date_iso again (in case of mixed types)
-    s = t["date_iso"].astype(str).str.strip()
-    need_iso = (s == "") | (s.str.lower() == "nan")
-    if need_iso.any():
-        src = t["Datum"].astype(str).str.strip().str.rstrip(".")
-        t.loc[need_iso, "date_iso"] = pd.to_datetime(src, dayfirst=True, errors="coerce").dt.date.astype("str")
-
-    # Safe per-row generation to avoid any shape mismatch (even if duplicate headers sneaked in)
-    if "record_id" not in t.columns or t["record_id"].isna().any() or (t["record_id"].astype(str).str.strip() == "").any():
-        t["record_id"] = t.apply(
-            lambda r: new_record_id(str(r.get("Ime i prezime","")), str(r.get("date_iso",""))),
-            axis=1
-        )
+    t = normalize_columns(_string_form(df)).copy(deep=False)   # only whole columns are (re)assigned below
+
+    # Ids only for rows missing one; batched + memoized per (name, date_iso)
+    if "record_id" not in t.columns:
+        t["record_id"] = new_record_ids(t["Ime i prezime"], t["date_iso"])
+    else:
+        missing = t["record_id"].isna() | (t["record_id"].astype(str).str.strip() == "")
+        if missing.any():
+            filled = pd.Series(new_record_ids(t.loc[missing, "Ime i prezime"], t.loc[missing, "date_iso"]), index=t.index[missing])
+            t["record_id"] = t["record_id"].astype(object).where(~missing, filled)
 
     now = datetime.utcnow().isoformat(timespec="seconds") + "Z"
     if "created_at" not in t.columns: t["created_at"] = now
@@ -131,22 +354,259 @@ def apply_canonical_fields(df: pd.DataFrame, source: str = "app") -> pd.DataFram
         "date_iso","record_id","location_id","location_name","created_at","updated_at","source","version"
     ]
     cols = [c for c in preferred if c in t.columns] + [c for c in t.columns if c not in preferred]
-    return t[cols]
+    return mark_normalized(t[cols])
+
+DEDUPE_ENGINES = ("hash", "sort")
 
-def dedupe_last_then_sort_desc(df: pd.DataFrame) -> pd.DataFrame:
+def _dense_rank(values: pd.Series) -> np.ndarray:
+    """Integer codes that order like the values themselves (missing -> -1, below everything); one sort of the distinct values."""
+    codes, uniq = pd.factorize(values)
+    pos = np.empty(len(uniq) + 1, dtype=np.int64)
+    pos[np.asarray(uniq.argsort())] = np.arange(len(uniq))
+    pos[-1] = -1
+    return pos[codes]
+
+def _last_wins_order(t: pd.DataFrame) -> np.ndarray:
+    """
+    Positions of the winning row per (Ime i prezime, date_iso) -- highest updated_at (string order, missing lowest),
+    then the last row -- already in presentation order (date_iso DESC, name ASC, missing last).
+    Winners come from one groupby-max over an int64 score (updated_at rank * n + row) whose remainder is the row;
+    the name/date ranks that key the groups also order the survivors, so the frame is taken only once.
+    """
+    n = len(t)
+    name, day = _dense_rank(t["Ime i prezime"]), _dense_rank(t["date_iso"])
+    key = (name + 1) * (int(day.max()) + 2) + (day + 1)
+    score = (_dense_rank(t["updated_at"]) + 1) * n + np.arange(n, dtype=np.int64)
+    rows = np.sort(pd.Series(score).groupby(key, sort=False).max().to_numpy() % n)
+    last = np.iinfo(np.int64).max
+    by_day = np.where(day[rows] < 0, last, -day[rows])
+    by_name = np.where(name[rows] < 0, last, name[rows])
+    return rows[np.lexsort((by_name, by_day))]
+
+def last_wins_positions(keys: pd.DataFrame) -> np.ndarray:
+    """
+    Row positions dedupe_last_then_sort_desc keeps, in its output order, for a frame that already holds just the
+    canonical string-form keys (Ime i prezime, date_iso, updated_at); callers take their own rows (e.g. Arrow tables).
+    """
+    return _last_wins_order(keys) if len(keys) else np.empty(0, dtype=np.int64)
+
+def dedupe_last_then_sort_desc(df: pd.DataFrame, engine: str = "hash") -> pd.DataFrame:
+    """
+    Last-wins per (Ime i prezime, date_iso), then date_iso DESC / name ASC.
+    engine="hash": winners from one groupby over integer-encoded keys, only the survivors are ordered (one take).
+    engine="sort": reference implementation (three-key mergesort, drop_duplicates, two-key mergesort); same result.
+    """
+    if engine not in DEDUPE_ENGINES:
+        raise ValueError(f"unknown dedupe engine {engine!r}; expected one of {DEDUPE_ENGINES}")
     if df is None or df.empty:
         return pd.DataFrame(columns=["Datum","Ime i prezime","date_iso"])
-    t = normalize_columns(df).copy()
+    t = normalize_columns(_string_form(df)).copy(deep=False)
     # Ensure updated_at for ordering
     if "updated_at" not in t.columns:
         t["updated_at"] = ""
+    if engine == "hash":
+        return mark_normalized(t.take(_last_wins_order(t)))
     # For stable ordering use original row index
     t["_row"] = range(len(t))
     # Sort so that latest (by date_iso, updated_at, row) comes first
     t = t.sort_values(["date_iso","updated_at","_row"], ascending=[False, False, False], kind="mergesort")
     # Keep first occurrence per (Ime i prezime, date_iso) → that's "last-wins"
-    if "Ime i prezime" in t.columns and "date_iso" in t.columns:
-        t = t.drop_duplicates(subset=["Ime i prezime","date_iso"], keep="first")
+    t = t.drop_duplicates(subset=["Ime i prezime","date_iso"], keep="first").drop(columns=["_row"])
     # Final presentation ordering
     t = t.sort_values(["date_iso","Ime i prezime"], ascending=[False, True], kind="mergesort")
-    return t.drop(columns=["_row"], errors="ignore")
+    return mark_normalized(t)
+
+
+# -------- Incremental merge (save path) --------
+def _date_order_keys(s: pd.Series) -> np.ndarray:
+    """Keys that sort like the canonical date_iso strings: for datetimes NaT ranks above every date (as "NaT" > "2025-...")."""
+    if pd.api.types.is_datetime64_any_dtype(s):
+        return np.where(s.isna().to_numpy(), np.iinfo(np.int64).max, s.to_numpy().astype("datetime64[ns]").view("int64"))
+    return s.fillna("").astype(str).to_numpy()
+
+def _align_compact(base: pd.DataFrame, rows: pd.DataFrame):
+    # shared categories so the concat below stays categorical; add_categories keeps base's codes untouched
+    base = base.copy(deep=False)
+    for c in COMPACT_CATEGORIES:
+        if c in base.columns and c in rows.columns and isinstance(base[c].dtype, pd.CategoricalDtype):
+            new = pd.Index(rows[c].dropna().astype(object).unique()).difference(base[c].cat.categories)
+            if len(new): base[c] = base[c].cat.add_categories(new)
+            rows[c] = rows[c].astype(object).astype(base[c].dtype)
+    for c in ["created_at", "updated_at"]:
+        # base kept a text column (unparseable timestamps) -> rows follow
+        if c in base.columns and c in rows.columns and not pd.api.types.is_datetime64_any_dtype(base[c]) \
+                and pd.api.types.is_datetime64_any_dtype(rows[c]):
+            rows[c] = format_dates(rows[c], _TS_FORMAT)
+    return base, rows
+
+# DESC date keys of the frames upsert_last_wins returned (id -> (weakref, keys), dropped with the frame), so a chain
+# of upserts into the same history never re-derives them; same in-place edit contract as the normalized registry.
+_DATE_KEYS: dict = {}
+
+def _desc_date_keys(df: pd.DataFrame) -> np.ndarray:
+    hit = _DATE_KEYS.get(id(df))
+    if hit is not None and hit[0]() is df:
+        return hit[1]
+    return _date_order_keys(df["date_iso"])
+
+def _remember_date_keys(df: pd.DataFrame, keys: np.ndarray) -> None:
+    i = id(df)
+    _DATE_KEYS[i] = (weakref.ref(df, lambda _, i=i: _DATE_KEYS.pop(i, None)), keys)
+
+def upsert_last_wins(base: pd.DataFrame, rows: pd.DataFrame) -> pd.DataFrame:
+    """
+    Upserts canonical `rows` into `base` by (Ime i prezime, date_iso) with last-wins semantics.
+    `base` must already be the output of dedupe_last_then_sort_desc (DESC by date_iso, names ASC);
+    it is neither re-normalized nor re-sorted: the date block of each row is found by binary search on the
+    DESC date keys (cached for frames this function returned), replaced keys are looked up inside those blocks
+    only, and the result is spliced in one concat. Search is O(len(rows) * log n), but the splice copies every
+    column of the history once, so a call is O(n) (~20 ms at 10k rows, ~0.2 s at 1M). The save path therefore
+    upserts into one partition (write_tracker_partitions) or appends a delta, never into the whole history.
+    """
+    if rows is None or rows.empty:
+        return base
+    rows = dedupe_last_then_sort_desc(rows).reset_index(drop=True)
+    if base is None or base.empty:
+        return rows
+    normalized = is_normalized(base)
+    keys = _desc_date_keys(base)
+    if is_compact(base):
+        base, rows = _align_compact(base, to_compact(rows))
+
+    # Date block of every new row: binary search on the DESC keys (ascending view)
+    n = len(base)
+    d_asc = keys[::-1]
+    row_keys = _date_order_keys(rows["date_iso"])
+    lo = n - np.searchsorted(d_asc, row_keys, side="right")
+    hi = n - np.searchsorted(d_asc, row_keys, side="left")
+
+    # Existing rows for the affected keys, looked up inside those blocks only
+    cand = np.unique(np.concatenate([np.arange(a, b) for a, b in zip(lo, hi)]))
+    drop = cand[:0]
+    if len(cand):
+        same = pd.MultiIndex.from_frame(base.iloc[cand][["Ime i prezime", "date_iso"]]).isin(
+            pd.MultiIndex.from_frame(rows[["Ime i prezime", "date_iso"]]))
+        drop = cand[same]
+
+    # Insertion points: name position inside the date block (a replaced row's slot for an existing key);
+    # a missing name goes after every named row of its block, as in _last_wins_order
+    names = base["Ime i prezime"]
+    pos = []
+    for a, b, name in zip(lo, hi, rows["Ime i prezime"].astype(object)):
+        block = names.iloc[a:b].dropna().astype(str).to_numpy()
+        pos.append(a + (len(block) if pd.isna(name) else int(np.searchsorted(block, str(name), side="left"))))
+
+    # One splice: base runs between insertion points, dropped rows skipped; the keys follow the same plan
+    events = sorted([(int(p), 0, -1) for p in drop] + [(p, 1, i) for i, p in enumerate(pos)])
+    pieces, key_pieces, prev = [], [], 0
+    for p, is_row, i in events:
+        if p > prev:
+            pieces.append(base.iloc[prev:p]); key_pieces.append(keys[prev:p]); prev = p
+        if is_row:
+            pieces.append(rows.iloc[[i]]); key_pieces.append(row_keys[i:i + 1])
+        else:
+            prev = p + 1
+    if prev < n:
+        pieces.append(base.iloc[prev:]); key_pieces.append(keys[prev:])
+    out = pd.concat(pieces, ignore_index=True)
+    _remember_date_keys(out, np.concatenate(key_pieces))
+    return mark_normalized(out) if normalized else out
+
+# -------- Schema validation --------
+# Every check runs over the distinct values of its column(s) (names, dates, days, locations, (name, date) pairs) and
+# is broadcast back through factorize codes: a few factorize calls plus one SHA-1 per distinct (name, date) pair.
+REQUIRED_COLUMNS = NORMALIZED_COLUMNS + ["record_id", "created_at", "updated_at"]
+WEEKDAY_NAMES = ["Ponedjeljak", "Utorak", "Srijeda", "Četvrtak", "Petak", "Subota", "Nedjelja"]
+_HEX_PAIRS = np.array([f"{i:02x}".encode() for i in range(256)]).view(np.uint16)   # byte -> its two hex digits
+_UUID_GROUPS = [(0, 0, 8), (9, 8, 4), (14, 12, 4), (19, 16, 4), (24, 20, 12)]     # (uuid offset, hex offset, length)
+
+def record_ids_ascii(keys) -> np.ndarray:
+    """_record_id_for_key for many keys as an S36 array: one SHA-1 per key, uuid bits and hex formatting in numpy."""
+    sha1, ns = hashlib.sha1, _RECORD_NS_BYTES
+    digests = b"".join([sha1(ns + k.encode("utf-8")).digest() for k in keys])
+    d = np.frombuffer(digests, dtype=np.uint8).reshape(-1, 20)[:, :16].copy()
+    d[:, 6] = (d[:, 6] & 0x0F) | 0x50
+    d[:, 8] = (d[:, 8] & 0x3F) | 0x80
+    hexed = _HEX_PAIRS[d].view(np.uint8)
+    out = np.full((len(d), 36), ord("-"), dtype=np.uint8)
+    for at, src, k in _UUID_GROUPS:
+        out[:, at:at + k] = hexed[:, src:src + k]
+    return out.view("S36").ravel()
+
+def _distinct(s: pd.Series, missing: str = ""):
+    """(codes with missing -> last slot, stripped distinct values as str + `missing` in that last slot)."""
+    codes, uniq = pd.factorize(s)
+    text = np.append(pd.Index(uniq).astype(str).str.strip().to_numpy(dtype=object), missing)
+    return np.where(codes < 0, len(text) - 1, codes), text
+
+def validate_tracker_schema(df: pd.DataFrame, location_ids=None, holidays=None) -> list:
+    """
+    Tracker frame (raw CSV, canonical or compact) -> problems, each with the number of affected rows; [] when clean.
+    location_ids: valid catalog ids (Locations_normalized.csv); holidays: {date: name} (CroatianHolidays.csv);
+    either check is skipped when not given.
+    """
+    if df is None or df.empty:
+        return []
+    t = df.loc[:, ~df.columns.duplicated()]
+    t = t.rename(columns={c: REV.get(_norm_header(c), c) for c in t.columns})
+    n, issues = len(t), []
+    has = lambda *cols: all(c in t.columns for c in cols)
+    def report(what, bad):
+        k = int(np.count_nonzero(bad)) if isinstance(bad, np.ndarray) else int(bad)
+        if k: issues.append(f"{what}: {k} of {n} rows")
+
+    missing = [c for c in REQUIRED_COLUMNS if c not in t.columns]
+    if missing:
+        issues.append(f"missing columns: {', '.join(missing)}")
+
+    if has("date_iso"):
+        # day codes over distinct dates; ISO text per distinct value as apply_canonical_fields wrote it
+        if is_compact(t):
+            d_codes, days = pd.factorize(t["date_iso"])
+            days = pd.DatetimeIndex(days)
+            d_codes = np.where(d_codes < 0, len(days), d_codes)
+            d_text = np.append(days.strftime("%Y-%m-%d").to_numpy(dtype=object), "NaT")
+        else:
+            d_codes, d_text = _distinct(t["date_iso"], missing="nan")
+            days = pd.DatetimeIndex(parse_date_flexible(pd.Series(d_text[:-1], dtype=object)))
+        dow = np.append(days.dayofweek.to_numpy(dtype=np.int64, na_value=-1) if len(days) else [], -1).astype(np.int64)
+        dated = dow[d_codes] >= 0
+        report("date_iso missing or not a date", ~dated)
+    if has("Ime i prezime"):
+        n_codes, n_text = _distinct(t["Ime i prezime"], missing="nan")
+        report("Ime i prezime empty", np.isin(n_codes, np.flatnonzero((n_text == "") | (n_text == "nan"))))
+
+    if has("Ime i prezime", "date_iso"):
+        nd = len(d_text)
+        pair_codes, pairs = pd.factorize(n_codes.astype(np.int64) * nd + d_codes)
+        report("duplicate (Ime i prezime, date_iso) keys", n - len(pairs))
+        if has("record_id"):
+            expected = record_ids_ascii(n_text[pairs // nd] + "|" + d_text[pairs % nd]).astype("U36")
+            r_codes, r_text = _distinct(t["record_id"])
+            report("record_id is not uuid5(Ime i prezime|date_iso)", r_text[r_codes] != expected[pair_codes])
+
+    if has("Dan", "date_iso"):
+        day_of = {w.casefold(): i for i, w in enumerate(WEEKDAY_NAMES)}
+        dan_codes, dan_text = _distinct(t["Dan"])
+        # blank Dan is not checked (-1 matches only undated rows, which are skipped anyway)
+        dan = np.array([day_of.get(x.casefold(), -1 if x in ("", "nan") else -2) for x in dan_text], dtype=np.int64)
+        dan = dan[dan_codes]
+        report("Dan does not match the weekday of date_iso", dated & (dan != -1) & (dan != dow[d_codes]))
+
+    if location_ids is not None and has("location_id"):
+        valid = {str(x).strip() for x in location_ids}
+        l_codes, l_text = _distinct(t["location_id"])
+        unknown = np.array([x != "" and x.lower() != "nan" and x not in valid for x in l_text], dtype=bool)
+        report("location_id not in the location catalog", unknown[l_codes])
+
+    if holidays and has("Lokacija", "date_iso"):
+        # a holiday name as Lokacija is only valid on that holiday (the form writes it there)
+        names = sorted({str(v).strip().casefold() for v in holidays.values()})
+        by_day = {pd.Timestamp(k).normalize(): names.index(str(v).strip().casefold()) for k, v in holidays.items()}
+        day_hol = np.append([by_day.get(d, -1) if d is not pd.NaT else -1 for d in days], -1).astype(np.int64)
+        loc_codes, loc_text = _distinct(t["Lokacija"])
+        pos = {x: i for i, x in enumerate(names)}
+        loc_hol = np.array([pos.get(x.casefold(), -1) for x in loc_text], dtype=np.int64)
+        lh = loc_hol[loc_codes]
+        report("Lokacija is a holiday name on another date", (lh >= 0) & (lh != day_hol[d_codes]))
+    return issues